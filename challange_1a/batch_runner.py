@@ -0,0 +1,237 @@
+"""
+Multiprocess batch runner for pdf_process.
+Supervises a set of worker processes that each run an initializer once and
+then process files in chunks. A worker that crashes or exceeds the per-file
+timeout is terminated and replaced, and the unprocessed rest of its chunk is
+requeued, so one malformed PDF never takes down the batch. Workers that
+keep dying before their initializer finishes are not replaced forever: the
+batch gives up and records the files left as failed.
+"""
+
+import logging
+import multiprocessing as mp
+import os
+import time
+from collections import deque
+from multiprocessing.connection import wait
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+SUCCESS_STATUSES = ("success", "cached", "empty")
+# Workers in a row that may die during initialization before the batch gives up
+MAX_INIT_CRASHES = 3
+
+
+class BatchSummary:
+    """Collects per-file outcomes and timings for a batch run"""
+
+    def __init__(self):
+        self.files: List[Dict[str, Any]] = []
+        self._started = time.perf_counter()
+
+    def record(self, name: str, status: str, elapsed: float, error: Optional[str] = None,
+               details: Optional[Dict[str, Any]] = None) -> None:
+        self.files.append({"file": name, "status": status, "seconds": round(elapsed, 4), "error": error, **(details or {})})
+
+    def to_dict(self) -> Dict[str, Any]:
+        wall_time = time.perf_counter() - self._started
+        durations = [f["seconds"] for f in self.files]
+        status_counts: Dict[str, int] = {}
+        for f in self.files:
+            status_counts[f["status"]] = status_counts.get(f["status"], 0) + 1
+        successes = sum(status_counts.get(s, 0) for s in SUCCESS_STATUSES)
+        slowest = max(self.files, key=lambda f: f["seconds"], default=None)
+        return {
+            "total": len(self.files),
+            "succeeded": successes,
+            "failed": len(self.files) - successes,
+            "by_status": status_counts,
+            "wall_seconds": round(wall_time, 3),
+            "mean_file_seconds": round(sum(durations) / len(durations), 4) if durations else 0.0,
+            "max_file_seconds": slowest["seconds"] if slowest else 0.0,
+            "slowest_file": slowest["file"] if slowest else None,
+            "files_per_second": round(len(self.files) / wall_time, 2) if wall_time > 0 else 0.0,
+            "failures": [f for f in self.files if f["status"] not in SUCCESS_STATUSES],
+        }
+
+    def log(self) -> Dict[str, Any]:
+        summary = self.to_dict()
+        logger.info(
+            f"Batch complete: {summary['succeeded']}/{summary['total']} succeeded, {summary['failed']} failed "
+            f"{summary['by_status']} in {summary['wall_seconds']}s ({summary['files_per_second']} files/sec, "
+            f"mean {summary['mean_file_seconds']}s, max {summary['max_file_seconds']}s on {summary['slowest_file']})"
+        )
+        for failure in summary["failures"]:
+            logger.info(f"  {failure['status']}: {failure['file']} {failure['error'] or ''}".rstrip())
+        return summary
+
+
+def _worker_loop(conn, task_fn: Callable, task_args: Sequence, initializer: Optional[Callable], initargs: Sequence) -> None:
+    """Worker entry point: initialize once, then process chunks until told to stop."""
+    try:
+        if initializer is not None:
+            initializer(*initargs)
+    except Exception as e:
+        conn.send(("init_failed", f"{type(e).__name__}: {e}"))
+        return
+    conn.send(("idle",))
+    while True:
+        chunk = conn.recv()
+        if chunk is None:
+            break
+        for path in chunk:
+            conn.send(("start", path))
+            start = time.perf_counter()
+            details = None
+            try:
+                status, error = task_fn(path, *task_args), None
+                if isinstance(status, tuple):
+                    status, details = status
+            except Exception as e:
+                status, error = "failed", f"{type(e).__name__}: {e}"
+            conn.send(("done", path, status, time.perf_counter() - start, error, details))
+        conn.send(("idle",))
+
+
+class _WorkerSlot:
+    """Supervisor-side state of one worker process"""
+
+    def __init__(self, ctx, target_args: Sequence):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_loop, args=(child_conn, *target_args), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.remaining: deque = deque()
+        self.current: Optional[str] = None
+        self.current_started = 0.0
+        self.initialized = False
+
+    def kill(self) -> None:
+        self.process.terminate()
+        self.process.join(1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+def run_batch(paths: Sequence[str], task_fn: Callable, task_args: Sequence = (), workers: Optional[int] = None,
+              chunk_size: int = 1, timeout: Optional[float] = None, initializer: Optional[Callable] = None,
+              initargs: Sequence = ()) -> BatchSummary:
+    """
+    Run task_fn(path, *task_args) for every path across worker processes.
+
+    Args:
+        paths: Files to process
+        task_fn: Module-level function returning a status string for one file, or
+                 (status, details) to add the details dict to the file's summary record
+        workers: Number of worker processes (defaults to the CPU count)
+        chunk_size: Number of files handed to a worker at a time
+        timeout: Per-file limit in seconds; the worker is killed and replaced when exceeded
+        initializer: Called once in each worker process before any task; if it
+                     raises, or MAX_INIT_CRASHES workers in a row die during it,
+                     the files not yet processed are recorded as failed
+
+    Returns:
+        BatchSummary with the outcome and timing of every file
+    """
+    summary = BatchSummary()
+    pending = deque(list(paths[i:i + chunk_size]) for i in range(0, len(paths), max(1, chunk_size)))
+    if not pending:
+        return summary
+
+    ctx = mp.get_context()
+    target_args = (task_fn, tuple(task_args), initializer, tuple(initargs))
+    workers = max(1, min(workers or os.cpu_count() or 1, len(pending)))
+    slots = [_WorkerSlot(ctx, target_args) for _ in range(workers)]
+    init_crashes = 0
+
+    def abandon_pending(error: str) -> None:
+        """Record every file not yet handed to a worker as failed."""
+        for chunk in pending:
+            for path in chunk:
+                summary.record(os.path.basename(path), "failed", 0.0, error)
+        pending.clear()
+
+    def fail_slot(slot: _WorkerSlot, status: str, error: str) -> None:
+        """Record the in-flight file as failed, requeue the rest of its chunk, replace the worker."""
+        if slot.current is not None:
+            summary.record(os.path.basename(slot.current), status, time.perf_counter() - slot.current_started, error)
+            logger.error(f"{status}: {os.path.basename(slot.current)} ({error})")
+        if slot.remaining and slot.remaining[0] == slot.current:
+            slot.remaining.popleft()
+        if slot.remaining:
+            pending.appendleft(list(slot.remaining))
+        slot.kill()
+        slots.remove(slot)
+        if pending:
+            slots.append(_WorkerSlot(ctx, target_args))
+
+    def handle_message(slot: _WorkerSlot, message) -> None:
+        kind = message[0]
+        if kind == "start":
+            slot.current, slot.current_started = message[1], time.perf_counter()
+        elif kind == "done":
+            _, path, status, elapsed, error, details = message
+            summary.record(os.path.basename(path), status, elapsed, error, details)
+            if slot.remaining and slot.remaining[0] == path:
+                slot.remaining.popleft()
+            slot.current = None
+        elif kind == "idle":
+            nonlocal init_crashes
+            slot.initialized = True
+            init_crashes = 0
+            if pending:
+                chunk = pending.popleft()
+                slot.remaining = deque(chunk)
+                slot.conn.send(chunk)
+            else:
+                slot.conn.send(None)
+                slot.process.join()
+                slot.conn.close()
+                slots.remove(slot)
+        elif kind == "init_failed":
+            # Every worker would fail the same way: give up on the remaining files
+            logger.error(f"Worker initialization failed: {message[1]}")
+            abandon_pending(message[1])
+            slot.kill()
+            slots.remove(slot)
+
+    while slots:
+        now = time.perf_counter()
+        if timeout is not None:
+            for slot in list(slots):
+                if slot.current is not None and now - slot.current_started > timeout:
+                    fail_slot(slot, "timeout", f"exceeded {timeout}s")
+            deadlines = [s.current_started + timeout - now for s in slots if s.current is not None]
+            wait_for = max(0.0, min(deadlines)) if deadlines else timeout
+        else:
+            wait_for = None
+
+        by_handle = {}
+        for slot in slots:
+            by_handle[slot.conn] = slot
+            by_handle[slot.process.sentinel] = slot
+        for handle in wait(list(by_handle), timeout=wait_for):
+            slot = by_handle[handle]
+            if slot not in slots:
+                continue
+            try:
+                # Drain everything the worker sent before checking whether it died
+                while slot in slots and not slot.conn.closed and slot.conn.poll():
+                    handle_message(slot, slot.conn.recv())
+            except (EOFError, OSError):
+                pass
+            if slot in slots and not slot.process.is_alive():
+                if not slot.initialized:
+                    init_crashes += 1
+                    if init_crashes >= MAX_INIT_CRASHES and pending:
+                        # The initializer itself kills the process: replacing workers would loop forever
+                        error = (f"worker died during initialization {init_crashes} times in a row "
+                                 f"(exit code {slot.process.exitcode})")
+                        logger.error(f"Worker initialization failed: {error}")
+                        abandon_pending(error)
+                fail_slot(slot, "crashed", f"worker exited with code {slot.process.exitcode}")
+
+    return summary
@@ -0,0 +1,48 @@
+"""
+Report per-phase timings of extract_headings (extract, statistics, classify)
+for each heading level strategy, plus the font-size levels the statistics
+pass derives for every document.
+
+Usage: python benchmarks/bench_level_phases.py [input_dir] [--classifier MODE]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import fitz  # PyMuPDF
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from heading_classifier import CLASSIFIER_MODES  # noqa: E402
+from pdf_process import LEVEL_STRATEGIES, ExtractionOptions, document_level_map, extract_headings  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("input_dir", nargs="?", default=str(Path(__file__).resolve().parent.parent / "app" / "input"))
+    parser.add_argument("--classifier", choices=CLASSIFIER_MODES, default="regex")
+    args = parser.parse_args()
+
+    pdf_files = sorted(Path(args.input_dir).glob("*.pdf"))
+    for strategy in LEVEL_STRATEGIES:
+        options = ExtractionOptions(classifier_mode=args.classifier, level_strategy=strategy)
+        totals = {}
+        pages = 0
+        for pdf_file in pdf_files:
+            timings = {}
+            extract_headings(str(pdf_file), options, timings=timings)
+            for phase, seconds in timings.items():
+                totals[phase] = totals.get(phase, 0.0) + seconds
+            with fitz.open(pdf_file) as doc:
+                pages += len(doc)
+        phases = "  ".join(f"{phase} {seconds * 1000:8.2f}ms" for phase, seconds in totals.items())
+        print(f"{strategy:<11} {pages:4d} pages  {phases}")
+
+    print()
+    for pdf_file in pdf_files:
+        with fitz.open(pdf_file) as doc:
+            print(f"{pdf_file.name:<16} {document_level_map(doc).to_dict()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark font lookups: per-line clipped get_text("dict") calls versus the
+single-parse PageIndex. Reports pages/sec on the bundled app/input PDFs.
+
+Usage: python benchmarks/bench_page_index.py [input_dir] [--repeat N]
+"""
+
+import argparse
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import fitz  # PyMuPDF
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from page_index import PageIndex  # noqa: E402
+
+
+def clipped_lookups(page) -> int:
+    """Previous strategy: one blocks parse plus a clipped dict parse per line."""
+    blocks = page.get_text("blocks", sort=True)
+    lines = defaultdict(list)
+    for block in blocks:
+        if block[6] == 0:
+            lines[round(block[1], 1)].append(block)
+    lookups = 0
+    for _, block_list in sorted(lines.items()):
+        dict_text = page.get_text("dict", clip=block_list[0][:4])
+        blocks_in_clip = dict_text.get("blocks", [{}]) or [{}]
+        spans = blocks_in_clip[0].get("lines", [{}])[0].get("spans", [])
+        font_info = spans[0] if spans else {"size": 12, "flags": 0}
+        font_info.get("size", 12)
+        lookups += 1
+    return lookups
+
+
+def indexed_lookups(page) -> int:
+    """Current strategy: one dict parse per page, lookups answered from the index."""
+    index = PageIndex(page)
+    lookups = 0
+    for _, block_list in index.lines():
+        first_block = block_list[0]
+        first_block.font_size, first_block.is_bold, first_block.is_italic
+        lookups += 1
+    return lookups
+
+
+def run(strategy, pdf_files, repeat: int):
+    pages = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for pdf_file in pdf_files:
+            with fitz.open(pdf_file) as doc:
+                for page in doc:
+                    strategy(page)
+                    pages += 1
+    return pages, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("input_dir", nargs="?", default=str(Path(__file__).resolve().parent.parent / "app" / "input"))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    pdf_files = sorted(Path(args.input_dir).glob("*.pdf"))
+    if not pdf_files:
+        print(f"No PDFs found in {args.input_dir}")
+        return
+
+    results = {}
+    for name, strategy in (("clipped (before)", clipped_lookups), ("indexed (after)", indexed_lookups)):
+        pages, elapsed = run(strategy, pdf_files, args.repeat)
+        results[name] = pages / elapsed
+        print(f"{name:<18} {pages:5d} pages  {elapsed:7.3f}s  {pages / elapsed:8.1f} pages/sec")
+
+    before, after = results.values()
+    print(f"speedup: {after / before:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
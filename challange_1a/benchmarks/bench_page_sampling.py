@@ -0,0 +1,49 @@
+"""
+Show that extraction time scales with the pages actually visited: time
+extract_headings for several max_pages / stride / page_range selections
+of one PDF and report the cost per visited page.
+
+Usage: python benchmarks/bench_page_sampling.py [pdf_file] [--classifier MODE] [--repeat N]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from heading_classifier import CLASSIFIER_MODES  # noqa: E402
+from pdf_process import ExtractionOptions, extract_headings  # noqa: E402
+
+SELECTIONS = (
+    ("all pages", {}),
+    ("max_pages=1", {"max_pages": 1}),
+    ("max_pages=5", {"max_pages": 5}),
+    ("max_pages=10", {"max_pages": 10}),
+    ("stride=2", {"stride": 2}),
+    ("stride=4", {"stride": 4}),
+    ("pages 5-8", {"page_range": (5, 8)}),
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("pdf_file", nargs="?", default=str(Path(__file__).resolve().parent.parent / "app" / "input" / "file03.pdf"))
+    parser.add_argument("--classifier", choices=CLASSIFIER_MODES, default="regex")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for label, selection in SELECTIONS:
+        # Bookmarks would answer without visiting pages, so time the layout path
+        options = ExtractionOptions(classifier_mode=args.classifier, outline_source="layout", **selection)
+        info = {}
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            _, outline = extract_headings(args.pdf_file, options, info=info)
+        elapsed = (time.perf_counter() - start) / args.repeat
+        print(f"{label:<14} {info['pages']:4d} pages  {elapsed * 1000:8.2f}ms  "
+              f"{elapsed * 1000 / info['pages']:6.2f}ms/page  {len(outline):3d} headings")
+
+
+if __name__ == "__main__":
+    main()
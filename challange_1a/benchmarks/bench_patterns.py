@@ -0,0 +1,134 @@
+"""
+Micro-benchmark the per-line regex predicates of pdf_process: inline
+re.match/re.sub calls (before) against the precompiled bank in patterns.py
+(after), on a synthetic corpus of heading-like and body lines.
+
+Usage: python benchmarks/bench_patterns.py [--lines N] [--seed S]
+Exits with status 1 if any predicate disagrees between the two versions.
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from pdf_process import clean_title  # noqa: E402
+from patterns import NUMBERED_HEADING, NUMBERED_ITEM, PHASE_LABEL, SEPARATOR  # noqa: E402
+
+TEMPLATES = (
+    "{n}. {Words}",
+    "{n}.{n} {Words}",
+    "{n}.{n}.{n} {Words}",
+    "Phase {roman}: {Words}",
+    "phase {roman} : {words}",
+    "{L}. {Words}",
+    "Table of Contents",
+    "{WORDS}",
+    "{Words}:",
+    "{words} {words} {words}.",
+    "{Words} {Words} -- {Words}",
+    "Overview Overview {Words}!",
+    "----------------------------",
+    "• {words}",
+    "   {n}. {words} {n}.{n}",
+)
+VOCABULARY = ("overview", "methods", "results", "data", "pathway", "options", "summary", "review",
+              "digital", "library", "access", "funding", "timeline", "appendix", "milestones")
+
+
+def synthetic_lines(count: int, seed: int = 0):
+    rng = random.Random(seed)
+
+    def words(k):
+        return " ".join(rng.choice(VOCABULARY) for _ in range(k))
+
+    lines = []
+    for _ in range(count):
+        lines.append(rng.choice(TEMPLATES).format(
+            n=rng.randint(1, 12), roman=rng.choice(("I", "II", "IV", "ix")), L=rng.choice("ABCDab"),
+            words=words(rng.randint(1, 8)), Words=words(rng.randint(1, 5)).title(),
+            WORDS=words(rng.randint(1, 4)).upper()))
+    return lines
+
+
+# Previous inline versions, kept here as the baseline
+def inline_is_numbered(text):
+    return bool(re.match(r'^\s*(Phase\s+[IVXLC]+:|\d+\.\d*(\.\d+)*\s)', text, re.IGNORECASE) or re.match(r'^\s*[A-Z]\.\s', text))
+
+
+def inline_numbered_h3(text, is_bold, is_italic):
+    return bool(
+        re.match(r'^\s*Phase\s+[IVXLC]+\s*:', text, re.IGNORECASE) or
+        (re.match(r'^\s*\d+\.\s', text) and (is_bold or is_italic)) or
+        (re.match(r'^\s*\d+\.\s', text) and not re.search(r'\d\.\d', text) and len(text.split()) < 5 and is_bold)
+    )
+
+
+def inline_clean_title(text):
+    text = re.sub(r'[-]{2,}', ' ', text)
+    text = re.sub(r'(\w+)\s+\1', r'\1', text)
+    text = re.sub(r'\s+', ' ', text).strip()
+    text = re.sub(r'[^\w\s-]$', '', text)
+    return text if text else "Untitled"
+
+
+def inline_is_separator(text):
+    return bool(re.search(r'[-]{5,}', text))
+
+
+def compiled_is_numbered(text):
+    return bool(NUMBERED_HEADING.match(text))
+
+
+def compiled_numbered_h3(text, is_bold, is_italic):
+    return bool(PHASE_LABEL.match(text) or (NUMBERED_ITEM.match(text) and (is_bold or is_italic)))
+
+
+def compiled_is_separator(text):
+    return bool(SEPARATOR.search(text))
+
+
+PREDICATES = (
+    ("is_numbered", inline_is_numbered, compiled_is_numbered, lambda f, line, i: f(line)),
+    ("numbered_h3", inline_numbered_h3, compiled_numbered_h3, lambda f, line, i: f(line, bool(i & 1), bool(i & 2))),
+    ("clean_title", inline_clean_title, clean_title, lambda f, line, i: f(line)),
+    ("separator", inline_is_separator, compiled_is_separator, lambda f, line, i: f(line)),
+)
+
+
+def timed(call, fn, lines):
+    start = time.perf_counter()
+    results = [call(fn, line, i) for i, line in enumerate(lines)]
+    return results, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lines", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    lines = synthetic_lines(args.lines, args.seed)
+    print(f"{len(lines)} synthetic lines")
+    mismatches = 0
+    total_before = total_after = 0.0
+    for name, before, after, call in PREDICATES:
+        expected, t_before = timed(call, before, lines)
+        actual, t_after = timed(call, after, lines)
+        total_before += t_before
+        total_after += t_after
+        if expected != actual:
+            mismatches += 1
+            print(f"MISMATCH {name}")
+        print(f"{name:<12} inline {t_before * 1e9 / len(lines):7.1f} ns/line   "
+              f"compiled {t_after * 1e9 / len(lines):7.1f} ns/line   {t_before / t_after:5.2f}x")
+    print(f"{'total':<12} inline {total_before:7.3f}s        compiled {total_after:7.3f}s        "
+          f"{total_before / total_after:5.2f}x")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+"""
+Benchmark cold-start cost of pdf_process in fresh interpreters: module
+import time, --help time, and time to the first outline per classifier mode.
+
+Usage: python benchmarks/bench_startup.py [pdf_file] [--repeat N]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parent.parent
+
+IMPORT_SNIPPET = """
+import time
+start = time.perf_counter()
+import pdf_process
+print(time.perf_counter() - start)
+"""
+
+FIRST_OUTLINE_SNIPPET = """
+import sys, time
+start = time.perf_counter()
+import pdf_process
+pdf_process.extract_headings(sys.argv[1], pdf_process.ExtractionOptions(classifier_mode=sys.argv[2]))
+print(time.perf_counter() - start)
+"""
+
+HELP_SNIPPET = """
+import sys, time
+start = time.perf_counter()
+sys.argv = ["pdf_process.py", "--help"]
+import runpy
+try:
+    runpy.run_path("pdf_process.py", run_name="__main__")
+except SystemExit:
+    pass
+print(time.perf_counter() - start, file=sys.stderr)
+"""
+
+
+def time_snippet(snippet: str, args=(), repeat: int = 3, from_stderr: bool = False) -> float:
+    """Median wall time reported by a snippet run in fresh interpreters."""
+    samples = []
+    for _ in range(repeat):
+        result = subprocess.run([sys.executable, "-c", snippet, *args], cwd=APP_DIR,
+                                capture_output=True, text=True, check=True)
+        output = result.stderr if from_stderr else result.stdout
+        samples.append(float(output.strip().splitlines()[-1]))
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("pdf_file", nargs="?", default=str(APP_DIR / "app" / "input" / "file01.pdf"))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'import pdf_process':<32} {time_snippet(IMPORT_SNIPPET, repeat=args.repeat):7.3f}s")
+    print(f"{'pdf_process.py --help':<32} {time_snippet(HELP_SNIPPET, repeat=args.repeat, from_stderr=True):7.3f}s")
+    for mode in ("regex", "batched", "spacy"):
+        try:
+            elapsed = time_snippet(FIRST_OUTLINE_SNIPPET, (args.pdf_file, mode), repeat=args.repeat)
+            print(f"{'first outline (' + mode + ')':<32} {elapsed:7.3f}s")
+        except subprocess.CalledProcessError as e:
+            print(f"{'first outline (' + mode + ')':<32} failed: {e.stderr.strip().splitlines()[-1]}")
+
+
+if __name__ == "__main__":
+    main()
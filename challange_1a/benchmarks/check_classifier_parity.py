@@ -0,0 +1,47 @@
+"""
+Check that every heading classifier mode produces the same outlines, and
+report how long each mode takes on the same PDFs.
+
+Usage: python benchmarks/check_classifier_parity.py [input_dir]
+Exits with status 1 if any mode disagrees with the per-line spaCy outlines.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from heading_classifier import CLASSIFIER_MODES  # noqa: E402
+from pdf_process import ExtractionOptions, extract_headings  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("input_dir", nargs="?", default=str(Path(__file__).resolve().parent.parent / "app" / "input"))
+    args = parser.parse_args()
+
+    pdf_files = sorted(Path(args.input_dir).glob("*.pdf"))
+    if not pdf_files:
+        print(f"No PDFs found in {args.input_dir}")
+        return 0
+
+    results = {}
+    for mode in CLASSIFIER_MODES:
+        start = time.perf_counter()
+        results[mode] = {pdf_file.name: extract_headings(str(pdf_file), ExtractionOptions(classifier_mode=mode)) for pdf_file in pdf_files}
+        print(f"{mode:<8} {time.perf_counter() - start:7.3f}s")
+
+    reference = results["spacy"]
+    mismatches = 0
+    for mode in CLASSIFIER_MODES[1:]:
+        for name, expected in reference.items():
+            if results[mode][name] != expected:
+                mismatches += 1
+                print(f"MISMATCH {mode}: {name}")
+    print("all modes agree" if not mismatches else f"{mismatches} mismatching outline(s)")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""
+Document-level font statistics for heading level assignment.
+Phase one counts every line's font size into fixed-size arrays (half-point
+bins, weighted by characters). Phase two takes the most common size as body
+text and maps the size clusters above it onto H1/H2/H3. Both phases are
+linear in the number of lines and keep no per-line state.
+"""
+
+from array import array
+from typing import Dict, List, Union
+
+BIN_WIDTH = 0.5  # points
+MAX_BINS = 400   # sizes up to 200pt, larger sizes share the last bin
+LEVELS = ("H1", "H2", "H3")
+
+# A heading size must exceed the body size by at least this many bins
+MIN_HEADING_GAP_BINS = 2
+
+
+def size_bin(font_size: float) -> int:
+    return min(MAX_BINS - 1, max(0, int(round(font_size / BIN_WIDTH))))
+
+
+class FontHistogram:
+    """Character and line counts per font-size bin, split by weight"""
+
+    __slots__ = ("chars", "bold_chars", "lines")
+
+    def __init__(self):
+        self.chars = array("Q", bytes(8 * MAX_BINS))
+        self.bold_chars = array("Q", bytes(8 * MAX_BINS))
+        self.lines = array("I", bytes(4 * MAX_BINS))
+
+    def add(self, font_size: float, is_bold: bool, char_count: int) -> None:
+        size = size_bin(font_size)
+        self.chars[size] += char_count
+        self.lines[size] += 1
+        if is_bold:
+            self.bold_chars[size] += char_count
+
+    def body_bin(self) -> int:
+        """Bin holding the most characters, i.e. the body text size."""
+        return max(range(MAX_BINS), key=self.chars.__getitem__)
+
+    def level_map(self) -> "LevelMap":
+        body = self.body_bin()
+        heading_bins = [b for b in range(MAX_BINS - 1, body + MIN_HEADING_GAP_BINS - 1, -1) if self.lines[b]]
+
+        # Neighbouring bins (within one bin of each other) form one size cluster
+        clusters: List[List[int]] = []
+        for b in heading_bins:
+            if clusters and clusters[-1][-1] - b <= 1:
+                clusters[-1].append(b)
+            else:
+                clusters.append([b])
+
+        levels = {}
+        for rank, cluster in enumerate(clusters):
+            for b in cluster:
+                levels[b] = LEVELS[min(rank, len(LEVELS) - 1)]
+        return LevelMap(body, levels, len(clusters))
+
+
+class LevelMap:
+    """Maps a line's font size and weight to a heading level"""
+
+    __slots__ = ("body_bin", "levels", "cluster_count")
+
+    def __init__(self, body_bin: int, levels: Dict[int, str], cluster_count: int):
+        self.body_bin = body_bin
+        self.levels = levels
+        self.cluster_count = cluster_count
+
+    @property
+    def body_size(self) -> float:
+        return self.body_bin * BIN_WIDTH
+
+    def level_for(self, font_size: float, is_bold: bool) -> Union[str, None]:
+        """Level of a size cluster; bold text near body size ranks below every cluster."""
+        size = size_bin(font_size)
+        level = self.levels.get(size)
+        if level is None and is_bold and size >= self.body_bin:
+            level = LEVELS[min(self.cluster_count, len(LEVELS) - 1)]
+        return level
+
+    def to_dict(self) -> Dict:
+        sizes: Dict[str, List[float]] = {}
+        for b, level in sorted(self.levels.items(), reverse=True):
+            sizes.setdefault(level, []).append(b * BIN_WIDTH)
+        return {"body_size": self.body_size, "levels": sizes}
@@ -0,0 +1,73 @@
+"""
+Token statistics for heading classification.
+is_heading_text only needs the token count and the number of capitalised
+tokens of a line. HeadingClassifier supplies them in one of three modes:
+
+- "spacy":   one full nlp(text) call per line
+- "batched": all candidate lines of a document through nlp.pipe with every
+             pipeline component disabled (only the tokenizer runs)
+- "regex":   a regex tokenizer approximating spaCy's, no spaCy at all
+"""
+
+import re
+from typing import Dict, Iterable, Tuple
+
+CLASSIFIER_MODES = ("spacy", "batched", "regex")
+DEFAULT_CLASSIFIER_MODE = "batched"
+
+# Lines longer than this are rejected before tokenization
+MAX_HEADING_LENGTH = 100
+
+# Mirrors spaCy's English tokenizer on heading-length lines: punctuation runs
+# ("...", "----") and numbers ("1.2.3", "1/2") stay whole, extra whitespace
+# becomes its own token, clitics split off ("Recipient", "'s"), and every
+# other punctuation character is a token
+TOKEN_PATTERN = re.compile(r"\.{2,}|-{2,}|_{2,}|(?<=\s)\s+|\d+(?:[.,:/]\d+)+|\w+|['’]\w+|[^\w\s]")
+
+
+class HeadingClassifier:
+    """Computes (token_count, title_case_count) for candidate heading lines"""
+
+    def __init__(self, mode: str = DEFAULT_CLASSIFIER_MODE, nlp=None, batch_size: int = 256):
+        if mode not in CLASSIFIER_MODES:
+            raise ValueError(f"Unknown classifier mode '{mode}', expected one of {CLASSIFIER_MODES}")
+        if mode != "regex" and nlp is None:
+            raise ValueError(f"Classifier mode '{mode}' requires a spaCy pipeline")
+        self.mode = mode
+        self.nlp = nlp
+        self.batch_size = batch_size
+        self._stats: Dict[str, Tuple[int, int]] = {}
+
+    def prepare(self, texts: Iterable[str]) -> None:
+        """Tokenize all candidate lines of a document in batches (batched mode only)."""
+        if self.mode != "batched":
+            return
+        pending = list(dict.fromkeys(
+            text for text in texts
+            if text.strip() and len(text) <= MAX_HEADING_LENGTH and text not in self._stats
+        ))
+        if not pending:
+            return
+        docs = self.nlp.pipe(pending, batch_size=self.batch_size, disable=self.nlp.pipe_names)
+        for text, doc in zip(pending, docs):
+            self._stats[text] = self._count([token.text for token in doc])
+
+    def clear(self) -> None:
+        """Forget the lines tokenized so far, e.g. once a streamed page is done."""
+        self._stats.clear()
+
+    def token_stats(self, text: str) -> Tuple[int, int]:
+        """Return (token_count, title_case_count) for a line of text."""
+        if self.mode == "regex":
+            return self._count(TOKEN_PATTERN.findall(text))
+        if self.mode == "batched":
+            stats = self._stats.get(text)
+            if stats is None:
+                stats = self._count([token.text for token in self.nlp.make_doc(text)])
+                self._stats[text] = stats
+            return stats
+        return self._count([token.text for token in self.nlp(text)])
+
+    @staticmethod
+    def _count(tokens) -> Tuple[int, int]:
+        return len(tokens), sum(1 for token in tokens if token[0].isupper())
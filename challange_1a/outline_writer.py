@@ -0,0 +1,99 @@
+"""
+Incremental outline writer for streamed extraction.
+Headings are written as they arrive, so memory stays flat however long the
+document is. Two files are produced:
+
+- <name>.ndjson: one record per line, line-buffered, readable while the
+  document is still being processed and kept as progress if it fails
+- <name>.json: the regular {"title", "outline"} file, built in a temporary
+  file and renamed into place only when the stream completes
+"""
+
+import json
+import os
+import textwrap
+from pathlib import Path
+from typing import Dict, Union
+
+
+class OutlineWriter:
+    """Streams a title and heading entries to JSON and NDJSON outputs"""
+
+    def __init__(self, output_file: Union[str, Path], ndjson: bool = True):
+        self.output_file = Path(output_file)
+        self.ndjson_file = self.output_file.with_suffix(".ndjson") if ndjson else None
+        self._tmp_file = self.output_file.with_name(f".{self.output_file.name}.{os.getpid()}.tmp")
+        self._json = open(self._tmp_file, "w", encoding="utf-8")
+        self._ndjson = open(self.ndjson_file, "w", encoding="utf-8", buffering=1) if ndjson else None
+        self._title_written = False
+        self._has_title = False
+        self.headings_written = 0
+        self.produced = False
+
+    def __enter__(self) -> "OutlineWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def write_title(self, title: Union[str, None], strategy: Union[str, None] = None) -> None:
+        """
+        Write the document title; must come before any heading. The outline
+        strategy, when given, is recorded in the NDJSON title record only.
+        """
+        self._json.write('{\n  "title": ' + json.dumps(title or "", ensure_ascii=False) + ',\n  "outline": ')
+        record = {"type": "title", "title": title or ""}
+        if strategy:
+            record["strategy"] = strategy
+        self._write_record(record)
+        self._title_written = True
+        self._has_title = bool(title)
+
+    def write_heading(self, entry: Dict) -> None:
+        """Append one {"level", "text", "page"} heading entry."""
+        if not self._title_written:
+            self.write_title(None)
+        # Same layout as json.dump(indent=2) of the whole document
+        self._json.write("[\n" if not self.headings_written else ",\n")
+        self._json.write(textwrap.indent(json.dumps(entry, indent=2, ensure_ascii=False), "    "))
+        self._write_record({"type": "heading", **entry})
+        self.headings_written += 1
+
+    def close(self) -> bool:
+        """
+        Finish both outputs. Returns False, and leaves no files behind,
+        when neither a title nor any heading was found.
+        """
+        if not self._title_written:
+            self.write_title(None)
+        self._json.write("\n  ]\n}" if self.headings_written else "[]\n}")
+        self._json.close()
+        if not (self._has_title or self.headings_written):
+            self._discard()
+            return False
+        os.replace(self._tmp_file, self.output_file)
+        self._write_record({"type": "end", "headings": self.headings_written})
+        if self._ndjson:
+            self._ndjson.close()
+        self.produced = True
+        return True
+
+    def abort(self) -> None:
+        """Drop the unfinished JSON but keep the NDJSON progress written so far."""
+        self._json.close()
+        self._tmp_file.unlink(missing_ok=True)
+        if self._ndjson:
+            self._ndjson.close()
+
+    def _discard(self) -> None:
+        self._tmp_file.unlink(missing_ok=True)
+        if self._ndjson:
+            self._ndjson.close()
+            self.ndjson_file.unlink(missing_ok=True)
+
+    def _write_record(self, record: Dict) -> None:
+        if self._ndjson:
+            self._ndjson.write(json.dumps(record, ensure_ascii=False) + "\n")
@@ -0,0 +1,113 @@
+"""
+Page-level text index for heading extraction.
+Parses each page once with get_text("dict") and answers every block, line
+and font lookup from memory instead of re-parsing clipped regions.
+"""
+
+import fitz  # PyMuPDF
+from collections import defaultdict
+from typing import List, Dict, Tuple, NamedTuple
+
+BOLD_FLAG = 16
+ITALIC_FLAG = 2
+
+# Text-only extraction: image blocks are never used for headings
+TEXT_FLAGS = fitz.TEXTFLAGS_TEXT
+
+DEFAULT_FONT = {"size": 12, "flags": 0, "font": ""}
+
+
+class TextBlock:
+    """A text block with its lines, spans and font attributes"""
+
+    __slots__ = ("bbox", "number", "lines", "text")
+
+    def __init__(self, raw_block: Dict):
+        self.bbox = tuple(raw_block["bbox"])
+        self.number = raw_block["number"]
+        self.lines = raw_block.get("lines", [])
+        # Same layout as get_text("blocks"): lines joined by newlines, trailing newline
+        self.text = "\n".join("".join(s["text"] for s in line["spans"]) for line in self.lines) + "\n"
+
+    @property
+    def spans(self) -> List[Dict]:
+        """Spans of the block's first line."""
+        return self.lines[0]["spans"] if self.lines else []
+
+    @property
+    def font(self) -> Dict:
+        """Font attributes of the first span, with defaults for empty blocks."""
+        spans = self.spans
+        return spans[0] if spans else DEFAULT_FONT
+
+    @property
+    def font_size(self) -> float:
+        return self.font.get("size", 12)
+
+    @property
+    def max_font_size(self) -> float:
+        return max((s.get("size", 0) for s in self.spans), default=0)
+
+    @property
+    def is_bold(self) -> bool:
+        font_info = self.font
+        return bool(font_info.get("flags", 0) & BOLD_FLAG or 'bold' in font_info.get("font", "").lower())
+
+    @property
+    def is_italic(self) -> bool:
+        font_info = self.font
+        return bool(font_info.get("flags", 0) & ITALIC_FLAG or 'italic' in font_info.get("font", "").lower())
+
+    @property
+    def has_bold_flag(self) -> bool:
+        return bool(self.font.get("flags", 0) & BOLD_FLAG)
+
+    def as_tuple(self) -> Tuple:
+        """Block in get_text("blocks") tuple form."""
+        return (*self.bbox, self.text, self.number, 0)
+
+
+class TextLine(NamedTuple):
+    """A visual line: blocks sharing a top coordinate, with the first block's font"""
+    text: str
+    font_size: float
+    is_bold: bool
+    is_italic: bool
+    spans: List[Dict]
+    left_aligned: bool
+
+
+class PageIndex:
+    """In-memory index of a page's text blocks built from a single parse"""
+
+    __slots__ = ("width", "blocks")
+
+    def __init__(self, page):
+        self.width = page.rect.width
+        page_dict = page.get_text("dict", flags=TEXT_FLAGS, sort=True)
+        self.blocks = [TextBlock(b) for b in page_dict.get("blocks", []) if b.get("type", 0) == 0]
+
+    def lines(self) -> List[Tuple[float, List[TextBlock]]]:
+        """Group blocks sharing a rounded top coordinate, ordered top to bottom."""
+        grouped = defaultdict(list)
+        for block in self.blocks:
+            grouped[round(block.bbox[1], 1)].append(block)
+        return sorted(grouped.items())
+
+    def text_lines(self) -> List[TextLine]:
+        """Joined text and font attributes of each non-empty visual line."""
+        text_lines = []
+        for _, block_list in self.lines():
+            line_text = " ".join(b.text.strip().replace('\n', ' ') for b in block_list).strip()
+            if not line_text:
+                continue
+            first_block = block_list[0]
+            text_lines.append(TextLine(
+                text=line_text,
+                font_size=first_block.font_size,
+                is_bold=first_block.is_bold,
+                is_italic=first_block.is_italic,
+                spans=first_block.spans,
+                left_aligned=first_block.bbox[0] < self.width / 4,
+            ))
+        return text_lines
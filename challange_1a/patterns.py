@@ -0,0 +1,26 @@
+"""
+Precompiled regular expressions for the per-line predicates of pdf_process.
+Compiling once at import skips the re module's cache lookup on every call,
+and related checks are folded into one alternation so each line is scanned
+once. Challenge 1b keeps the same kind of bank in src/patterns.py.
+"""
+
+import re
+
+# is_heading_text: "Phase IV:", "1.", "2.3 " (any case) or "A. " (upper case only)
+NUMBERED_HEADING = re.compile(r'^\s*(?:(?i:Phase\s+[IVXLC]+:|\d+\.\d*(?:\.\d+)*\s)|[A-Z]\.\s)')
+# "1. Introduction": table-of-contents entries and numbered H3 candidates
+NUMBERED_ITEM = re.compile(r'^\s*\d+\.\s')
+PHASE_LABEL = re.compile(r'^\s*Phase\s+[IVXLC]+\s*:', re.IGNORECASE)
+
+# clean_title
+DASH_RUN = re.compile(r'[-]{2,}')
+REPEATED_WORD = re.compile(r'(\w+)\s+\1')
+WHITESPACE = re.compile(r'\s+')
+TRAILING_PUNCTUATION = re.compile(r'[^\w\s-]$')
+
+# detect_title: dashed separator lines are never titles
+SEPARATOR = re.compile(r'[-]{5,}')
+
+# bookmark_outline: auto-generated "Page 3" / "Slide 12" bookmarks
+GENERIC_BOOKMARK = re.compile(r'^\s*(page|slide)?\s*\d+\s*$', re.IGNORECASE)
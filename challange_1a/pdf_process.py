@@ -1,43 +1,76 @@
+import argparse
 import fitz  # PyMuPDF
 import json
+import functools
 import os
-import spacy
-import re
-from collections import defaultdict
+import time
 import logging
+from dataclasses import asdict, dataclass
 from pathlib import Path
-from typing import Union, List, Dict  # For Python 3.9 compatibility
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('/app/pdf_extraction.log'),
-        logging.StreamHandler()
-    ]
-)
+from typing import Any, Dict, Iterator, List, Tuple, Union  # For Python 3.9 compatibility
+
+from batch_runner import BatchSummary, run_batch
+from font_stats import FontHistogram, LevelMap
+from heading_classifier import HeadingClassifier, DEFAULT_CLASSIFIER_MODE, CLASSIFIER_MODES, MAX_HEADING_LENGTH
+from outline_writer import OutlineWriter
+from page_index import PageIndex, TextLine
+from patterns import (NUMBERED_HEADING, NUMBERED_ITEM, PHASE_LABEL, DASH_RUN, REPEATED_WORD,
+                      WHITESPACE, TRAILING_PUNCTUATION, SEPARATOR, GENERIC_BOOKMARK)
+from result_cache import ResultCache, DEFAULT_MAX_BYTES
+
 logger = logging.getLogger(__name__)
 
-# Load spaCy model
-try:
-    nlp = spacy.load("en_core_web_sm")
-except OSError:
-    logger.error("spaCy model 'en_core_web_sm' not found. Install it offline using: python -m spacy download en_core_web_sm")
-    raise
+SPACY_MODEL = "en_core_web_sm"
+# Bump whenever a change alters extraction output, so cached results are not reused
+EXTRACTOR_VERSION = "2"
+DEFAULT_LOG_FILE = "/app/pdf_extraction.log"
+LEVEL_STRATEGIES = ("fixed", "font-stats")
+# "auto" answers from embedded bookmarks when they look like an outline, "layout" always analyses the pages
+OUTLINE_SOURCES = ("auto", "layout")
+BOOKMARK_LEVELS = ("H1", "H2", "H3")
+MIN_BOOKMARKS = 2
+
+def configure_logging(log_file: Union[str, None] = None, level: int = logging.INFO) -> None:
+    """
+    Configure console logging, plus a log file when one is given.
+    Called by the CLI only, so importing this module has no side effects.
+    """
+    handlers = [logging.StreamHandler()]
+    if log_file:
+        handlers.append(logging.FileHandler(log_file))
+    logging.basicConfig(
+        level=level,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=handlers
+    )
+
+@functools.lru_cache(maxsize=None)
+def get_nlp():
+    """
+    Load the spaCy model on first use and reuse it afterwards.
+    spaCy itself is imported here too, since importing it dominates startup.
+    """
+    import spacy
+    try:
+        return spacy.load(SPACY_MODEL)
+    except OSError:
+        logger.error(f"spaCy model '{SPACY_MODEL}' not found. Install it offline using: python -m spacy download {SPACY_MODEL}")
+        raise
 
-def is_heading_text(text: str, font_size: float, is_bold: bool, is_italic: bool, spans: list, in_toc_context: bool) -> bool:
+def is_heading_text(text: str, font_size: float, is_bold: bool, is_italic: bool, spans: list, in_toc_context: bool,
+                    classifier: HeadingClassifier = None) -> bool:
     """
     Determine if text is a heading based on NLP and formatting characteristics.
     Excludes 'table of contents' and its numbered sub-entries when in TOC context.
+    Token counts come from the given classifier (per-line spaCy when omitted).
     """
     if not text.strip():
         return False
-    if len(text) > 100:  # Exclude headings longer than 100 characters
+    if len(text) > MAX_HEADING_LENGTH:  # Exclude headings longer than 100 characters
         return False
 
     # Calculate is_numbered early to prevent headings like "1. Introduction..." from being filtered out
-    is_numbered = bool(re.match(r'^\s*(Phase\s+[IVXLC]+:|\d+\.\d*(\.\d+)*\s)', text, re.IGNORECASE) or re.match(r'^\s*[A-Z]\.\s', text))
+    is_numbered = bool(NUMBERED_HEADING.match(text))
 
     # Apply span check only to non-numbered headings
     if not is_numbered and len(spans) > 1 and not (is_bold or is_italic):
@@ -46,11 +79,13 @@ def is_heading_text(text: str, font_size: float, is_bold: bool, is_italic: bool,
     if text.strip().lower() == "table of contents":
         return False
     # Exclude numbered entries if in TOC context
-    if in_toc_context and re.match(r'^\s*\d+\.\s', text):
+    if in_toc_context and NUMBERED_ITEM.match(text):
         return False
-    doc = nlp(text)
-    is_short = len(doc) < 12
-    is_title_case = sum(1 for token in doc if token.text[0].isupper()) > len(doc) / 2
+    if classifier is None:
+        classifier = HeadingClassifier("spacy", nlp=get_nlp())
+    token_count, title_case_count = classifier.token_stats(text)
+    is_short = token_count < 12
+    is_title_case = title_case_count > token_count / 2
     
     return is_numbered or (is_short and (is_bold or font_size > 10)) or (is_title_case and font_size > 10 and not is_italic)
 
@@ -58,150 +93,561 @@ def clean_title(text: str) -> str:
     """
     Clean the title text to make it meaningful.
     """
-    text = re.sub(r'[-]{2,}', ' ', text)
-    text = re.sub(r'(\w+)\s+\1', r'\1', text)
-    text = re.sub(r'\s+', ' ', text).strip()
-    text = re.sub(r'[^\w\s-]$', '', text)
+    text = DASH_RUN.sub(' ', text)
+    text = REPEATED_WORD.sub(r'\1', text)
+    text = WHITESPACE.sub(' ', text).strip()
+    text = TRAILING_PUNCTUATION.sub('', text)
     return text if text else "Untitled"
 
-def extract_headings(pdf_path: str) -> tuple[Union[str, None], List[Dict]]:
+def detect_title(index: PageIndex) -> str:
+    """
+    Detect the document title from the first page's blocks.
+    """
+    blocks = index.blocks
+    try:
+        bold_blocks = [b for b in blocks if b.has_bold_flag]
+        if bold_blocks:
+            title_block = max(bold_blocks, key=lambda x: x.max_font_size)
+            return clean_title(title_block.text.strip().replace('\n', ' '))
+        # logger.info("No bold blocks found, trying largest font size")
+        all_blocks = [b for b in blocks if len(b.text.split()) > 1 and not SEPARATOR.search(b.text)]
+        if all_blocks:
+            title_block = max(all_blocks, key=lambda x: x.max_font_size)
+            return clean_title(title_block.text.strip().replace('\n', ' '))
+        logger.info("No valid blocks with font size, using first meaningful block")
+    except Exception:
+        pass
+    first_block = next((b for b in blocks if len(b.text.split()) > 1 and not SEPARATOR.search(b.text)), None)
+    return clean_title(first_block.text.strip().replace('\n', ' ') if first_block else "Untitled")
+
+@dataclass(frozen=True)
+class ExtractionOptions:
+    """
+    Settings that influence extraction output.
+    classifier_mode: heading tokenization, see heading_classifier
+    level_strategy: "fixed" font-size thresholds, or "font-stats" clusters
+                    derived from the document's own font-size histogram
+    outline_source: "auto" uses embedded bookmarks when plausible, "layout"
+                    always runs the heading heuristics
+    page_range:     (first, last) 1-based inclusive pages to visit; last=None
+                    runs to the end of the document
+    max_pages:      visit at most this many pages of the range (None = all)
+    stride:         visit every stride-th page of the range, for previews
+    Page 1 is always read for the title, whatever pages are selected.
+    """
+    classifier_mode: str = DEFAULT_CLASSIFIER_MODE
+    level_strategy: str = "fixed"
+    outline_source: str = "auto"
+    page_range: Tuple[int, Union[int, None]] = (1, None)
+    max_pages: Union[int, None] = None
+    stride: int = 1
+
+    def __post_init__(self):
+        if self.classifier_mode not in CLASSIFIER_MODES:
+            raise ValueError(f"Unknown classifier mode '{self.classifier_mode}', expected one of {CLASSIFIER_MODES}")
+        if self.level_strategy not in LEVEL_STRATEGIES:
+            raise ValueError(f"Unknown level strategy '{self.level_strategy}', expected one of {LEVEL_STRATEGIES}")
+        if self.outline_source not in OUTLINE_SOURCES:
+            raise ValueError(f"Unknown outline source '{self.outline_source}', expected one of {OUTLINE_SOURCES}")
+        first, last = self.page_range
+        if first < 1 or (last is not None and last < first):
+            raise ValueError(f"Invalid page range {self.page_range}, expected 1 <= first <= last")
+        if self.max_pages is not None and self.max_pages < 1:
+            raise ValueError(f"max_pages must be at least 1, got {self.max_pages}")
+        if self.stride < 1:
+            raise ValueError(f"stride must be at least 1, got {self.stride}")
+
+    def page_numbers(self, page_count: int) -> range:
+        """1-based numbers of the pages to visit, in document order."""
+        first, last = self.page_range
+        last = page_count if last is None else min(last, page_count)
+        return range(first, last + 1, self.stride)[:self.max_pages]
+
+    def cache_config(self) -> Dict:
+        """Everything that influences extraction output, used in result cache keys."""
+        return {"version": EXTRACTOR_VERSION, **asdict(self)}
+
+def cached_extract_headings(pdf_path: str, options: ExtractionOptions, cache: ResultCache,
+                            info: Dict[str, Any] = None) -> tuple[Union[str, None], List[Dict], bool]:
+    """
+    Look up the outline of a PDF in the result cache, extracting and storing
+    it on a miss. Returns (title, outline, cache_hit); a hit never opens the PDF.
+    """
+    info = info if info is not None else {}
+    key = cache.key_for(pdf_path, options.cache_config())
+    cached = cache.get(key)
+    if cached is not None:
+        info["strategy"] = cached.get("strategy")
+        return cached["title"], cached["outline"], True
+    
+    title, outline = extract_headings(pdf_path, options, info=info)
+    # Empty results may come from unreadable files, so they are not cached
+    if title or outline:
+        cache.put(key, {"title": title, "outline": outline, "strategy": info.get("strategy")})
+    return title, outline, False
+
+def bookmark_outline(doc, title: Union[str, None] = None, page_numbers: range = None) -> Union[List[Dict], None]:
+    """
+    Outline built from the document's embedded bookmarks, without reading
+    any page text. Returns None when there are no bookmarks or they do not
+    look like a document outline: fewer than MIN_BOOKMARKS entries, empty
+    titles, targets outside the document, pages out of reading order, or
+    mostly generic "Page N" names. A leading bookmark repeating the
+    document title is dropped, then levels are shifted so the shallowest
+    remaining bookmark is H1; levels below 3 are folded into H3. With
+    page_numbers, only bookmarks pointing at those pages are kept.
+    """
+    try:
+        toc = doc.get_toc(simple=True)
+    except Exception as e:
+        logger.warning(f"Could not read bookmarks: {e}")
+        return None
+    if len(toc) < MIN_BOOKMARKS:
+        return None
+    
+    outline = []
+    generic = 0
+    last_page = 1
+    for level, text, page in toc:
+        text = " ".join(text.split())
+        if not text or not last_page <= page <= doc.page_count:
+            return None
+        last_page = page
+        generic += bool(GENERIC_BOOKMARK.match(text))
+        outline.append({
+            "level": level,
+            "text": text,
+            "page": page
+        })
+    if generic * 2 >= len(outline):
+        return None
+    
+    if title and outline[0]["page"] == 1 and clean_title(outline[0]["text"]) == title:
+        outline.pop(0)
+    top_level = min((entry["level"] for entry in outline), default=1)
+    for entry in outline:
+        entry["level"] = BOOKMARK_LEVELS[min(entry["level"] - top_level + 1, len(BOOKMARK_LEVELS)) - 1]
+    if page_numbers is not None:
+        outline = [entry for entry in outline if entry["page"] in page_numbers]
+    return outline
+
+def first_page_title(doc, pdf_path: str = "") -> Union[str, None]:
+    """Title detected on page 1, as in the layout path."""
+    try:
+        index = PageIndex(doc[0]) if doc.page_count else None
+        return detect_title(index) if index and index.blocks else None
+    except Exception as e:
+        logger.warning(f"Error processing page 1 of {pdf_path}: {e}")
+        return None
+
+def extract_headings(pdf_path: str, options: ExtractionOptions = None, cache: ResultCache = None,
+                     timings: Dict[str, float] = None, info: Dict[str, Any] = None) -> tuple[Union[str, None], List[Dict]]:
     """
     Extract title and hierarchical headings (H1, H2, H3) from a PDF file.
+    Page 1 is read first, for the title. With outline_source "auto",
+    plausible embedded bookmarks are then returned directly. Otherwise
+    extraction runs in phases: "extract" parses each selected page once
+    into line records and counts font sizes, "statistics" derives the level
+    map (font-stats only) and "classify" assigns levels, with all candidate
+    lines tokenized in one batch. Only the pages selected by the options'
+    page_range, max_pages and stride are visited. Phase durations in seconds
+    are stored in timings when given, the strategy used ("bookmarks" or
+    "layout") in info["strategy"] and the pages visited in info["pages"].
+    When a result cache is given, unchanged files are answered from it.
     """
+    options = options or ExtractionOptions()
+    info = info if info is not None else {}
+    if cache is not None:
+        title, outline, _ = cached_extract_headings(pdf_path, options, cache, info)
+        return title, outline
+    
+    timings = timings if timings is not None else {}
+    start = time.perf_counter()
     try:
         doc = fitz.open(pdf_path)
     except Exception as e:
         logger.error(f"Failed to open PDF {pdf_path}: {e}")
         return None, []
     
-    outline = []
-    title = None
-    toc_context = {}  # Track TOC context per page
+    title = first_page_title(doc, pdf_path)
+    page_numbers = options.page_numbers(doc.page_count)
+    info["pages"] = len(page_numbers) if 1 in page_numbers else len(page_numbers) + 1
+    if options.outline_source == "auto":
+        outline = bookmark_outline(doc, title, page_numbers)
+        if outline is not None:
+            doc.close()
+            timings["bookmarks"] = time.perf_counter() - start
+            info["strategy"] = "bookmarks"
+            info["pages"] = 1
+            return title, outline
+    
+    info["strategy"] = "layout"
+    page_lines = []
+    histogram = FontHistogram() if options.level_strategy == "font-stats" else None
     
-    for page_num, page in enumerate(doc, 1):
+    for page_num in page_numbers:
+        if page_num == 1:
+            continue  # Page 1 only provides the title
         try:
-            blocks = page.get_text("blocks", sort=True)
-            if not blocks:
+            index = PageIndex(doc[page_num - 1])
+            if not index.blocks:
                 continue
             
-            if page_num == 1 and not title:
-                try:
-                    bold_blocks = [b for b in blocks if b[6] == 0 and any(page.get_text("dict", clip=b[:4]).get("blocks", [{}])[0].get("lines", [{}])[0].get("spans", [{}])[0].get("flags", 0) & 16 for s in page.get_text("dict", clip=b[:4]).get("blocks", [{}])[0].get("lines", [{}])[0].get("spans", []))]
-                    if bold_blocks:
-                        title_block = max(bold_blocks, key=lambda x: max(s.get("size", 0) for s in page.get_text("dict", clip=x[:4]).get("blocks", [{}])[0].get("lines", [{}])[0].get("spans", [])))
-                        title = clean_title(title_block[4].strip().replace('\n', ' '))
-                        # logger.info(f"Title detected from bold block: {title}")
-                    else:
-                        # logger.info("No bold blocks found, trying largest font size")
-                        all_blocks = [b for b in blocks if b[6] == 0 and len(b[4].split()) > 1 and not re.search(r'[-]{5,}', b[4])]
-                        if all_blocks:
-                            title_block = max(all_blocks, key=lambda x: max(s.get("size", 0) for s in page.get_text("dict", clip=x[:4]).get("blocks", [{}])[0].get("lines", [{}])[0].get("spans", [])))
-                            title = clean_title(title_block[4].strip().replace('\n', ' '))
-                            # logger.info(f"Title detected from largest font size: {title}")
-                        else:
-                            logger.info("No valid blocks with font size, using first meaningful block")
-                            first_block = next((b for b in blocks if b[6] == 0 and len(b[4].split()) > 1 and not re.search(r'[-]{5,}', b[4])), None)
-                            title = clean_title(first_block[4].strip().replace('\n', ' ') if first_block else "Untitled")
-                            # logger.info(f"Title fallback to first block: {title}")
-                except Exception:
-                    first_block = next((b for b in blocks if b[6] == 0 and len(b[4].split()) > 1 and not re.search(r'[-]{5,}', b[4])), None)
-                    title = clean_title(first_block[4].strip().replace('\n', ' ') if first_block else "Untitled")
-                continue
+            lines = index.text_lines()
+            page_lines.append((page_num, lines))
+            if histogram is not None:
+                add_to_histogram(histogram, lines)
+        except Exception as e:
+            logger.warning(f"Error processing page {page_num} of {pdf_path}: {e}")
+    
+    doc.close()
+    timings["extract"] = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    level_map = histogram.level_map() if histogram is not None else None
+    timings["statistics"] = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    classifier = make_classifier(options.classifier_mode)
+    classifier.prepare(line.text for _, lines in page_lines for line in lines)
+    
+    outline = []
+    for page_num, lines in page_lines:
+        outline.extend(classify_page_lines(page_num, lines, classifier, len(outline), pdf_path, level_map))
+    timings["classify"] = time.perf_counter() - start
+    
+    return title, outline
+
+def add_to_histogram(histogram: FontHistogram, lines: List[TextLine]) -> None:
+    for line in lines:
+        histogram.add(line.font_size, line.is_bold, len(line.text))
+
+def document_level_map(doc, page_numbers: range = None) -> LevelMap:
+    """
+    Statistics pass over a whole document (or the selected page numbers),
+    for streaming where levels must be known before the first page is
+    classified. Costs one extra parse per page.
+    """
+    histogram = FontHistogram()
+    for page_num in page_numbers if page_numbers is not None else range(1, doc.page_count + 1):
+        if page_num == 1:
+            continue  # Page 1 only provides the title
+        try:
+            add_to_histogram(histogram, PageIndex(doc[page_num - 1]).text_lines())
+        except Exception as e:
+            logger.warning(f"Error reading font statistics on page {page_num}: {e}")
+    return histogram.level_map()
+
+def iter_outline(pdf_path: str, options: ExtractionOptions = None) -> Iterator[Tuple[str, Any]]:
+    """
+    Stream the outline of a PDF page by page.
+    Yields ("strategy", "bookmarks" or "layout") first, ("title", title)
+    once the first page has been read, then ("heading", entry) for every
+    heading as soon as its page is classified. Only the current page is
+    held in memory, and only the pages selected by the options are visited.
+    """
+    options = options or ExtractionOptions()
+    try:
+        doc = fitz.open(pdf_path)
+    except Exception as e:
+        logger.error(f"Failed to open PDF {pdf_path}: {e}")
+        yield "title", None
+        return
+    
+    title = first_page_title(doc, pdf_path)
+    page_numbers = options.page_numbers(doc.page_count)
+    if options.outline_source == "auto":
+        outline = bookmark_outline(doc, title, page_numbers)
+        if outline is not None:
+            doc.close()
+            yield "strategy", "bookmarks"
+            yield "title", title
+            for entry in outline:
+                yield "heading", entry
+            return
+    
+    yield "strategy", "layout"
+    yield "title", title
+    classifier = make_classifier(options.classifier_mode)
+    headings_found = 0
+    
+    with doc:
+        level_map = document_level_map(doc, page_numbers) if options.level_strategy == "font-stats" else None
+        for page_num in page_numbers:
+            if page_num == 1:
+                continue  # Page 1 only provides the title
+            lines = []
+            try:
+                index = PageIndex(doc[page_num - 1])
+                if index.blocks:
+                    lines = index.text_lines()
+            except Exception as e:
+                logger.warning(f"Error processing page {page_num} of {pdf_path}: {e}")
             
-            lines = defaultdict(list)
-            for block in blocks:
-                if block[6] != 0:
-                    continue
-                y_coord = round(block[1], 1)
-                lines[y_coord].append(block)
+            if lines:
+                classifier.prepare(line.text for line in lines)
+                entries = classify_page_lines(page_num, lines, classifier, headings_found, pdf_path, level_map)
+                # The memo only serves this page, so memory stays flat however long the document
+                classifier.clear()
+                for entry in entries:
+                    headings_found += 1
+                    yield "heading", entry
+
+def make_classifier(classifier_mode: str) -> HeadingClassifier:
+    return HeadingClassifier(classifier_mode, nlp=None if classifier_mode == "regex" else get_nlp())
+
+def classify_page_lines(page_num: int, lines: List[TextLine], classifier: HeadingClassifier,
+                        headings_so_far: int = 0, pdf_path: str = "", level_map: LevelMap = None) -> List[Dict]:
+    """
+    Assign heading levels to the visual lines of one page.
+    headings_so_far counts headings found on earlier pages, since with the
+    fixed thresholds the first heading of a document is always H1. With a
+    level map, levels come from the document's font-size clusters instead.
+    """
+    headings = []
+    toc_detected = False
+    toc_active = False  # Track TOC context on this page
+    toc_subentry_count = 0  # Track numbered lines after TOC
+    for line in lines:
+        line_text = line.text
+        font_size, is_bold, is_italic = line.font_size, line.is_bold, line.is_italic
+        try:
+            # Update TOC context
+            if line_text.strip().lower() == "table of contents":
+                toc_detected = True
+                toc_active = True
+                toc_subentry_count = 0
+                continue
             
-            toc_detected = False
-            toc_subentry_count = toc_context.get(page_num, {}).get('count', 0)  # Track numbered lines after TOC
-            for y, block_list in sorted(lines.items()):
-                line_text = " ".join(b[4].strip().replace('\n', ' ') for b in block_list).strip()
-                if not line_text:
-                    continue
-                
-                try:
-                    dict_text = page.get_text("dict", clip=block_list[0][:4])
-                    spans = dict_text.get("blocks", [{}])[0].get("lines", [{}])[0].get("spans", [])
-                    font_info = spans[0] if spans else {"size": 12, "flags": 0}
-                    font_size = font_info.get("size", 12)
-                    is_bold = font_info.get("flags", 0) & 16 or 'bold' in font_info.get("font", "").lower()
-                    is_italic = font_info.get("flags", 0) & 2 or 'italic' in font_info.get("font", "").lower()
-                    
-                    # Update TOC context
-                    if line_text.strip().lower() == "table of contents":
-                        toc_detected = True
-                        toc_context[page_num] = {'active': True, 'count': 0}
+            if is_heading_text(line_text, font_size, is_bold, is_italic, line.spans, toc_active, classifier) and line.left_aligned:
+                # A bold "1. Short" line is covered by the bold-or-italic numbered rule
+                is_numbered_item = bool(NUMBERED_ITEM.match(line_text))
+                is_numbered_h3 = bool(PHASE_LABEL.match(line_text) or (is_numbered_item and (is_bold or is_italic)))
+                if level_map is not None:
+                    level = level_map.level_for(font_size, is_bold) or ("H3" if is_numbered_h3 else None)
+                    if level is None:
                         continue
-                    
-                    if is_heading_text(line_text, font_size, is_bold, is_italic, spans, toc_context.get(page_num, {}).get('active', False)) and block_list[0][0] < page.rect.width / 4:
-                        if not outline or (font_size >= 18 and is_bold and len(line_text.split()) < 10):
-                            level = "H1"
-                            # Reset TOC context when a new H1 is detected
-                            if page_num in toc_context:
-                                toc_context[page_num]['active'] = False
-                        elif 12 <= font_size < 18:
-                            level = "H2"
-                        elif (10.5 <= font_size < 12 and len(line_text.split()) < 10) or \
-                             re.match(r'^\s*Phase\s+[IVXLC]+\s*:', line_text, re.IGNORECASE) or \
-                             (re.match(r'^\s*\d+\.\s', line_text) and (is_bold or is_italic)) or \
-                             (re.match(r'^\s*\d+\.\s', line_text) and not re.search(r'\d\.\d', line_text) and len(line_text.split()) < 5 and is_bold):
-                            level = "H3"
-                        else:
-                            continue
-                        
-                        outline.append({
-                            "level": level,
-                            "text": line_text,
-                            "page": page_num
-                        })
-                        # Increment and limit TOC subentry count
-                        if toc_detected and re.match(r'^\s*\d+\.\s', line_text) and len(line_text.split()) < 10:
-                            toc_subentry_count += 1
-                            toc_context[page_num] = {'active': True, 'count': toc_subentry_count}
-                            if toc_subentry_count >= 5:  # Limit TOC context to first 5 numbered lines
-                                toc_context[page_num]['active'] = False
-                except Exception as e:
-                    logger.warning(f"Error processing line on page {page_num} of {pdf_path}: {e}")
+                elif not (headings_so_far or headings) or (font_size >= 18 and is_bold and len(line_text.split()) < 10):
+                    level = "H1"
+                elif 12 <= font_size < 18:
+                    level = "H2"
+                elif (10.5 <= font_size < 12 and len(line_text.split()) < 10) or is_numbered_h3:
+                    level = "H3"
+                else:
                     continue
+                
+                if level == "H1":
+                    # Reset TOC context when a new H1 is detected
+                    toc_active = False
+                
+                headings.append({
+                    "level": level,
+                    "text": line_text,
+                    "page": page_num
+                })
+                # Increment and limit TOC subentry count
+                if toc_detected and is_numbered_item and len(line_text.split()) < 10:
+                    toc_subentry_count += 1
+                    toc_active = toc_subentry_count < 5  # Limit TOC context to first 5 numbered lines
         except Exception as e:
-            logger.warning(f"Error processing page {page_num} of {pdf_path}: {e}")
+            logger.warning(f"Error processing line on page {page_num} of {pdf_path}: {e}")
+            continue
+    return headings
+
+def write_outline_json(output_file: Path, title: Union[str, None], outline: List[Dict]) -> None:
+    """
+    Write an outline file, via a temporary file and rename so a killed
+    worker never leaves a truncated file behind.
+    """
+    output = {
+        "title": title or "",
+        "outline": outline
+    }
+    tmp_file = output_file.with_name(f".{output_file.name}.{os.getpid()}.tmp")
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(output, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_file, output_file)
+
+def stream_pdf_file(pdf_path: str, output_file: Path, options: ExtractionOptions = None,
+                    cache: ResultCache = None, info: Dict[str, Any] = None) -> tuple[bool, bool]:
+    """
+    Stream the outline of one PDF into output_file (plus a live .ndjson file).
+    A cache hit is written directly; on a miss the finished file is cached.
+    Returns (produced, cache_hit); the strategy used goes to info["strategy"].
+    """
+    options = options or ExtractionOptions()
+    info = info if info is not None else {}
+    key = None
+    if cache is not None:
+        key = cache.key_for(pdf_path, options.cache_config())
+        cached = cache.get(key)
+        if cached is not None:
+            info["strategy"] = cached.get("strategy")
+            write_outline_json(output_file, cached["title"], cached["outline"])
+            return True, True
     
-    doc.close()
-    return title, outline
+    with OutlineWriter(output_file) as writer:
+        for kind, value in iter_outline(pdf_path, options):
+            if kind == "strategy":
+                info["strategy"] = value
+            elif kind == "title":
+                writer.write_title(value, info.get("strategy"))
+            else:
+                writer.write_heading(value)
+    
+    if writer.produced and key is not None:
+        with open(output_file, 'r', encoding='utf-8') as f:
+            result = json.load(f)
+        cache.put(key, {"title": result["title"] or None, "outline": result["outline"], "strategy": info.get("strategy")})
+    return writer.produced, False
+
+def process_pdf_file(pdf_path: str, output_dir: str, options: ExtractionOptions = None,
+                     cache: ResultCache = None, stream: bool = False) -> tuple[str, Dict[str, Any]]:
+    """
+    Extract the outline of one PDF and write it to output_dir as JSON.
+    With stream=True headings are written page by page as they are found.
+    Returns the status, one of "success", "cached" (served from the result
+    cache), "empty" (nothing detected) or "failed", and the summary details
+    {"strategy": "bookmarks" or "layout"}.
+    """
+    options = options or ExtractionOptions()
+    pdf_file = Path(pdf_path)
+    output_file = Path(output_dir) / pdf_file.with_suffix('.json').name
+    info = {"strategy": None}
+    logger.info(f"Processing {pdf_file.name}")
+    try:
+        cache_hit = False
+        if stream:
+            produced, cache_hit = stream_pdf_file(str(pdf_file), output_file, options, cache, info)
+        else:
+            if cache is not None:
+                title, outline, cache_hit = cached_extract_headings(str(pdf_file), options, cache, info)
+            else:
+                timings = {}
+                title, outline = extract_headings(str(pdf_file), options, timings=timings, info=info)
+                logger.debug(f"Phase timings for {pdf_file.name}: " + ", ".join(f"{k} {v:.3f}s" for k, v in timings.items()))
+            produced = bool(title or outline)
+            if produced:
+                write_outline_json(output_file, title, outline)
+        if produced:
+            logger.info(f"Successfully processed {pdf_file.name} from {info['strategy']}{' (cached)' if cache_hit else ''}")
+            return ("cached" if cache_hit else "success"), info
+        logger.info(f"No title or headings detected in {pdf_file.name}")
+        return "empty", info
+    except Exception as e:
+        logger.error(f"Error processing {pdf_file.name}: {e}")
+        return "failed", info
 
-def process_pdfs(input_dir: str, output_dir: str) -> None:
+def init_worker(options: ExtractionOptions) -> None:
+    """
+    Per-process initializer for parallel runs: load the spaCy pipeline once
+    per worker so no file pays for it.
+    """
+    if options.classifier_mode != "regex":
+        get_nlp()
+
+def process_pdfs(input_dir: str, output_dir: str, options: ExtractionOptions = None,
+                 workers: int = 1, chunk_size: int = 1, timeout: float = None,
+                 cache: ResultCache = None, stream: bool = False) -> Union[Dict, None]:
     """
     Process all PDFs from input_dir and save outlines to output_dir as JSON.
+    With workers > 1 files are spread across processes; a per-file timeout
+    only applies in that mode. With stream=True each outline is written
+    page by page (see stream_pdf_file). Returns the batch summary, with
+    per-file outline strategies and their counts under "by_strategy".
     """
+    options = options or ExtractionOptions()
     input_path = Path(input_dir)
     output_path = Path(output_dir)
     
     if not input_path.exists():
         logger.error(f"Input directory {input_dir} does not exist")
-        return
+        return None
     
     output_path.mkdir(parents=True, exist_ok=True)
+    pdf_files = sorted(str(p) for p in input_path.glob("*.pdf"))
     
-    for pdf_file in input_path.glob("*.pdf"):
-        logger.info(f"Processing {pdf_file.name}")
-        try:
-            title, outline = extract_headings(str(pdf_file))
-            if title or outline:
-                output = {
-                    "title": title or "",
-                    "outline": outline
-                }
-                output_file = output_path / pdf_file.with_suffix('.json').name
-                with open(output_file, 'w', encoding='utf-8') as f:
-                    json.dump(output, f, indent=2, ensure_ascii=False)
-                logger.info(f"Successfully processed {pdf_file.name}")
-            else:
-                logger.info(f"No title or headings detected in {pdf_file.name}")
-        except Exception as e:
-            logger.error(f"Error processing {pdf_file.name}: {e}")
+    if workers > 1:
+        summary = run_batch(pdf_files, process_pdf_file, (str(output_path), options, cache, stream),
+                            workers=workers, chunk_size=chunk_size, timeout=timeout,
+                            initializer=init_worker, initargs=(options,))
+    else:
+        summary = BatchSummary()
+        for pdf_file in pdf_files:
+            start = time.perf_counter()
+            status, details = process_pdf_file(pdf_file, str(output_path), options, cache, stream)
+            summary.record(Path(pdf_file).name, status, time.perf_counter() - start, details=details)
+    
+    result = summary.log()
+    strategies: Dict[str, int] = {}
+    for f in summary.files:
+        if f.get("strategy"):
+            strategies[f["strategy"]] = strategies.get(f["strategy"], 0) + 1
+    result["by_strategy"] = strategies
+    logger.info(f"Outline sources: {strategies}")
+    return result
+
+def parse_page_range(text: str) -> Tuple[int, Union[int, None]]:
+    """Parse "5", "5-20", "5-" or "-20" into a 1-based inclusive (first, last) range."""
+    try:
+        first, sep, last = text.partition("-")
+        first = int(first) if first.strip() else 1
+        last = (int(last) if last.strip() else None) if sep else first
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid page range '{text}', expected e.g. 5-20")
+    if first < 1 or (last is not None and last < first):
+        raise argparse.ArgumentTypeError(f"invalid page range '{text}', expected 1 <= first <= last")
+    return first, last
+
+def positive_int(text: str) -> int:
+    """Parse a whole number of at least 1."""
+    try:
+        value = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid value '{text}', expected a whole number")
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"invalid value '{text}', expected at least 1")
+    return value
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Extract titles and H1/H2/H3 outlines from PDFs as JSON.")
+    parser.add_argument("input_dir", nargs="?", default="./app/input", help="Directory of PDFs to process")
+    parser.add_argument("output_dir", nargs="?", default="./app/output", help="Directory for JSON outlines")
+    parser.add_argument("--classifier", choices=CLASSIFIER_MODES, default=DEFAULT_CLASSIFIER_MODE,
+                        help="Heading tokenization mode: per-line spaCy, batched spaCy, or regex without spaCy")
+    parser.add_argument("--levels", choices=LEVEL_STRATEGIES, default="fixed",
+                        help="Heading level assignment: fixed font-size thresholds or per-document font statistics")
+    parser.add_argument("--outline-source", choices=OUTLINE_SOURCES, default="auto",
+                        help="Use embedded bookmarks when they look like an outline (auto), or always analyse the layout")
+    parser.add_argument("--pages", type=parse_page_range, default=(1, None),
+                        help="Page range to outline, e.g. 1-20 or 5- (page 1 is always read for the title)")
+    parser.add_argument("--max-pages", type=positive_int, default=None, help="Visit at most this many pages of the range")
+    parser.add_argument("--stride", type=positive_int, default=1, help="Visit every N-th page of the range, for quick previews")
+    parser.add_argument("--workers", type=int, default=1, help="Number of worker processes (1 = serial)")
+    parser.add_argument("--chunk-size", type=int, default=1, help="Files handed to a worker at a time")
+    parser.add_argument("--timeout", type=float, default=None, help="Per-file timeout in seconds (parallel mode)")
+    parser.add_argument("--log-file", default=os.environ.get("PDF_EXTRACTION_LOG"),
+                        help=f"Also write logs to this file (e.g. {DEFAULT_LOG_FILE})")
+    parser.add_argument("--stream", action="store_true",
+                        help="Write headings page by page, with a live <name>.ndjson next to each JSON")
+    parser.add_argument("--cache-dir", default=None, help="Directory of the result cache (disabled when omitted)")
+    parser.add_argument("--cache-max-mb", type=float, default=DEFAULT_MAX_BYTES / (1024 * 1024),
+                        help="Size limit of the result cache in MB before LRU eviction")
+    parser.add_argument("--refresh-cache", action="store_true", help="Recompute every file and overwrite its cache entry")
+    parser.add_argument("--clear-cache", action="store_true", help="Empty the result cache before processing")
+    return parser.parse_args(argv)
 
 if __name__ == "__main__":
-    process_pdfs("./app/input", "./app/output")
\ No newline at end of file
+    args = parse_args()
+    configure_logging(args.log_file)
+    cache = None
+    if args.cache_dir:
+        cache = ResultCache(args.cache_dir, max_bytes=int(args.cache_max_mb * 1024 * 1024), refresh=args.refresh_cache)
+        if args.clear_cache:
+            logger.info(f"Cleared {cache.clear()} cache entries")
+    options = ExtractionOptions(classifier_mode=args.classifier, level_strategy=args.levels,
+                                outline_source=args.outline_source, page_range=args.pages,
+                                max_pages=args.max_pages, stride=args.stride)
+    process_pdfs(args.input_dir, args.output_dir, options,
+                 workers=args.workers, chunk_size=args.chunk_size, timeout=args.timeout,
+                 cache=cache, stream=args.stream)
\ No newline at end of file
@@ -0,0 +1,162 @@
+"""
+On-disk cache of heading extraction results.
+Entries are keyed by the PDF's content hash plus the extractor version and
+configuration, one JSON file per entry. Writes go to a temporary file and
+are renamed into place, so concurrent batch workers never see partial
+entries. Access times are tracked through file mtimes for LRU eviction
+once the cache grows past its size limit.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def content_hash(file_path: str) -> str:
+    """SHA-256 of a file's bytes, read in chunks."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Size-bounded LRU cache of extraction results stored in a directory"""
+
+    def __init__(self, cache_dir: str, max_bytes: int = DEFAULT_MAX_BYTES, refresh: bool = False):
+        """
+        Args:
+            cache_dir: Directory holding the cache entries (created if missing)
+            max_bytes: Total entry size above which least recently used entries are evicted
+            refresh: Ignore existing entries on lookup but still store new results
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.refresh = refresh
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self._approx_bytes: Optional[int] = None
+
+    def key_for(self, file_path: str, config: Dict[str, Any]) -> str:
+        """Cache key: content hash of the file plus a hash of the extractor config."""
+        config_hash = hashlib.sha256(json.dumps(config, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+        return f"{content_hash(file_path)}-{config_hash}"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached value for key, or None on a miss."""
+        entry = self._entry_path(key)
+        if self.refresh:
+            self.misses += 1
+            return None
+        try:
+            with open(entry, "r", encoding="utf-8") as f:
+                value = json.load(f)
+            os.utime(entry)  # Mark as recently used
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Discarding unreadable cache entry {entry.name}: {e}")
+            self._remove(entry)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        """Store value under key atomically, then evict if over the size limit."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=".tmp-", suffix=".json")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(value, f, ensure_ascii=False)
+            os.chmod(tmp_path, 0o644)
+            size = os.path.getsize(tmp_path)
+            os.replace(tmp_path, self._entry_path(key))
+        except BaseException:
+            self._remove(Path(tmp_path))
+            raise
+        self.writes += 1
+
+        if self._approx_bytes is None:
+            self._approx_bytes = self._total_bytes()
+        else:
+            self._approx_bytes += size
+        if self._approx_bytes > self.max_bytes:
+            self._evict()
+
+    def invalidate(self, file_path: str) -> int:
+        """Remove every entry for a file, whatever config it was stored under."""
+        removed = 0
+        for entry in self.cache_dir.glob(f"{content_hash(file_path)}-*.json"):
+            removed += self._remove(entry)
+        return removed
+
+    def clear(self) -> int:
+        """Remove all entries."""
+        removed = 0
+        for entry in self._entries():
+            removed += self._remove(Path(entry.path))
+        self._approx_bytes = 0
+        return removed
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "writes": self.writes, "evictions": self.evictions}
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def _entries(self) -> Iterator[os.DirEntry]:
+        """Committed entries, leaving out the temporary files of writes in progress."""
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(".json") and not entry.name.startswith(".tmp-"):
+                yield entry
+
+    def _total_bytes(self) -> int:
+        total = 0
+        for entry in self._entries():
+            try:
+                total += entry.stat().st_size
+            except FileNotFoundError:
+                continue
+        return total
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        for entry in self._entries():
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue  # Removed by another writer
+            entries.append((stat.st_mtime, stat.st_size, Path(entry.path)))
+        entries.sort()
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if self._remove(path):
+                self.evictions += 1
+            total -= size
+        self._approx_bytes = total
+
+    @staticmethod
+    def _remove(path: Path) -> int:
+        try:
+            path.unlink()
+            return 1
+        except FileNotFoundError:
+            return 0
@@ -0,0 +1,59 @@
+"""
+Helpers shared by the benchmarks: the bundled collections and timing.
+Importing this module puts the package root on sys.path, so benchmarks
+import it before anything from src, process_pdfs or utils.
+"""
+
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+class Collection(NamedTuple):
+    """A bundled collection: its directory, input config and PDF paths in config order"""
+    name: str
+    directory: Path
+    config: Dict[str, Any]
+    pdf_paths: List[Path]
+
+    @property
+    def persona(self) -> Dict[str, str]:
+        return self.config["persona"]
+
+    @property
+    def job(self) -> Dict[str, str]:
+        return self.config["job_to_be_done"]
+
+
+def bundled_collections() -> Iterator[Collection]:
+    """The "Collection N" directories next to process_pdfs.py, in name order."""
+    for input_json in sorted(ROOT.glob("Collection */challenge1b_input.json")):
+        config = json.loads(input_json.read_text(encoding="utf-8"))
+        pdf_paths = [input_json.parent / "PDFs" / d["filename"] for d in config["documents"]]
+        yield Collection(input_json.parent.name, input_json.parent, config, pdf_paths)
+
+
+def timed(run: Callable[[], Any], repeat: int = 1) -> Tuple[Any, float]:
+    """Result of the last of repeat runs of run(), and the mean seconds per run."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = run()
+    return result, (time.perf_counter() - start) / repeat
+
+
+def traced(run: Callable[[], Any]) -> Tuple[Any, float, int]:
+    """Result, seconds and traced peak bytes of one run()."""
+    tracemalloc.start()
+    try:
+        result, elapsed = timed(run)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, elapsed, peak
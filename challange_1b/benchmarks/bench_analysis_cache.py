@@ -0,0 +1,56 @@
+"""
+Benchmark the persistent analysis cache: time to answer a persona query over
+each bundled collection without a cache, with a cold cache (analysis plus
+store) and with a warm cache, where only persona scoring and ranking re-run.
+Also reports the on-disk cache size against the extracted text size.
+
+Usage: python benchmarks/bench_analysis_cache.py [--repeat R]
+Exits with status 1 if cached results differ from uncached ones.
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+from _common import bundled_collections, timed
+from src.analysis_cache import AnalysisCache
+from src.collection_analyzer import CollectionAnalyzer
+
+
+def timed_query(analyzer: CollectionAnalyzer, collection, repeat: int = 1):
+    return timed(lambda: analyzer.analyze_collection(collection.pdf_paths, collection.persona, collection.job), repeat)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    mismatches = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = AnalysisCache(str(Path(tmp) / "analysis.sqlite"))
+        for collection in bundled_collections():
+            uncached, t_uncached = timed_query(CollectionAnalyzer(workers=1, keep_text=True), collection)
+            cached_analyzer = CollectionAnalyzer(workers=1, keep_text=True, cache=cache)
+            cold, t_cold = timed_query(cached_analyzer, collection)
+            warm, t_warm = timed_query(cached_analyzer, collection, args.repeat)
+
+            if cold["sections"] != uncached["sections"] or warm["sections"] != uncached["sections"] or any(
+                    list(a["pages"]) != list(b["pages"]) for a, b in zip(warm["documents"], uncached["documents"])):
+                mismatches += 1
+                print(f"MISMATCH on {collection.name}")
+            print(f"{collection.name:<14} {len(collection.pdf_paths):3d} docs  no cache {t_uncached * 1000:8.1f}ms  "
+                  f"cold {t_cold * 1000:8.1f}ms  warm {t_warm * 1000:8.1f}ms  {t_uncached / t_warm:5.1f}x")
+
+        text_bytes = sum(len(json.dumps(d["full_text"])) for d in uncached["documents"])
+        mb = 1024 * 1024
+        print(f"cache: {cache.stats()}  {cache.total_bytes() / mb:.2f}MB stored "
+              f"(last collection text alone {text_bytes / mb:.2f}MB)")
+        cache.close()
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
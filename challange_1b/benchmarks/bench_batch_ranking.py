@@ -0,0 +1,96 @@
+"""
+Benchmark ranking one collection's sections for N persona/job queries:
+process_with_persona plus rank_sections per query, copying every section
+twice per query (before), against one BatchRanker pass over a section x
+query matrix returning references (after). Reports time per batch and per
+query as N grows, and traced peak memory.
+
+Usage: python benchmarks/bench_batch_ranking.py [--queries N ...] [--top-k K] [--copies C] [--seed S]
+Exits with status 1 if any ranked list or persona annotation differs, or
+if a top-k of zero or less returns any section.
+"""
+
+import argparse
+import random
+import sys
+
+from _common import bundled_collections, traced
+from src.batch_ranker import BatchRanker
+from src.collection_analyzer import CollectionAnalyzer
+
+ROLES = ["Travel Planner", "PhD Researcher in Computational Biology", "Investment Analyst", "HR professional",
+         "Undergraduate Chemistry Student", "Food Contractor", "High school teacher", "Startup founder",
+         "Operations manager", "Research Analyst"]
+TASKS = ["Plan a trip of 4 days for a group of 10 college friends.",
+         "Create and manage fillable forms for onboarding and compliance.",
+         "Prepare a vegetarian buffet-style dinner menu for a corporate gathering, including gluten-free items.",
+         "Summarize the key findings and compare the options",
+         "Review the concepts and practice exercises for the exam",
+         "Analyze revenue trends, investment strategies and market positioning",
+         "Prepare a comprehensive literature review focusing on methodologies and datasets"]
+PERSONA_FIELDS = ("persona_relevance_score", "persona_insights", "key_concepts", "persona_priority", "job_alignment_score")
+
+
+def per_query_rankings(collection, sections, queries, top_k):
+    """Previous path: persona-process and rank copies of every section, once per query."""
+    rankings = []
+    for persona, job in queries:
+        plan = collection.persona_processor.plan_query(persona, job)
+        processed = collection.persona_processor.process_with_persona({"sections": sections}, persona, job, plan)
+        ranked = collection.section_ranker.rank_sections(processed["sections"], persona, job, query_plan=plan)
+        rankings.append([(s["section_id"], s["relevance_score"], tuple(repr(s[f]) for f in PERSONA_FIELDS))
+                         for s in ranked[:top_k]])
+    return rankings
+
+
+def batch_rankings(collection, sections, queries, top_k):
+    plans = [collection.persona_processor.plan_query(persona, job) for persona, job in queries]
+    rankings = BatchRanker(collection.persona_processor, collection.section_ranker).rank(sections, plans, top_k)
+    return [[(entry.section["section_id"], entry.score, tuple(repr(entry.persona[f]) for f in PERSONA_FIELDS))
+             for entry in ranking] for ranking in rankings]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--queries", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--copies", type=int, default=4, help="Times each collection's sections are replicated")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    mismatches = 0
+    for bundled in bundled_collections():
+        collection = CollectionAnalyzer(workers=1)
+        originals = [section for analysis in collection.analyze_documents(bundled.pdf_paths)
+                     for section in analysis["sections"]]
+        sections = [dict(originals[i % len(originals)], section_id=f"section_{i}")
+                    for i in range(len(originals) * args.copies)]
+        for section in sections:
+            tokens = collection.token_cache.tokens(section)
+            tokens.word_frequencies, tokens.content_word_set, tokens.long_words  # tokenize up front
+        print(f"{bundled.name}: {len(sections)} sections")
+
+        # Like rank_sections and the top_k of the index and scoring engine, k <= 0 ranks nothing
+        plan = collection.persona_processor.plan_query(bundled.persona, bundled.job)
+        for top_k in (0, -1):
+            if BatchRanker(collection.persona_processor, collection.section_ranker).rank(sections, [plan], top_k) != [[]]:
+                mismatches += 1
+                print(f"  MISMATCH: top-k {top_k} returned sections")
+
+        for n in args.queries:
+            queries = [(bundled.persona, bundled.job)]
+            queries += [({"role": rng.choice(ROLES)}, {"task": rng.choice(TASKS)}) for _ in range(n - 1)]
+            expected, t_before, peak_before = traced(lambda: per_query_rankings(collection, sections, queries, args.top_k))
+            actual, t_after, peak_after = traced(lambda: batch_rankings(collection, sections, queries, args.top_k))
+            if expected != actual:
+                mismatches += 1
+                print(f"  MISMATCH for {n} queries")
+            print(f"  {n:3d} queries  per query {t_before * 1000:8.1f}ms ({t_before / n * 1000:6.1f}ms/query, "
+                  f"{peak_before / 1e6:6.1f}MB)  batch {t_after * 1000:7.1f}ms ({t_after / n * 1000:5.2f}ms/query, "
+                  f"{peak_after / 1e6:5.1f}MB)  {t_before / t_after:5.1f}x")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
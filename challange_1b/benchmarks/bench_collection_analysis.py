@@ -0,0 +1,71 @@
+"""
+Benchmark CollectionAnalyzer: wall time to analyze, persona-score and rank
+a whole collection with one worker (sequential, as before) against a
+process pool. Runs on the bundled collections and on a synthetic collection
+of many PDFs, and checks every worker count gives the same ranked output.
+
+Usage: python benchmarks/bench_collection_analysis.py [--workers N ...] [--synthetic-docs D] [--pages P]
+Exits with status 1 if the ranked sections differ between worker counts.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import fitz  # PyMuPDF
+
+from _common import bundled_collections, timed
+from src.collection_analyzer import CollectionAnalyzer
+from bench_section_detection import synthetic_pages
+
+SYNTHETIC_PERSONA = {"role": "Travel Planner"}
+SYNTHETIC_JOB = {"task": "Plan a trip of 4 days for a group of 10 college friends"}
+
+
+def make_pdf(path: Path, pages: int, seed: int) -> None:
+    doc = fitz.open()
+    for text in synthetic_pages(pages, 50, seed):
+        doc.new_page().insert_text((36, 40), text, fontsize=7)
+    doc.save(path)
+    doc.close()
+
+
+def run(label: str, pdf_paths, persona, job, worker_counts) -> int:
+    results = {}
+    for workers in worker_counts:
+        result, elapsed = timed(lambda: CollectionAnalyzer(workers=workers).analyze_collection(pdf_paths, persona, job))
+        slowest = max(result["metadata"]["documents"], key=lambda d: d["analysis_seconds"])
+        print(f"{label:<28} {len(pdf_paths):3d} docs  workers {workers:2d}  {elapsed:7.3f}s  "
+              f"{len(result['sections']):5d} sections  slowest {slowest['filename']} "
+              f"{slowest['analysis_seconds']:.3f}s")
+        results[workers] = result["sections"]
+    if any(sections != results[worker_counts[0]] for sections in results.values()):
+        print(f"MISMATCH on {label}")
+        return 1
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({1, os.cpu_count() or 1}))
+    parser.add_argument("--synthetic-docs", type=int, default=50)
+    parser.add_argument("--pages", type=int, default=40)
+    args = parser.parse_args()
+
+    mismatches = 0
+    for collection in bundled_collections():
+        mismatches += run(collection.name, collection.pdf_paths, collection.persona, collection.job, args.workers)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_paths = []
+        for i in range(args.synthetic_docs):
+            pdf_paths.append(Path(tmp) / f"synthetic_{i:03d}.pdf")
+            make_pdf(pdf_paths[-1], args.pages, seed=i)
+        mismatches += run(f"synthetic x{args.pages} pages", pdf_paths, SYNTHETIC_PERSONA, SYNTHETIC_JOB, args.workers)
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
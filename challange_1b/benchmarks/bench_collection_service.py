@@ -0,0 +1,122 @@
+"""
+Drive CollectionService in-process with hundreds of concurrent synthetic
+jobs over the bundled collections and generated ones: throughput, queue
+depth, per-job latency histograms, and how many jobs a burst of
+submit_nowait calls gets turned away. Every job's ranked sections are
+checked against a synchronous CollectionAnalyzer run of the same query.
+
+Usage: python benchmarks/bench_collection_service.py [--jobs N] [--workers W] [--max-pending P]
+Exits with status 1 if a job fails or ranks differently from the synchronous run.
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from _common import bundled_collections
+from bench_collection_analysis import make_pdf
+from src.collection_analyzer import CollectionAnalyzer
+from src.collection_service import CollectionService
+
+TOP_K_SECTIONS = 5
+SYNTHETIC_QUERIES = [
+    ({"role": "Travel Planner"}, {"task": "Plan a trip of 4 days for a group of 10 college friends"}),
+    ({"role": "Research Analyst"}, {"task": "Summarize the key findings and compare the options"}),
+    ({"role": "Graduate student"}, {"task": "Review the concepts and practice exercises for the exam"}),
+]
+
+
+def collections(tmp: Path, synthetic: int, docs: int, pages: int):
+    """(name, pdf paths, queries) for the bundled collections and synthetic ones."""
+    found = []
+    for collection in bundled_collections():
+        pdf_paths = [str(path) for path in collection.pdf_paths]
+        found.append((collection.name, pdf_paths, [(collection.persona, collection.job)] + SYNTHETIC_QUERIES))
+    for c in range(synthetic):
+        pdf_paths = []
+        for d in range(docs):
+            path = tmp / f"synthetic_{c}_{d}.pdf"
+            make_pdf(path, pages, seed=c * docs + d)
+            pdf_paths.append(str(path))
+        found.append((f"synthetic {c}", pdf_paths, SYNTHETIC_QUERIES))
+    return found
+
+
+def print_histogram(name, summary):
+    print(f"  {name:<7} p50 {summary['p50_seconds'] * 1000:8.1f}ms  p90 {summary['p90_seconds'] * 1000:8.1f}ms  "
+          f"p99 {summary['p99_seconds'] * 1000:8.1f}ms  max {summary['max_seconds'] * 1000:8.1f}ms")
+    largest = max(summary["buckets"].values())
+    for label, count in summary["buckets"].items():
+        if count:
+            print(f"    {label:>9} {count:5d} {'#' * max(1, round(40 * count / largest))}")
+
+
+async def drive(jobs, args):
+    async with CollectionService(workers=args.workers, max_pending=args.max_pending,
+                                 top_k_sections=TOP_K_SECTIONS) as service:
+        start = time.perf_counter()
+        results = await asyncio.gather(*(service.submit(paths, persona, job) for _, paths, persona, job in jobs),
+                                       return_exceptions=True)
+        elapsed = time.perf_counter() - start
+        stats = service.stats()
+
+        # A burst larger than the queue: submit_nowait turns the excess away
+        burst = await asyncio.gather(*(service.submit_nowait(paths, persona, job)
+                                       for _, paths, persona, job in jobs[:args.max_pending * 2]),
+                                     return_exceptions=True)
+        rejected = sum(isinstance(outcome, asyncio.QueueFull) for outcome in burst)
+    return results, elapsed, stats, len(burst), rejected
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--max-pending", type=int, default=32)
+    parser.add_argument("--synthetic-collections", type=int, default=4)
+    parser.add_argument("--synthetic-docs", type=int, default=5)
+    parser.add_argument("--pages", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        available = collections(Path(tmp), args.synthetic_collections, args.synthetic_docs, args.pages)
+        jobs = []
+        for _ in range(args.jobs):
+            name, pdf_paths, queries = rng.choice(available)
+            persona, job = rng.choice(queries)
+            jobs.append((name, pdf_paths, persona, job))
+
+        results, elapsed, stats, burst, rejected = asyncio.run(drive(jobs, args))
+
+        expected = {}
+        reference = CollectionAnalyzer(workers=1)
+        failures = mismatches = 0
+        for (name, pdf_paths, persona, job), result in zip(jobs, results):
+            if isinstance(result, BaseException):
+                failures += 1
+                print(f"FAILED {name} / {persona['role']}: {result}")
+                continue
+            key = (name, persona["role"], job["task"])
+            if key not in expected:
+                expected[key] = reference.analyze_collection(pdf_paths, persona, job)["sections"][:TOP_K_SECTIONS]
+            if result["sections"] != expected[key]:
+                mismatches += 1
+                print(f"MISMATCH {name} / {persona['role']}")
+
+    print(f"{len(jobs)} jobs over {len(available)} collections, {stats['workers']} workers, "
+          f"queue of {stats['max_pending']}: {elapsed:.2f}s, {len(jobs) / elapsed:.1f} jobs/s, "
+          f"max queue depth {stats['max_queue_depth']}")
+    for name in ("queued", "run", "total"):
+        print_histogram(name, stats["latency"][name])
+    print(f"burst of {burst} submit_nowait calls: {rejected} rejected with QueueFull")
+    return 1 if failures or mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""
+Benchmark building a document's text buffer on large synthetic PDFs:
+the previous full_text += page_text build with a separate list of page
+dicts (before) against the single-buffer DocumentText (after). Reports
+build time and traced memory (peak and retained).
+
+Usage: python benchmarks/bench_document_text.py [--pages N ...] [--lines-per-page L]
+Exits with status 1 if the two representations disagree.
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import fitz  # PyMuPDF
+
+from _common import timed
+from src.document_text import DocumentText
+
+VOCABULARY = ("itinerary", "beach", "restaurant", "museum", "signature", "export", "form",
+              "recipe", "vegetarian", "budget", "transport", "nightlife", "culture", "history")
+
+
+def make_pdf(path: Path, pages: int, lines_per_page: int, seed: int = 0) -> None:
+    rng = random.Random(seed)
+    doc = fitz.open()
+    for page_num in range(pages):
+        page = doc.new_page()
+        lines = [f"SECTION {page_num + 1}"]
+        lines += [" ".join(rng.choice(VOCABULARY) for _ in range(rng.randint(4, 12))) for _ in range(lines_per_page)]
+        page.insert_text((36, 40), "\n".join(lines), fontsize=9)
+    doc.save(path)
+    doc.close()
+
+
+def legacy_extract(page_texts):
+    """Previous DocumentAnalyzer text extraction, fed pre-extracted page texts."""
+    full_text = ""
+    page_contents = []
+    for page_num, page_text in enumerate(page_texts):
+        full_text += page_text + "\n"
+        page_contents.append({
+            "page_number": page_num + 1,
+            "text": page_text.strip(),
+            "char_count": len(page_text)
+        })
+    return full_text, page_contents
+
+
+def measure(build, page_texts):
+    """Build time, traced peak and retained bytes of one representation."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build(page_texts)
+    elapsed = time.perf_counter() - start
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak, retained
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--lines-per-page", type=int, default=60)
+    args = parser.parse_args()
+
+    mismatches = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        for pages in args.pages:
+            pdf_path = Path(tmp) / f"synthetic_{pages}.pdf"
+            make_pdf(pdf_path, pages, args.lines_per_page)
+            with fitz.open(pdf_path) as doc:
+                page_texts, get_text_seconds = timed(lambda: [page.get_text() for page in doc])
+
+            (full_text, page_contents), t_before, peak_before, kept_before = measure(legacy_extract, page_texts)
+            document, t_after, peak_after, kept_after = measure(DocumentText, page_texts)
+            if document.full_text != full_text or list(document.pages) != page_contents:
+                mismatches += 1
+                print(f"MISMATCH at {pages} pages")
+
+            mb = 1024 * 1024
+            print(f"{pages:5d} pages, {len(full_text) / mb:6.1f}MB text (get_text {get_text_seconds:.2f}s)")
+            print(f"  before  build {t_before * 1000:8.2f}ms  peak {peak_before / mb:7.1f}MB  retained {kept_before / mb:7.1f}MB")
+            print(f"  after   build {t_after * 1000:8.2f}ms  peak {peak_after / mb:7.1f}MB  retained {kept_after / mb:7.1f}MB")
+            del full_text, page_contents, document
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
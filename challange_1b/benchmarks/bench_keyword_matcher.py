@@ -0,0 +1,99 @@
+"""
+Benchmark PersonaProcessor keyword matching on the bundled collections'
+sections: insight rules checked with one substring scan per keyword and
+vocabulary membership tested against lists (before), against one
+KeywordMatcher scan per section and frozensets (after), as the
+vocabularies grow from today's size to thousands of terms.
+
+Usage: python benchmarks/bench_keyword_matcher.py [--vocabulary N ...] [--seed S]
+Exits with status 1 if the two versions report different insights.
+"""
+
+import argparse
+import random
+import sys
+from dataclasses import replace
+
+from _common import bundled_collections, timed
+from src.collection_analyzer import CollectionAnalyzer
+from src.keyword_matcher import InsightRules, KeywordMatcher
+from src.persona_processor import PersonaProcessor
+
+
+def legacy_observations(text, rule_sets):
+    """Previous rule check: every keyword of every rule searched in the text."""
+    observations = []
+    for rules in rule_sets:
+        for keywords, insight in rules.rules:
+            if any(keyword in text for keyword in keywords):
+                observations.append(insight)
+    return observations
+
+
+def matched_observations(matcher, words, rule_sets):
+    found = matcher.matches(words)
+    return [insight for rules in rule_sets for insight in rules.fired(found)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--vocabulary", type=int, nargs="+", default=[1000, 5000])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    collection = CollectionAnalyzer(workers=1)
+    sections = []
+    for bundled in bundled_collections():
+        for analysis in collection.analyze_documents(bundled.pdf_paths):
+            sections.extend(analysis["sections"])
+    tokens = [collection.token_cache.tokens(section) for section in sections]
+    for t in tokens:
+        t.content_word_set  # tokenize up front, only matching is timed
+    print(f"{len(sections)} sections")
+
+    # Every persona/job combination of the processor's own rules must agree
+    processor = PersonaProcessor(collection.token_cache)
+    mismatches = 0
+    for role in list(processor.role_insight_rules) + ["general"]:
+        for task in list(processor.task_insight_rules) + ["general"]:
+            rule_sets = [r for r in (processor.role_insight_rules.get(role), processor.task_insight_rules.get(task)) if r]
+            plan = replace(processor.plan_query({}, {}), role_rules=processor.role_insight_rules.get(role),
+                           task_rules=processor.task_insight_rules.get(task))
+            expected = [legacy_observations(t.lowered, rule_sets) for t in tokens]
+            actual = [processor._extract_role_specific_observations(t, plan) for t in tokens]
+            if expected != actual:
+                mismatches += 1
+                print(f"MISMATCH for {role}/{task}")
+
+    rng = random.Random(args.seed)
+    corpus_words = sorted(set().union(*(t.content_word_set for t in tokens)))
+    builtin_rules = list(processor.role_insight_rules.values()) + list(processor.task_insight_rules.values())
+    vocabularies = [("current", builtin_rules)]
+    for size in args.vocabulary:
+        # Synthetic domain rules of three keywords each, half drawn from the corpus so some fire
+        words = [rng.choice(corpus_words) if i % 2 else "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(4, 10)))
+                 for i in range(size)]
+        vocabularies.append((f"{size} terms", [InsightRules([(words[i:i + 3], f"insight {i}") for i in range(0, size, 3)])]))
+
+    for label, rule_sets in vocabularies:
+        keywords = set().union(*(rules.keywords for rules in rule_sets))
+        keyword_list = sorted(keywords)
+        matcher = KeywordMatcher(keywords)
+        expected, t_before = timed(lambda: [legacy_observations(t.lowered, rule_sets) for t in tokens])
+        actual, t_cold = timed(lambda: [matched_observations(matcher, t.content_word_set, rule_sets) for t in tokens])
+        _, t_warm = timed(lambda: [matched_observations(matcher, t.content_word_set, rule_sets) for t in tokens])
+        _, t_list = timed(lambda: [sum(1 for w in t.content_words if w in keyword_list) for t in tokens])
+        keyword_set = frozenset(keywords)
+        _, t_set = timed(lambda: [sum(1 for w in t.content_words if w in keyword_set) for t in tokens])
+        if expected != actual:
+            mismatches += 1
+            print(f"MISMATCH for {label}")
+        per_section = 1e6 / len(tokens)
+        print(f"{label:<12} {len(keywords):5d} keywords  rules: scan per keyword {t_before * per_section:8.1f}us  "
+              f"matcher {t_cold * per_section:6.1f}us cold {t_warm * per_section:6.1f}us warm  "
+              f"membership: list {t_list * per_section:8.1f}us  frozenset {t_set * per_section:5.1f}us  (per section)")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+"""
+Micro-benchmark the per-line regex predicates of DocumentAnalyzer and the
+PersonaProcessor tokenizers: inline re calls (before) against the
+precompiled bank in src/patterns.py (after), on a synthetic corpus of
+header, list and body lines.
+
+Usage: python benchmarks/bench_patterns.py [--lines N] [--seed S]
+Exits with status 1 if any predicate disagrees between the two versions.
+"""
+
+import argparse
+import random
+import re
+import sys
+
+from _common import timed
+from src.document_analyzer import DocumentAnalyzer
+from src.patterns import WORD, LONG_WORD
+
+TEMPLATES = (
+    "{WORDS}",
+    "{n}. {Words}",
+    "{n} {Words} and {words}.",
+    "{Words}: {words}",
+    "Chapter {n}: {Words}",
+    "Section {n} - {words}",
+    "• {words}",
+    "- {words}",
+    "{n}) {words}",
+    "{Words} {words}, {words}. {Words} {words}.",
+    "{words} {words} {words} {words}",
+    "",
+)
+VOCABULARY = ("beach", "itinerary", "hotel", "restaurant", "methodology", "data", "results",
+              "analysis", "forms", "signature", "export", "recipe", "buffet", "dinner", "vegetarian")
+
+LEGACY_HEADER_PATTERNS = [
+    r'^([A-Z][A-Z\s]{5,40})$',
+    r'^(\d+\.?\s+[A-Z][^.!?]*?)(?:\n|$)',
+    r'^([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*):',
+    r'(?:Chapter|Section)\s+\d+[:\-\s]*(.+)',
+]
+
+
+def synthetic_lines(count: int, seed: int = 0):
+    rng = random.Random(seed)
+
+    def words(k):
+        return " ".join(rng.choice(VOCABULARY) for _ in range(k))
+
+    lines = []
+    for _ in range(count):
+        lines.append(rng.choice(TEMPLATES).format(
+            n=rng.randint(1, 30), words=words(rng.randint(1, 10)),
+            Words=words(rng.randint(1, 4)).title(), WORDS=words(rng.randint(1, 4)).upper()))
+    return lines
+
+
+# Previous inline versions, kept here as the baseline
+def inline_match_header(line):
+    for pattern in LEGACY_HEADER_PATTERNS:
+        match = re.search(pattern, line, re.MULTILINE)
+        if match:
+            title = match.group(1).strip().rstrip(':')
+            if 5 < len(title) < 80:
+                return title
+    return None
+
+
+def inline_is_list_item(line):
+    return bool(re.match(r'^[\•\-\*]\s+.+', line) or re.match(r'^\d+[\.\)]\s+.+', line))
+
+
+def inline_should_stop(line):
+    line = line.strip()
+    if not line:
+        return False
+    return bool(re.match(r'^[A-Z][A-Z\s]{5,}$', line) or re.match(r'^\d+\.?\s+[A-Z]', line))
+
+
+def inline_words(line):
+    return re.findall(r'\b\w+\b', line.lower())
+
+
+def inline_long_words(line):
+    return re.findall(r'\b\w{4,}\b', line.lower())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lines", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    analyzer = DocumentAnalyzer()
+    patterns = analyzer._get_header_patterns()
+    predicates = (
+        ("match_header", inline_match_header, lambda line: analyzer._match_header_patterns(line, patterns)),
+        ("is_list_item", inline_is_list_item, analyzer._is_list_item),
+        ("should_stop", inline_should_stop, lambda line: analyzer._should_stop_content_extraction(line, 0)),
+        ("words", inline_words, lambda line: WORD.findall(line.lower())),
+        ("long_words", inline_long_words, lambda line: LONG_WORD.findall(line.lower())),
+    )
+
+    lines = synthetic_lines(args.lines, args.seed)
+    print(f"{len(lines)} synthetic lines")
+    mismatches = 0
+    total_before = total_after = 0.0
+    for name, before, after in predicates:
+        expected, t_before = timed(lambda: [before(line) for line in lines])
+        actual, t_after = timed(lambda: [after(line) for line in lines])
+        total_before += t_before
+        total_after += t_after
+        if expected != actual:
+            mismatches += 1
+            print(f"MISMATCH {name}")
+        print(f"{name:<13} inline {t_before * 1e9 / len(lines):7.1f} ns/line   "
+              f"compiled {t_after * 1e9 / len(lines):7.1f} ns/line   {t_before / t_after:5.2f}x")
+    print(f"{'total':<13} inline {total_before:7.3f}s        compiled {total_after:7.3f}s        "
+          f"{total_before / total_after:5.2f}x")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""
+Benchmark utils.parser.extract_text_from_pdf on large synthetic PDFs: the
+previous list-building extractor (before) against the lazy generator
+(after), both for a caller keeping the first three pages and for a
+streaming caller reading every page. Reports time and traced peak memory
+(Python allocations only, not MuPDF's own).
+
+Usage: python benchmarks/bench_pdf_parser.py [--pages N ...] [--lines-per-page L]
+Exits with status 1 if the two extractors return different pages.
+"""
+
+import argparse
+import sys
+import tempfile
+from pathlib import Path
+
+import fitz  # PyMuPDF
+
+from _common import traced
+from bench_document_text import make_pdf
+from utils.parser import extract_text_from_pdf, pdf_pages
+
+
+def legacy_extract_text_from_pdf(pdf_path):
+    """Previous extract_text_from_pdf: every page's text in a list."""
+    doc = fitz.open(pdf_path)
+    extracted = []
+    for page_number in range(len(doc)):
+        text = doc.load_page(page_number).get_text()
+        if text.strip():
+            extracted.append({"page_number": page_number + 1, "text": text})
+    doc.close()
+    return extracted
+
+
+def stream_characters(pdf_path):
+    """Streaming consumer: looks at each page once and keeps nothing."""
+    characters = 0
+    with pdf_pages(pdf_path) as pages:
+        for page in pages:
+            characters += len(page["text"])
+    return characters
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--lines-per-page", type=int, default=60)
+    args = parser.parse_args()
+
+    mismatches = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        for pages in args.pages:
+            pdf_path = str(Path(tmp) / f"synthetic_{pages}.pdf")
+            make_pdf(Path(pdf_path), pages, args.lines_per_page)
+            print(f"{pages} pages")
+
+            expected, t_before, peak_before = traced(lambda: legacy_extract_text_from_pdf(pdf_path)[:3])
+            actual, t_after, peak_after = traced(lambda: list(extract_text_from_pdf(pdf_path, max_pages=3)))
+            if expected != actual:
+                mismatches += 1
+                print("  MISMATCH for the first 3 pages")
+            print(f"  first 3 pages  list {t_before * 1000:8.1f}ms {peak_before / 1e6:7.2f}MB  "
+                  f"generator {t_after * 1000:7.1f}ms {peak_after / 1e6:5.2f}MB  {t_before / t_after:6.1f}x")
+
+            everything, t_before, peak_before = traced(
+                lambda: sum(len(page["text"]) for page in legacy_extract_text_from_pdf(pdf_path)))
+            streamed, t_after, peak_after = traced(lambda: stream_characters(pdf_path))
+            if everything != streamed or legacy_extract_text_from_pdf(pdf_path) != list(extract_text_from_pdf(pdf_path)):
+                mismatches += 1
+                print("  MISMATCH for all pages")
+            print(f"  all pages      list {t_before * 1000:8.1f}ms {peak_before / 1e6:7.2f}MB  "
+                  f"streamed  {t_after * 1000:7.1f}ms {peak_after / 1e6:5.2f}MB")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""
+Profile the whole 1B pipeline (analyze, persona-score, rank) on each bundled
+collection with cProfile: stage timings, and how many tokenizer calls
+(regex findall, str.split, str.lower) persona scoring and ranking make and
+what they cost. Each collection is queried twice with different personas,
+as a service would, to show what the second query reuses.
+
+Usage: python benchmarks/bench_pipeline_profile.py
+"""
+
+import argparse
+import cProfile
+import pstats
+
+from _common import bundled_collections
+from src.collection_analyzer import CollectionAnalyzer
+
+TOKENIZERS = {
+    "findall": "<method 'findall' of 're.Pattern' objects>",
+    "split": "<method 'split' of 'str' objects>",
+    "lower": "<method 'lower' of 'str' objects>",
+}
+SECOND_QUERY = ({"role": "Research Analyst"}, {"task": "Summarize the key findings and compare the options"})
+
+
+def profile_query(collection: CollectionAnalyzer, pdf_paths, persona, job):
+    profiler = cProfile.Profile()
+    result = profiler.runcall(collection.analyze_collection, pdf_paths, persona, job)
+    stats = pstats.Stats(profiler).stats
+    tokenizers = {}
+    for name, label in TOKENIZERS.items():
+        calls = seconds = 0
+        for (_, _, function), (_, total_calls, own_seconds, _, _) in stats.items():
+            if function == label:
+                calls += total_calls
+                seconds += own_seconds
+        tokenizers[name] = (calls, seconds)
+    return result, tokenizers
+
+
+def report(label, result, tokenizers):
+    timings = result["metadata"]["timings"]
+    print(f"  {label:<13} analysis {timings['analysis_seconds'] * 1000:7.1f}ms  "
+          f"persona {timings['persona_seconds'] * 1000:7.1f}ms  ranking {timings['ranking_seconds'] * 1000:7.1f}ms  "
+          f"total {timings['total_seconds'] * 1000:7.1f}ms (profiled)")
+    print("  " + " " * 13 + "  ".join(f"{name} {calls:6d} calls {seconds * 1000:6.1f}ms"
+                                       for name, (calls, seconds) in tokenizers.items()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.parse_args()
+
+    for bundled in bundled_collections():
+        collection = CollectionAnalyzer(workers=1)
+        print(f"{bundled.name}: {len(bundled.pdf_paths)} documents")
+        result, tokenizers = profile_query(collection, bundled.pdf_paths, bundled.persona, bundled.job)
+        report("first query", result, tokenizers)
+        print(f"  {'':<13} {len(result['sections'])} sections ranked")
+        result, tokenizers = profile_query(collection, bundled.pdf_paths, *SECOND_QUERY)
+        report("second query", result, tokenizers)
+        token_cache = getattr(collection, "token_cache", None)
+        if token_cache is not None:
+            print(f"  {'':<13} token cache {token_cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark process_pdfs.py throughput on the three bundled collections and
+a synthetic collection of long PDFs: the previous entry point (every page
+extracted, the first three kept, nothing ranked) against the staged
+pipeline (extract, detect, persona-score, rank, top-K), with no page budget
+and with one. Pages read are taken from the analyses, so pages left unread
+once section detection stops early are not counted.
+
+Usage: python benchmarks/bench_pipeline_throughput.py [--max-pages N] [--workers W] [--repeat R]
+       [--synthetic-docs D] [--synthetic-pages P]
+"""
+
+import argparse
+import tempfile
+from pathlib import Path
+
+import fitz  # PyMuPDF
+
+from _common import bundled_collections, timed
+from bench_collection_analysis import SYNTHETIC_JOB, SYNTHETIC_PERSONA, make_pdf
+from process_pdfs import collect_pdf_paths, format_stage_timings, run_pipeline
+from src.collection_analyzer import CollectionAnalyzer
+from utils.parser import extract_text_from_pdf
+
+
+def sample_pages(pdf_paths, num_pages=3):
+    """Previous entry point: extract every page of each PDF, keep the first few."""
+    return [list(extract_text_from_pdf(path))[:num_pages] for path in pdf_paths]
+
+
+def page_count(pdf_path):
+    with fitz.open(pdf_path) as doc:
+        return len(doc)
+
+
+def synthetic_collection(directory: Path, docs: int, pages: int):
+    """Input config of a collection of long synthetic PDFs written under directory/PDFs."""
+    (directory / "PDFs").mkdir()
+    documents = []
+    for i in range(docs):
+        filename = f"synthetic_{i:03d}.pdf"
+        make_pdf(directory / "PDFs" / filename, pages, seed=i)
+        documents.append({"filename": filename})
+    return {"documents": documents, "persona": SYNTHETIC_PERSONA, "job_to_be_done": SYNTHETIC_JOB}
+
+
+def run(name, config, collection_dir, args):
+    pdf_paths = collect_pdf_paths(config, collection_dir)
+    pages = [page_count(path) for path in pdf_paths]
+    print(f"{name}: {len(pdf_paths)} documents, {sum(pages)} pages")
+
+    _, t_before = timed(lambda: sample_pages(pdf_paths), args.repeat)
+    print(f"  {'first-3 sampling':<18} {t_before * 1000:8.1f}ms  {len(pdf_paths) / t_before:6.1f} docs/s  "
+          f"{sum(pages) / t_before:7.1f} pages/s extracted, unranked")
+
+    for label, max_pages in (("pipeline", None), (f"pipeline, {args.max_pages} pages", args.max_pages)):
+        # Untimed, for the pages the pipeline's analyzer actually reads
+        analyses = CollectionAnalyzer(workers=1, max_pages=max_pages).analyze_documents(pdf_paths)
+        pages_read = sum(analysis["metadata"]["pages_read"] for analysis in analyses)
+        # A fresh analyzer per run, so nothing is reused between runs
+        (output_data, stage_seconds), elapsed = timed(lambda: run_pipeline(
+            config, collection_dir, CollectionAnalyzer(workers=args.workers, max_pages=max_pages)), args.repeat)
+        print(f"  {label:<18} {elapsed * 1000:8.1f}ms  {len(pdf_paths) / elapsed:6.1f} docs/s  "
+              f"{pages_read} of {sum(pages)} pages read, top {len(output_data['extracted_sections'])} ranked")
+        print(f"  {'':<18} {format_stage_timings(stage_seconds)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--max-pages", type=int, default=3, help="Page budget of the budgeted pipeline run")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--synthetic-docs", type=int, default=5)
+    parser.add_argument("--synthetic-pages", type=int, default=200)
+    args = parser.parse_args()
+
+    for collection in bundled_collections():
+        run(collection.name, collection.config, str(collection.directory), args)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config = synthetic_collection(Path(tmp), args.synthetic_docs, args.synthetic_pages)
+        run(f"synthetic x{args.synthetic_pages} pages", config, tmp, args)
+
+
+if __name__ == "__main__":
+    main()
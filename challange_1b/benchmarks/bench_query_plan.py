@@ -0,0 +1,80 @@
+"""
+Benchmark scoring the bundled collections' sections with a query plan
+compiled once per persona/job (after) against re-deriving the job's word
+sets and the ranker's context keywords for every section (before), as the
+job description grows. With the plan, the per-section cost stays flat and
+only the one-off compile grows with the query.
+
+Usage: python benchmarks/bench_query_plan.py [--job-repeats N ...] [--repeat R]
+Exits with status 1 if the two versions score any section differently.
+"""
+
+import argparse
+import sys
+from dataclasses import replace
+
+from _common import bundled_collections, timed
+from src.collection_analyzer import CollectionAnalyzer
+from src.patterns import WORD, LONG_WORD
+from src.query_plan import QueryPlan
+
+
+def reparsed_plan(plan, persona, job):
+    """The plan as the scorers rebuilt it per section before: task word sets and context keywords."""
+    task_description = job.get("task", "").lower()
+    return replace(
+        plan,
+        context_keywords=QueryPlan.for_context(persona, job).context_keywords,
+        direct_terms=frozenset(word for word in WORD.findall(task_description) if len(word) > 3),
+        task_keywords=frozenset(LONG_WORD.findall(task_description))
+    )
+
+
+def score_sections(collection, sections, plan_for_section):
+    processor = collection.persona_processor
+    ranker = collection.section_ranker
+    scores = []
+    for section in sections:
+        plan = plan_for_section()
+        augmented = processor._augment_section_with_role_context(section, plan)
+        scores.append((augmented["persona_relevance_score"], augmented["persona_insights"],
+                       augmented["key_concepts"], augmented["job_alignment_score"],
+                       ranker._compute_final_score(augmented, plan)))
+    return scores
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--job-repeats", type=int, nargs="+", default=[1, 10, 100],
+                        help="Times each collection's job description is repeated")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    mismatches = 0
+    for bundled in bundled_collections():
+        collection = CollectionAnalyzer(workers=1)
+        sections = [section for analysis in collection.analyze_documents(bundled.pdf_paths)
+                    for section in analysis["sections"]]
+        for section in sections:
+            tokens = collection.token_cache.tokens(section)
+            tokens.words, tokens.content_word_set, tokens.long_words  # tokenize up front, only scoring is timed
+        print(f"{bundled.name}: {len(sections)} sections")
+
+        persona = bundled.persona
+        for repeats in args.job_repeats:
+            job = {"task": " ".join([bundled.job["task"]] * repeats)}
+            plan, t_compile = timed(lambda: collection.persona_processor.plan_query(persona, job), args.repeat)
+            expected, t_before = timed(lambda: score_sections(collection, sections, lambda: reparsed_plan(plan, persona, job)),
+                                       args.repeat)
+            actual, t_after = timed(lambda: score_sections(collection, sections, lambda: plan), args.repeat)
+            if expected != actual:
+                mismatches += 1
+                print(f"  MISMATCH for job x{repeats}")
+            per_section = 1e6 / len(sections)
+            print(f"  job x{repeats:<4} {len(job['task'].split()):5d} words  plan compile {t_compile * 1e6:8.1f}us  "
+                  f"per section: re-parsed {t_before * per_section:7.1f}us  planned {t_after * per_section:6.1f}us")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+"""
+Benchmark SectionRanker.rank_sections on tens of thousands of sections
+built from the bundled collections: the full ranking, which copies every
+section and sorts them all (before), against top_k mode, which keeps a
+bounded heap of RankedSection references (after). Reports time and traced
+peak memory, with the per-section keyword score and with a BM25 scoring
+engine, where scoring is cheap and the copies and sort dominate.
+
+Usage: python benchmarks/bench_rank_top_k.py [--sections N ...] [--top-k K] [--repeat R]
+Exits with status 1 if top_k mode disagrees with the head of the full ranking.
+"""
+
+import argparse
+import sys
+
+from _common import bundled_collections, timed, traced
+from src.collection_analyzer import CollectionAnalyzer
+
+
+def measure(run, repeat):
+    """Result, mean seconds over repeat runs, and traced peak bytes of one more run."""
+    result, elapsed = timed(run, repeat)
+    _, _, peak = traced(run)
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sections", type=int, nargs="+", default=[10000, 50000])
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    collection = CollectionAnalyzer(workers=1)
+    base_sections = []
+    queries = []
+    for bundled in bundled_collections():
+        for analysis in collection.analyze_documents(bundled.pdf_paths):
+            base_sections.extend(analysis["sections"])
+        queries.append((bundled.persona, bundled.job))
+    ranker = collection.section_ranker
+    for section in base_sections:
+        ranker.token_cache.tokens(section).word_frequencies  # tokenize up front, only ranking is timed
+
+    mismatches = 0
+    for target in args.sections:
+        # Replicas tie with their originals, which exercises the tie-break
+        sections = [dict(base_sections[i % len(base_sections)], section_id=f"section_{i}") for i in range(target)]
+        print(f"{len(sections)} sections")
+        bm25 = collection.scoring_engine(collection.build_index([{"sections": sections}]), "bm25")
+        for persona, job in queries:
+            plan = collection.persona_processor.plan_query(persona, job)
+            for label, engine in (("keyword", None), ("bm25", bm25)):
+                full, t_full, peak_full = measure(
+                    lambda: ranker.rank_sections(sections, persona, job, engine, plan), args.repeat)
+                top, t_top, peak_top = measure(
+                    lambda: ranker.rank_sections(sections, persona, job, engine, plan, top_k=args.top_k), args.repeat)
+                expected = [(s["section_id"], s["relevance_score"]) for s in full[:args.top_k]]
+                actual = [(entry.section["section_id"], entry.score) for entry in top]
+                if expected != actual:
+                    mismatches += 1
+                    print(f"  MISMATCH for {persona['role']} ({label})")
+                print(f"  {persona['role']:<20} {label:<8} full sort {t_full * 1000:8.1f}ms {peak_full / 1e6:7.1f}MB  "
+                      f"top-{args.top_k} {t_top * 1000:8.1f}ms {peak_top / 1e6:5.2f}MB  {t_full / t_top:5.2f}x")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
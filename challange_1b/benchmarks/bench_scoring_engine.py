@@ -0,0 +1,94 @@
+"""
+Benchmark the corpus-level scoring engine on tens of thousands of sections:
+the ranker's per-section keyword score (a pure Python loop over every
+section per query) against one vectorized ScoringEngine query, for TF-IDF
+and BM25, cold and cached. Sections are the bundled collections' sections
+replicated under fresh ids.
+
+Usage: python benchmarks/bench_scoring_engine.py [--sections N ...] [--repeat R]
+Exits with status 1 if the engine disagrees with a scalar reference implementation.
+"""
+
+import argparse
+import math
+import sys
+
+import numpy as np
+
+from _common import bundled_collections, timed
+from src.collection_analyzer import CollectionAnalyzer
+from src.query_plan import QueryPlan
+from src.scoring_engine import SCORING_SCHEMES, ScoringEngine
+from src.section_index import SectionIndex
+from src.section_ranker import SectionRanker
+from src.token_cache import TokenCache
+
+
+def reference_scores(index: SectionIndex, terms, scheme: str, k1: float = 1.5, b: float = 0.75):
+    """Scalar version of the engine's formulas, straight from the postings."""
+    count = len(index)
+    average_length = sum(index.lengths) / max(count, 1)
+    scores = [0.0] * count
+    for term in terms:
+        if term not in index.postings:
+            continue
+        positions, counts = index.postings[term]
+        df = len(positions)
+        for position, tf in zip(positions, counts):
+            length = index.lengths[position]
+            if scheme == "tfidf":
+                scores[position] += tf / max(length, 1) * math.log(1 + count / df)
+            else:
+                idf = math.log(1 + (count - df + 0.5) / (df + 0.5))
+                scores[position] += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * length / average_length))
+    return scores
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sections", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    collection = CollectionAnalyzer(workers=1)
+    base_sections = []
+    queries = []
+    for bundled in bundled_collections():
+        for analysis in collection.analyze_documents(bundled.pdf_paths):
+            base_sections.extend(analysis["sections"])
+        queries.append((bundled.persona, bundled.job))
+
+    mismatches = 0
+    for target in args.sections:
+        sections = [dict(base_sections[i % len(base_sections)], section_id=f"section_{i}") for i in range(target)]
+        index, t_index = timed(lambda: SectionIndex.build(sections), 1)
+        print(f"{len(sections)} sections, {len(index.postings)} terms (index build {t_index * 1000:.0f}ms)")
+
+        persona, job = queries[0]
+        plan = QueryPlan.for_context(persona, job)
+        # Nothing cached, so tokenizing each section is timed as part of the query as before
+        uncached = SectionRanker(TokenCache(max_entries=0))
+        _, t_python = timed(lambda: [uncached._compute_tfidf_relevance(uncached.token_cache.tokens(s), plan)
+                                     for s in sections], args.repeat)
+        print(f"  per-section python      query {t_python * 1000:9.2f}ms")
+
+        terms = plan.index_keywords
+        for scheme in SCORING_SCHEMES:
+            engine, t_build = timed(lambda: ScoringEngine(index, scheme), 1)
+
+            def cold_query():
+                engine._query_cache.clear()  # time uncached queries
+                return engine.score(terms)
+
+            cold, t_cold = timed(cold_query, args.repeat)
+            _, t_cached = timed(lambda: engine.score(terms), args.repeat)
+            print(f"  {scheme:<6} engine build {t_build * 1000:7.1f}ms  query {t_cold * 1000:9.2f}ms  "
+                  f"cached {t_cached * 1e6:7.1f}us  {t_python / t_cold:7.1f}x")
+            if not np.allclose(cold, reference_scores(index, terms, scheme)):
+                mismatches += 1
+                print(f"  MISMATCH for {scheme}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
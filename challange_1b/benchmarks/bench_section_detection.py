@@ -0,0 +1,172 @@
+"""
+Benchmark DocumentAnalyzer section detection: the previous three passes
+(headers, paragraphs, lists), each re-splitting every page and rescanning
+the page for every header body (before), against the single-pass line
+scanner (after). Runs on the sample collections and on synthetic pages,
+and checks both produce the same candidate sections.
+
+Usage: python benchmarks/bench_section_detection.py [--pages N] [--lines-per-page L] [--repeat R]
+Exits with status 1 if the two detectors disagree.
+"""
+
+import argparse
+import random
+import re
+import sys
+from typing import Any, Dict, List
+
+import fitz  # PyMuPDF
+
+from _common import bundled_collections, timed
+from src.document_analyzer import DocumentAnalyzer
+from src.document_text import DocumentText
+
+VOCABULARY = ("itinerary", "beach", "restaurant", "museum", "signature", "export", "form",
+              "recipe", "vegetarian", "budget", "transport", "nightlife", "culture", "history")
+
+
+class LegacySectionDetector(DocumentAnalyzer):
+    """Previous three-pass detection, kept here as the baseline"""
+
+    def _detect_sections(self, text, filename, pages):
+        sections = []
+        sections.extend(self._detect_by_headers(text, pages))
+        sections.extend(self._detect_by_paragraphs(text, pages))
+        sections.extend(self._detect_by_lines(text, pages))
+        return self._process_detected_sections(sections, filename)
+
+    def _detect_by_headers(self, text, pages):
+        sections = []
+        patterns = self._get_header_patterns()
+        for page_info in pages:
+            sections.extend(self._find_headers_in_page(page_info, patterns))
+        return sections
+
+    def _find_headers_in_page(self, page_info, patterns):
+        sections = []
+        page_num = page_info["page_number"]
+        page_text = page_info["text"]
+        for line in page_text.split('\n'):
+            line = line.strip()
+            if not self._is_valid_line(line):
+                continue
+            header_match = self._match_header_patterns(line, patterns)
+            if header_match:
+                content = self._legacy_content_after_header(page_text, header_match)
+                section = self._create_header_section(header_match, content, page_num)
+                if section:
+                    sections.append(section)
+        return sections
+
+    def _legacy_content_after_header(self, page_text, header_line):
+        content_lines = []
+        found_header = False
+        for line in page_text.split('\n'):
+            if header_line.strip() in line.strip():
+                found_header = True
+                continue
+            if found_header:
+                if self._legacy_should_stop(line, content_lines):
+                    break
+                content_lines.append(line.strip())
+        return ' '.join(content_lines)
+
+    def _legacy_should_stop(self, line, content_lines):
+        line = line.strip()
+        if not line:
+            return False
+        if re.match(r'^[A-Z][A-Z\s]{5,}$', line) or re.match(r'^\d+\.?\s+[A-Z]', line):
+            return True
+        return len(' '.join(content_lines)) > self.max_section_length
+
+    def _detect_by_paragraphs(self, text, pages):
+        sections = []
+        for page_info in pages:
+            paragraphs = [p.strip() for p in page_info["text"].split('\n\n') if p.strip()]
+            for paragraph in paragraphs:
+                if self._is_valid_paragraph_length(paragraph):
+                    sections.append(self._create_paragraph_section(paragraph, page_info["page_number"]))
+        return sections
+
+    def _detect_by_lines(self, text, pages):
+        sections = []
+        for page_info in pages:
+            lines = page_info["text"].split('\n')
+            for i, line in enumerate(lines):
+                if self._is_list_item(line.strip()):
+                    section = self._create_list_section(lines, i, page_info["page_number"])
+                    if section:
+                        sections.append(section)
+        return sections
+
+
+def candidates(analyzer: DocumentAnalyzer, document: DocumentText, filename: str) -> List[Dict[str, Any]]:
+    """All detected sections before deduplication and the max_sections cut."""
+    analyzer._process_detected_sections = lambda sections, _: list(sections)
+    return analyzer._detect_sections(document.full_text, filename, document.pages)
+
+
+def synthetic_pages(pages: int, lines_per_page: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+
+    def words(k):
+        return " ".join(rng.choice(VOCABULARY) for _ in range(k))
+
+    texts = []
+    for page_num in range(pages):
+        lines = []
+        for i in range(lines_per_page):
+            kind = rng.random()
+            if kind < 0.08:
+                lines.append(words(rng.randint(2, 4)).upper())
+            elif kind < 0.14:
+                lines.append(f"{i}. {words(rng.randint(2, 5)).title()}")
+            elif kind < 0.18:
+                lines.append(f"{words(rng.randint(1, 3)).title()}: {words(rng.randint(3, 8))}")
+            elif kind < 0.28:
+                lines.append(f"• {words(rng.randint(4, 12))}")
+            elif kind < 0.36:
+                lines.append("")
+            else:
+                lines.append(words(rng.randint(6, 14)))
+        texts.append(f"Page {page_num + 1}\n" + "\n".join(lines))
+    return texts
+
+
+def compare(label: str, documents, repeat: int) -> int:
+    timings = {}
+    results = {}
+    for name, detector in (("before", LegacySectionDetector), ("after", DocumentAnalyzer)):
+        results[name], timings[name] = timed(
+            lambda: [candidates(detector(), document, filename) for filename, document in documents], repeat)
+    count = sum(len(r) for r in results["after"])
+    print(f"{label:<22} {count:6d} candidates  before {timings['before'] * 1000:9.2f}ms  "
+          f"after {timings['after'] * 1000:9.2f}ms  {timings['before'] / timings['after']:5.2f}x")
+    if results["before"] != results["after"]:
+        print(f"MISMATCH on {label}")
+        return 1
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--lines-per-page", type=int, default=80)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    mismatches = 0
+    for collection in bundled_collections():
+        documents = []
+        for pdf_path in collection.pdf_paths:
+            with fitz.open(pdf_path) as doc:
+                documents.append((pdf_path.name, DocumentText.from_pdf(doc)))
+        mismatches += compare(collection.name, documents, args.repeat)
+
+    synthetic = [("synthetic.pdf", DocumentText(synthetic_pages(args.pages, args.lines_per_page)))]
+    mismatches += compare(f"synthetic {args.pages} pages", synthetic, args.repeat)
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
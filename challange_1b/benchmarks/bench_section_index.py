@@ -0,0 +1,91 @@
+"""
+Benchmark the section index: build, save and load cost, and the time to
+answer a persona query by rescanning every section (linear) against
+scoring only the postings of the query terms (indexed), on the bundled
+collections replicated to a larger section count. Also compares persona
+scoring and ranking of all sections of each collection with ranking only
+the top-K retrieved, and how many of the top 10 sections that keeps.
+
+Usage: python benchmarks/bench_section_index.py [--copies C] [--top-k K] [--repeat R]
+Exits with status 1 if indexed and linear retrieval disagree.
+"""
+
+import argparse
+import heapq
+import math
+import sys
+import tempfile
+from collections import Counter
+from pathlib import Path
+
+from _common import bundled_collections, timed
+from src.collection_analyzer import CollectionAnalyzer
+from src.patterns import WORD
+from src.section_index import SectionIndex, section_text
+
+
+def linear_top_k(sections, terms, k):
+    """Same TF-IDF as SectionIndex.top_k, rescanning every section per query."""
+    counts = [Counter(WORD.findall(section_text(section).lower())) for section in sections]
+    doc_freq = Counter(term for c in counts for term in set(c) & terms)
+    scores = []
+    for position, c in enumerate(counts):
+        length = sum(c.values())
+        matched = [term for term in terms if term in c]
+        if matched:
+            score = sum(c[term] / length * math.log(1 + len(sections) / doc_freq[term]) for term in matched)
+            scores.append((score, -position))
+    return [(score, -neg) for score, neg in heapq.nlargest(k, scores)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--copies", type=int, default=20)
+    parser.add_argument("--top-k", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    mismatches = 0
+    for bundled in bundled_collections():
+        persona, job, pdf_paths = bundled.persona, bundled.job, bundled.pdf_paths
+        collection = CollectionAnalyzer(workers=1)
+        originals = collection.analyze_documents(pdf_paths)
+        analyses = originals * args.copies
+        sections = [section for analysis in analyses for section in analysis["sections"]]
+        terms = collection.persona_processor.plan_query(persona, job).query_terms
+        print(f"{bundled.name}: {len(sections)} sections x{args.copies}, {len(terms)} query terms")
+
+        index, t_build = timed(lambda: collection.build_index(analyses), 1)
+        with tempfile.TemporaryDirectory() as tmp:
+            index_path = Path(tmp) / "sections.idx"
+            _, t_save = timed(lambda: index.save(str(index_path)), 1)
+            loaded, t_load = timed(lambda: SectionIndex.load(str(index_path)), args.repeat)
+            size = index_path.stat().st_size
+        print(f"  build {t_build * 1000:8.1f}ms  save {t_save * 1000:7.1f}ms  load {t_load * 1000:7.1f}ms  "
+              f"{size / 1024:7.1f}KB on disk, {len(index.postings)} terms")
+
+        expected, t_linear = timed(lambda: linear_top_k(sections, terms, args.top_k), args.repeat)
+        actual, t_indexed = timed(lambda: loaded.top_k(terms, args.top_k), args.repeat)
+        touched = len(index.matching(terms))
+        print(f"  top-{args.top_k}  linear {t_linear * 1000:8.1f}ms  indexed {t_indexed * 1000:7.1f}ms  "
+              f"{t_linear / t_indexed:6.1f}x  ({touched} of {len(sections)} sections contain a query term)")
+        if [p for _, p in expected] != [p for _, p in actual] or any(
+                not math.isclose(a, b) for (a, _), (b, _) in zip(expected, actual)):
+            mismatches += 1
+            print("  MISMATCH between indexed and linear retrieval")
+
+        # Reuse the analyses so only persona scoring and ranking are timed
+        collection.analyze_documents = lambda _: originals
+        original_index = collection.build_index(originals)
+        full, t_full = timed(lambda: collection.analyze_collection(pdf_paths, persona, job), args.repeat)
+        top, t_top = timed(lambda: collection.analyze_collection(
+            pdf_paths, persona, job, top_k=args.top_k, index=original_index), args.repeat)
+        best = {s["section_id"] for s in full["sections"][:10]}
+        kept = len(best & {s["section_id"] for s in top["sections"][:10]})
+        print(f"  persona+rank  all {len(full['sections'])} sections {t_full * 1000:8.1f}ms  retrieved top-{args.top_k} {t_top * 1000:7.1f}ms  "
+              f"{t_full / t_top:6.1f}x  (top-10 overlap {kept}/10)")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
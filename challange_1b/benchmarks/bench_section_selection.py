@@ -0,0 +1,63 @@
+"""
+Benchmark DocumentAnalyzer section selection on long synthetic documents:
+the previous behaviour, which scored every detected section and only then
+kept the first max_sections (before), against the bounded selection
+policies. "first" stops scanning pages once it has enough sections;
+"top-confidence" keeps a bounded heap over the whole document.
+
+Usage: python benchmarks/bench_section_selection.py [--pages N ...] [--lines-per-page L] [--max-sections K] [--repeat R]
+Exits with status 1 if the "first" policy disagrees with the previous output.
+"""
+
+import argparse
+import sys
+
+from _common import timed
+from src.document_analyzer import DocumentAnalyzer
+from src.document_text import DocumentText
+from bench_section_detection import synthetic_pages
+
+
+def select(analyzer: DocumentAnalyzer, document: DocumentText, keep: int = None):
+    sections = analyzer._detect_sections(document.full_text, "synthetic.pdf", document.pages)
+    return sections[:keep] if keep is not None else sections
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--lines-per-page", type=int, default=80)
+    parser.add_argument("--max-sections", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    k = args.max_sections
+    runs = (
+        ("before", lambda document: select(DocumentAnalyzer(max_sections=sys.maxsize), document, k)),
+        ("first", lambda document: select(DocumentAnalyzer(max_sections=k), document)),
+        ("first >= 0.8", lambda document: select(DocumentAnalyzer(max_sections=k, min_confidence=0.8), document)),
+        ("top-confidence", lambda document: select(
+            DocumentAnalyzer(max_sections=k, selection_policy="top-confidence"), document)),
+    )
+
+    mismatches = 0
+    for pages in args.pages:
+        document = DocumentText(synthetic_pages(pages, args.lines_per_page))
+        print(f"{pages} pages, max_sections={k}")
+        results = {}
+        baseline = None
+        for label, run in runs:
+            results[label], elapsed = timed(lambda: run(document), args.repeat)
+            baseline = baseline or elapsed
+            sections = results[label]
+            mean_confidence = sum(s["confidence_score"] for s in sections) / max(len(sections), 1)
+            print(f"  {label:<15} {elapsed * 1000:9.2f}ms  {baseline / elapsed:6.2f}x  "
+                  f"{len(sections):3d} sections  mean confidence {mean_confidence:.3f}")
+        if results["first"] != results["before"]:
+            mismatches += 1
+            print(f"MISMATCH at {pages} pages")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
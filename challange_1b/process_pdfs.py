@@ -1,6 +1,12 @@
 import json
 import os
-from utils.parser import extract_text_from_pdf
+import time
+from src.collection_analyzer import CollectionAnalyzer
+
+# Sections reported per collection, and pages read per PDF (None: no budget;
+# reading still stops once section detection has all the sections it keeps)
+TOP_K_SECTIONS = 5
+MAX_PAGES_PER_DOCUMENT = None
 
 def load_json_config(config_path):
     """Load JSON configuration from a file."""
@@ -15,14 +21,16 @@ def get_pdf_file_path(collection_dir, pdf_filename):
     """Construct the full path to a PDF file."""
     return os.path.join(collection_dir, "PDFs", pdf_filename)
 
-def extract_sample_pages(pdf_path, num_pages=3):
-    """Extract text from the first few pages of a PDF."""
-    all_pages = extract_text_from_pdf(pdf_path)
-    return all_pages[:num_pages]
-
-def append_metadata(metadata, document_name):
-    """Append document name to metadata."""
-    metadata["input_documents"].append(document_name)
+def collect_pdf_paths(config, collection_dir):
+    """Paths of the collection's PDFs that exist, reporting missing ones."""
+    pdf_paths = []
+    for document in config["documents"]:
+        pdf_path = get_pdf_file_path(collection_dir, document["filename"])
+        if os.path.exists(pdf_path):
+            pdf_paths.append(pdf_path)
+        else:
+            print(colored_terminal_text(f"File not found: {pdf_path}", "31"))
+    return pdf_paths
 
 def add_extracted_section(sections, doc_name, section_title, rank, page_num):
     """Add extracted section details."""
@@ -41,53 +49,59 @@ def add_subsection_analysis(analysis, doc_name, text, page_num):
         "page_number": page_num
     })
 
-def process_single_document(doc_config, collection_dir, output_data):
-    """Process a single document and update output data."""
-    pdf_filename = doc_config["filename"]
-    section_title = doc_config["title"]
-    pdf_path = get_pdf_file_path(collection_dir, pdf_filename)
-
-    if not os.path.exists(pdf_path):
-        print(colored_terminal_text(f"File not found: {pdf_path}", "31"))
-        return
-
-    sample_pages = extract_sample_pages(pdf_path)
-    append_metadata(output_data["metadata"], pdf_filename)
-
-    for idx, page in enumerate(sample_pages):
-        add_extracted_section(
-            output_data["extracted_sections"],
-            pdf_filename,
-            section_title,
-            idx + 1,
-            page["page_number"]
-        )
-        add_subsection_analysis(
-            output_data["subsection_analysis"],
-            pdf_filename,
-            page["text"],
-            page["page_number"]
-        )
+def run_pipeline(config, collection_dir, collection_analyzer=None):
+    """
+    Run extract -> detect -> persona-score -> rank -> top-K on a collection.
 
-def process_collection_documents(config, collection_dir):
-    """Process all documents in a collection."""
-    output_json_path = os.path.join(collection_dir, "challenge1b_output.json")
+    Pages are extracted as section detection consumes them, at most
+    MAX_PAGES_PER_DOCUMENT per PDF. Returns the output data and the seconds
+    spent in each stage (extraction and detection summed over documents).
+    """
+    collection_analyzer = collection_analyzer or CollectionAnalyzer(max_pages=MAX_PAGES_PER_DOCUMENT)
+    pdf_paths = collect_pdf_paths(config, collection_dir)
+    result = collection_analyzer.analyze_collection(pdf_paths, config["persona"], config["job_to_be_done"],
+                                                    max_results=TOP_K_SECTIONS)
+
+    output_start = time.perf_counter()
     output_data = {
         "metadata": {
-            "input_documents": [],
+            "input_documents": result["metadata"]["input_documents"],
             "persona": config["persona"]["role"],
             "job_to_be_done": config["job_to_be_done"]["task"]
         },
         "extracted_sections": [],
         "subsection_analysis": []
     }
+    for rank, section in enumerate(result["sections"], start=1):
+        add_extracted_section(output_data["extracted_sections"], section["document"],
+                              section["section_title"], rank, section["page_number"])
+        add_subsection_analysis(output_data["subsection_analysis"], section["document"],
+                                section["content"], section["page_number"])
+
+    timings = result["metadata"]["timings"]
+    stage_seconds = {
+        "extract": timings["extraction_seconds"],
+        "detect": timings["detection_seconds"],
+        "persona": timings["persona_seconds"],
+        "rank_top_k": timings["ranking_seconds"],
+        "output": round(time.perf_counter() - output_start, 4),
+        "total": timings["total_seconds"]
+    }
+    return output_data, stage_seconds
 
-    for document in config["documents"]:
-        process_single_document(document, collection_dir, output_data)
+def format_stage_timings(stage_seconds):
+    """One-line summary of per-stage seconds."""
+    return "  ".join(f"{stage} {seconds * 1000:.1f}ms" for stage, seconds in stage_seconds.items())
+
+def process_collection_documents(config, collection_dir):
+    """Process all documents in a collection."""
+    output_json_path = os.path.join(collection_dir, "challenge1b_output.json")
+    output_data, stage_seconds = run_pipeline(config, collection_dir)
 
     with open(output_json_path, "w", encoding="utf-8") as file:
         json.dump(output_data, file, indent=2)
 
+    print(f"Stage timings: {format_stage_timings(stage_seconds)}")
     print(colored_terminal_text(f"Output written to {output_json_path}", "32"))
 
 def process_all_collections(collection_names):
@@ -0,0 +1,148 @@
+"""
+Persistent cache of document analysis results.
+Entries are keyed by the PDF's content hash plus the analyzer settings and
+stored zlib-compressed in a single SQLite file, so a collection whose PDFs
+have not changed skips extraction and section detection and only re-runs
+persona scoring. SQLite serializes concurrent writers, so pool workers can
+share one cache file. Least recently used entries are evicted once the
+cache grows past its size limit.
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+HASH_CHUNK_SIZE = 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    file_hash TEXT NOT NULL,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL
+)
+"""
+
+
+def content_hash(file_path: str) -> str:
+    """SHA-256 of a file's bytes, read in chunks."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class AnalysisCache:
+    """Size-bounded LRU cache of analysis results in one SQLite file"""
+
+    def __init__(self, db_path: str, max_bytes: int = DEFAULT_MAX_BYTES, refresh: bool = False):
+        """
+        Args:
+            db_path: SQLite file holding the cache (created if missing)
+            max_bytes: Total entry size above which least recently used entries are evicted
+            refresh: Ignore existing entries on lookup but still store new results
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.refresh = refresh
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self._connection: Optional[sqlite3.Connection] = None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Connections can't cross process boundaries; each worker opens its own
+        state = self.__dict__.copy()
+        state["_connection"] = None
+        return state
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self._connection = sqlite3.connect(str(self.db_path), timeout=30)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(_SCHEMA)
+            self._connection.commit()
+        return self._connection
+
+    def key_for(self, file_path: str, config: Dict[str, Any]) -> str:
+        """Cache key: content hash of the file plus a hash of the analyzer config."""
+        config_hash = hashlib.sha256(json.dumps(config, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+        return f"{content_hash(file_path)}-{config_hash}"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached value for key, or None on a miss."""
+        if self.refresh:
+            self.misses += 1
+            return None
+        row = self.connection.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        try:
+            value = json.loads(zlib.decompress(row[0]))
+        except (zlib.error, ValueError) as e:
+            print(f"Discarding unreadable cache entry {key}: {e}")
+            with self.connection:
+                self.connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self.misses += 1
+            return None
+        with self.connection:
+            self.connection.execute("UPDATE entries SET last_used = ? WHERE key = ?", (time.time(), key))
+        self.hits += 1
+        return value
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        """Store value under key, then evict if over the size limit."""
+        blob = zlib.compress(json.dumps(value, ensure_ascii=False).encode("utf-8"))
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO entries (key, file_hash, value, size, last_used) VALUES (?, ?, ?, ?, ?)",
+                (key, key.split("-", 1)[0], blob, len(blob), time.time())
+            )
+        self.writes += 1
+        if self.total_bytes() > self.max_bytes:
+            self._evict()
+
+    def invalidate(self, file_path: str) -> int:
+        """Remove every entry for a file, whatever settings it was stored under."""
+        with self.connection:
+            return self.connection.execute("DELETE FROM entries WHERE file_hash = ?", (content_hash(file_path),)).rowcount
+
+    def clear(self) -> int:
+        """Remove all entries."""
+        with self.connection:
+            return self.connection.execute("DELETE FROM entries").rowcount
+
+    def total_bytes(self) -> int:
+        return self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "writes": self.writes, "evictions": self.evictions}
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until the cache fits in max_bytes."""
+        total = self.total_bytes()
+        stale = []
+        for key, size in self.connection.execute("SELECT key, size FROM entries ORDER BY last_used"):
+            if total <= self.max_bytes:
+                break
+            stale.append((key,))
+            total -= size
+        with self.connection:
+            self.connection.executemany("DELETE FROM entries WHERE key = ?", stale)
+        self.evictions += len(stale)
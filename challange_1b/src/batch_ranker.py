@@ -0,0 +1,190 @@
+"""
+Batch ranking for Challenge 1B - Persona-Driven Document Intelligence
+Ranks one shared set of sections for many persona/job queries at once.
+The ranking score of a section depends on the query only through its
+context keywords and score weights, so the sections are tokenized and
+their per-keyword scores computed once, and every query's scores become a
+column of a section x query matrix. Ranked lists hold RankedSection
+references to the shared sections instead of copies; persona annotations
+are computed only for the returned entries and shared between queries of
+the same persona and job types.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple, TYPE_CHECKING
+
+import numpy as np
+
+from src.persona_processor import PersonaProcessor
+from src.query_plan import QueryPlan
+from src.scoring_formulas import (alignment_ratio, combined_score, content_length_weight, importance_level,
+                                  keyword_score, position_weight, relevance_score, relevant_concepts,
+                                  role_observations)
+from src.section_ranker import RankedSection, SectionRanker
+
+if TYPE_CHECKING:
+    from src.scoring_engine import ScoringEngine
+
+
+class BatchRanker:
+    """Scores and ranks shared sections for many query plans in one pass"""
+
+    def __init__(self, persona_processor: PersonaProcessor, section_ranker: SectionRanker):
+        self.persona_processor = persona_processor
+        self.section_ranker = section_ranker
+        self.token_cache = section_ranker.token_cache
+
+    def score_matrix(self, sections: Sequence[Dict[str, Any]], plans: Sequence[QueryPlan],
+                     scoring_engine: Optional["ScoringEngine"] = None) -> np.ndarray:
+        """
+        Ranking scores as a (sections x plans) matrix: column j holds the
+        final relevance score SectionRanker.rank_sections would give each
+        section for plans[j], with the same scoring engine.
+        """
+        tokens = [self.token_cache.tokens(section) for section in sections]
+        has_content = np.array([bool(section.get("content", "")) for section in sections], dtype=bool)
+        length_weights = np.array([content_length_weight(len(t.words)) for t in tokens])
+        position_weights = np.array([position_weight(section) for section in sections])
+
+        # Each context keyword's score in each section, computed once for all plans
+        keyword_columns = {keyword: i for i, keyword in enumerate(
+            sorted(set().union(*(plan.context_keywords for plan in plans))))}
+        keyword_scores = np.zeros((len(sections), len(keyword_columns)))
+        for row, t in enumerate(tokens):
+            word_frequencies = t.word_frequencies
+            total_words = len(t.words)
+            for keyword in keyword_columns.keys() & word_frequencies.keys():
+                keyword_scores[row, keyword_columns[keyword]] = keyword_score(word_frequencies[keyword], total_words)
+
+        engine_positions = None
+        if scoring_engine is not None:
+            engine_positions = np.array([
+                -1 if position is None else position
+                for position in (scoring_engine.position(section.get("section_id")) for section in sections)
+            ], dtype=np.int64)
+            known = engine_positions >= 0
+
+        scores = np.zeros((len(sections), len(plans)))
+        for column, plan in enumerate(plans):
+            if plan.context_keywords:
+                semantic = np.zeros(len(sections))
+                # Summed in the plan's keyword order, so each score matches the per-section sum exactly
+                for keyword in plan.context_keywords:
+                    semantic += keyword_scores[:, keyword_columns[keyword]]
+                semantic = np.minimum(semantic, 1.0)
+            else:
+                semantic = np.full(len(sections), 0.5)
+            if engine_positions is not None:
+                corpus_scores = scoring_engine.normalized_scores(plan.index_keywords)
+                semantic[known] = corpus_scores[engine_positions[known]]
+            final = np.minimum(combined_score(semantic, length_weights, position_weights, plan.score_weights), 1.0)
+            scores[:, column] = np.where(has_content, final, 0.0)
+        return scores
+
+    def persona_matrices(self, sections: Sequence[Dict[str, Any]],
+                         plans: Sequence[QueryPlan]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Persona relevance and job alignment scores as (sections x plans)
+        matrices, equal to PersonaProcessor's per-section scores.
+        """
+        tokens = [self.token_cache.tokens(section) for section in sections]
+
+        # Relevance: counts of every role, task and direct term in each section, then one product per term kind
+        vocabulary = {term: i for i, term in enumerate(sorted(set().union(
+            *(plan.role_terms | plan.task_terms | plan.direct_terms for plan in plans))))}
+        term_counts = np.zeros((len(sections), len(vocabulary)))
+        token_counts = np.zeros(len(sections))
+        for row, t in enumerate(tokens):
+            words = t.all_words
+            token_counts[row] = len(words)
+            for word in words:
+                column = vocabulary.get(word)
+                if column is not None:
+                    term_counts[row, column] += 1
+        matches = []
+        for kind in ("role_terms", "task_terms", "direct_terms"):
+            membership = np.zeros((len(vocabulary), len(plans)))
+            for column, plan in enumerate(plans):
+                membership[[vocabulary[term] for term in getattr(plan, kind)], column] = 1.0
+            # Integer counts, so the products are exact whatever the summation order
+            matches.append(term_counts @ membership)
+        relevance = np.zeros((len(sections), len(plans)))
+        for column, plan in enumerate(plans):
+            relevance[:, column] = np.minimum(relevance_score(
+                *(kind_matches[:, column] for kind_matches in matches), np.maximum(token_counts, 1),
+                plan.relevance_weights), 1.0)
+        relevance[token_counts == 0] = 0.0
+
+        # Alignment: how many of each plan's task keywords occur among the section's long words
+        keywords = {keyword: i for i, keyword in enumerate(sorted(set().union(*(plan.task_keywords for plan in plans))))}
+        present = np.zeros((len(sections), len(keywords)))
+        for row, t in enumerate(tokens):
+            present[row, [keywords[word] for word in t.long_words if word in keywords]] = 1.0
+        wanted = np.zeros((len(keywords), len(plans)))
+        for column, plan in enumerate(plans):
+            wanted[[keywords[keyword] for keyword in plan.task_keywords], column] = 1.0
+        matched = present @ wanted
+        alignment = np.zeros((len(sections), len(plans)))
+        for column, plan in enumerate(plans):
+            if plan.task_keywords:
+                alignment[:, column] = np.minimum(alignment_ratio(matched[:, column], len(plan.task_keywords)), 1.0)
+        return relevance, alignment
+
+    def rank(self, sections: Sequence[Dict[str, Any]], plans: Sequence[QueryPlan], top_k: Optional[int] = None,
+             scoring_engine: Optional["ScoringEngine"] = None, with_persona: bool = True) -> List[List[RankedSection]]:
+        """
+        One ranked list per plan, in the order rank_sections would rank the
+        sections for it (ties keep section order), cut to top_k entries if
+        set. Entries reference the given sections; with_persona adds the
+        fields process_with_persona would add to each returned section.
+        """
+        if not sections or not plans:
+            return [[] for _ in plans]
+        scores = self.score_matrix(sections, plans, scoring_engine)
+        relevance = alignment = None
+        if with_persona:
+            relevance, alignment = self.persona_matrices(sections, plans)
+
+        tokens = [self.token_cache.tokens(section) for section in sections]
+        insights: Dict[Tuple[int, int, int], List[str]] = {}
+        concepts: Dict[Tuple[int, frozenset], List[str]] = {}
+        rankings = []
+        for column, plan in enumerate(plans):
+            ranking = []
+            for row in self._ranked_rows(scores[:, column], top_k):
+                persona = None
+                if with_persona:
+                    persona = self._persona_fields(tokens[row], plan, float(relevance[row, column]),
+                                                   float(alignment[row, column]), row, insights, concepts)
+                ranking.append(RankedSection(float(scores[row, column]), sections[row], persona))
+            rankings.append(ranking)
+        return rankings
+
+    def _ranked_rows(self, scores: np.ndarray, top_k: Optional[int]) -> np.ndarray:
+        """Rows by descending score, earlier rows first among equals, the first top_k of them if set."""
+        rows = np.arange(len(scores))
+        if top_k is not None and top_k <= 0:
+            return rows[:0]
+        if top_k is not None and top_k < len(rows):
+            # Everything tying with the k-th score is kept, so the tie-break below stays exact
+            threshold = np.partition(scores, len(rows) - top_k)[len(rows) - top_k]
+            rows = rows[scores >= threshold]
+        return rows[np.lexsort((rows, -scores[rows]))][:top_k]
+
+    def _persona_fields(self, section_tokens, plan: QueryPlan, relevance: float, alignment: float, row: int,
+                        insights: Dict, concepts: Dict) -> Dict[str, Any]:
+        """Persona annotations of one section, reusing insights and concepts across plans with the same rules and terms."""
+        insight_key = (row, id(plan.role_rules), id(plan.task_rules))
+        if insight_key not in insights:
+            insights[insight_key] = role_observations(section_tokens, plan, self.persona_processor.insight_matcher)
+        concept_key = (row, plan.role_terms)
+        if concept_key not in concepts:
+            concepts[concept_key] = relevant_concepts(section_tokens, plan)
+        observations = list(insights[insight_key])
+        important_concepts = list(concepts[concept_key])
+        return {
+            "persona_relevance_score": relevance,
+            "persona_insights": observations,
+            "key_concepts": important_concepts,
+            "persona_priority": importance_level(relevance, observations, important_concepts),
+            "job_alignment_score": alignment
+        }
@@ -0,0 +1,280 @@
+"""
+Collection Analyzer for Challenge 1B - Persona-Driven Document Intelligence
+Fans document analysis out across a process pool and ranks the merged sections.
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple, TYPE_CHECKING
+
+from src.document_analyzer import DocumentAnalyzer
+from src.persona_processor import PersonaProcessor
+from src.query_plan import QueryPlan
+from src.section_index import SectionIndex
+from src.section_ranker import SectionRanker
+from src.token_cache import TokenCache
+
+if TYPE_CHECKING:
+    from src.scoring_engine import ScoringEngine
+
+# One analyzer per worker process, built by _init_worker
+_worker_analyzer: Optional[DocumentAnalyzer] = None
+
+
+def _init_worker(analyzer_options: Dict[str, Any]) -> None:
+    global _worker_analyzer
+    _worker_analyzer = DocumentAnalyzer(**analyzer_options)
+
+
+def _analyze_in_worker(file_path: str, keep_text: bool) -> Dict[str, Any]:
+    return _timed_analysis(_worker_analyzer, file_path, keep_text)
+
+
+def _timed_analysis(analyzer: DocumentAnalyzer, file_path: str, keep_text: bool) -> Dict[str, Any]:
+    """Analyze one document and record how long it took in its metadata."""
+    start = time.perf_counter()
+    analysis = analyzer.analyze_document(file_path)
+    analysis["metadata"]["analysis_seconds"] = round(time.perf_counter() - start, 4)
+    if not keep_text:
+        # Only sections and metadata are needed downstream; don't ship the text back
+        analysis["full_text"] = ""
+        analysis["pages"] = []
+    return analysis
+
+
+class CollectionAnalyzer:
+    """Analyzes all documents of a collection in parallel and ranks their sections"""
+
+    def __init__(self, workers: Optional[int] = None, keep_text: bool = False, **analyzer_options):
+        """
+        Args:
+            workers: Worker processes to use, defaults to the CPU count; 1 analyzes in-process
+            keep_text: Return full_text and pages for each document (otherwise dropped)
+            analyzer_options: Passed to DocumentAnalyzer in every worker. Unless
+                complete_text is given, documents are only read in full when
+                their text is kept; otherwise reading stops with section detection.
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.keep_text = keep_text
+        self.analyzer_options = {"complete_text": keep_text, **analyzer_options}
+        # One token cache for both scorers, kept across queries on the same sections
+        self.token_cache = TokenCache()
+        self.persona_processor = PersonaProcessor(self.token_cache)
+        self.section_ranker = SectionRanker(self.token_cache)
+        # Section indexes by section ids and scoring engines by (scheme, section ids),
+        # so repeated queries on a collection reuse them
+        self._indexes: Dict[Tuple[str, ...], SectionIndex] = {}
+        self._scoring_engines: Dict[Tuple[str, Tuple[str, ...]], "ScoringEngine"] = {}
+
+    def analyze_documents(self, file_paths: Sequence[str]) -> List[Dict[str, Any]]:
+        """
+        Analyze every document, returning results in the order of file_paths
+        whatever order the workers finish in.
+        """
+        file_paths = [str(path) for path in file_paths]
+        workers = min(self.workers, len(file_paths))
+        if workers <= 1:
+            analyzer = DocumentAnalyzer(**self.analyzer_options)
+            return [_timed_analysis(analyzer, path, self.keep_text) for path in file_paths]
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(self.analyzer_options,)) as executor:
+            return list(executor.map(_analyze_in_worker, file_paths, [self.keep_text] * len(file_paths)))
+
+    def build_index(self, analyses: List[Dict[str, Any]]) -> SectionIndex:
+        """Inverted index over the sections of all analyses, in document order."""
+        return SectionIndex.build(section for analysis in analyses for section in analysis["sections"])
+
+    def section_index(self, analyses: List[Dict[str, Any]]) -> SectionIndex:
+        """Section index of a collection's analyses, built once per collection."""
+        key = tuple(section.get("section_id", str(position)) for position, section in
+                    enumerate(section for analysis in analyses for section in analysis["sections"]))
+        index = self._indexes.get(key)
+        if index is None:
+            index = self._indexes[key] = self.build_index(analyses)
+        return index
+
+    def scoring_engine(self, index: SectionIndex, scheme: str) -> "ScoringEngine":
+        """Corpus-level scoring engine for a collection's index, built once per collection and scheme."""
+        from src.scoring_engine import ScoringEngine  # NumPy is only needed for corpus-level scoring
+
+        key = (scheme, tuple(index.section_ids))
+        engine = self._scoring_engines.get(key)
+        if engine is None:
+            engine = self._scoring_engines[key] = ScoringEngine(index, scheme)
+        return engine
+
+    def analyze_collection(self, file_paths: Sequence[str], user_persona: Dict[str, str],
+                           user_job: Dict[str, str], top_k: Optional[int] = None,
+                           index: Optional[SectionIndex] = None, scoring: Optional[str] = None,
+                           max_results: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Analyze a collection and rank its sections for the persona.
+
+        Args:
+            top_k: Only persona-score and rank the top_k sections the section
+                index retrieves for the persona's keywords (all sections if None)
+            index: Section index of this collection, e.g. loaded from disk;
+                only used with top_k or scoring. Built from the analyses (once
+                per collection) when none is given, or when its section ids do
+                not match the analyzed sections (metadata["index_rebuilt"] is
+                then set)
+            scoring: "tfidf" or "bm25" to rank with corpus-level scores (and
+                retrieve with them when top_k is set) instead of the
+                per-section keyword score; requires NumPy
+            max_results: Only return the max_results best ranked sections,
+                selected without sorting or copying the rest (all if None)
+
+        Returns:
+            Dictionary with the per-document analyses, the ranked sections of
+            the whole collection (each tagged with its "document") and timing
+            metadata, including per-document analysis seconds. Extraction and
+            detection seconds are summed over documents, so with several
+            workers they can exceed the analysis wall time.
+        """
+        start = time.perf_counter()
+        analyses = self.analyze_documents(file_paths)
+        analysis_seconds = time.perf_counter() - start
+
+        # Persona and job are parsed once; every document and scorer shares the plan
+        query_plan = self.persona_processor.plan_query(user_persona, user_job)
+
+        retrieved = None
+        engine = None
+        retrieval_start = time.perf_counter()
+        index_rebuilt = False
+        if top_k is not None or scoring is not None:
+            if index is not None and not index.matches([section for analysis in analyses for section in analysis["sections"]]):
+                # Positions of a stale index (PDFs changed, added or reordered) would pick the wrong sections
+                index = None
+                index_rebuilt = True
+            if index is None:
+                index = self.section_index(analyses)
+        if scoring is not None:
+            engine = self.scoring_engine(index, scoring)
+        if top_k is not None:
+            retriever = engine if engine is not None else index
+            retrieved = {position for _, position in retriever.top_k(query_plan.query_terms, top_k)}
+        retrieval_seconds = time.perf_counter() - retrieval_start
+
+        merged_sections, persona_seconds = self._apply_persona(analyses, user_persona, user_job, query_plan, retrieved)
+
+        ranking_start = time.perf_counter()
+        if max_results is None:
+            ranked_sections = self.section_ranker.rank_sections(merged_sections, user_persona, user_job, engine, query_plan)
+        else:
+            # Only the kept sections get scored copies, in the same shape as the full ranking
+            ranked_sections = [
+                dict(entry.section, relevance_score=entry.score, final_relevance_score=entry.score)
+                for entry in self.section_ranker.rank_sections(merged_sections, user_persona, user_job, engine, query_plan,
+                                                               top_k=max_results)
+            ]
+        ranking_seconds = time.perf_counter() - ranking_start
+
+        return {
+            "metadata": {
+                "input_documents": [Path(path).name for path in file_paths],
+                "workers": min(self.workers, len(file_paths)),
+                "documents": [
+                    {
+                        "filename": analysis["metadata"]["filename"],
+                        "sections": len(analysis["sections"]),
+                        "pages_read": analysis["metadata"].get("pages_read"),
+                        "analysis_seconds": analysis["metadata"]["analysis_seconds"],
+                        "error": analysis["metadata"].get("error")
+                    }
+                    for analysis in analyses
+                ],
+                "retrieved_sections": len(retrieved) if retrieved is not None else None,
+                "index_rebuilt": index_rebuilt,
+                "timings": {
+                    "analysis_seconds": round(analysis_seconds, 4),
+                    "extraction_seconds": self._summed_metadata(analyses, "extraction_seconds"),
+                    "detection_seconds": self._summed_metadata(analyses, "detection_seconds"),
+                    "retrieval_seconds": round(retrieval_seconds, 4),
+                    "persona_seconds": round(persona_seconds, 4),
+                    "ranking_seconds": round(ranking_seconds, 4),
+                    "total_seconds": round(time.perf_counter() - start, 4)
+                }
+            },
+            "documents": analyses,
+            "sections": ranked_sections
+        }
+
+    def analyze_collection_batch(self, file_paths: Sequence[str],
+                                 queries: Sequence[Tuple[Dict[str, str], Dict[str, str]]],
+                                 top_k: Optional[int] = None, scoring: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Analyze a collection once and rank its sections for several
+        persona/job queries in one pass (see BatchRanker); requires NumPy.
+
+        Args:
+            queries: (user_persona, user_job) pairs
+            top_k: Entries kept per ranked list (all sections if None)
+            scoring: "tfidf" or "bm25" to rank with corpus-level scores
+
+        Returns:
+            Dictionary with the per-document analyses, one ranked list of
+            RankedSection entries per query, and timing metadata. Entries
+            reference the analyses' sections, each tagged with its
+            "document", and carry the query's persona annotations.
+        """
+        from src.batch_ranker import BatchRanker  # NumPy is only needed for batch ranking
+
+        start = time.perf_counter()
+        analyses = self.analyze_documents(file_paths)
+        analysis_seconds = time.perf_counter() - start
+
+        ranking_start = time.perf_counter()
+        sections = []
+        for analysis in analyses:
+            for section in analysis["sections"]:
+                # Tagged in place: the ranked lists share these sections rather than copying them
+                section["document"] = analysis["metadata"]["filename"]
+                sections.append(section)
+        plans = [self.persona_processor.plan_query(user_persona, user_job) for user_persona, user_job in queries]
+        engine = self.scoring_engine(self.section_index(analyses), scoring) if scoring is not None else None
+        rankings = BatchRanker(self.persona_processor, self.section_ranker).rank(sections, plans, top_k, engine)
+        ranking_seconds = time.perf_counter() - ranking_start
+
+        return {
+            "metadata": {
+                "input_documents": [Path(path).name for path in file_paths],
+                "queries": len(plans),
+                "sections": len(sections),
+                "timings": {
+                    "analysis_seconds": round(analysis_seconds, 4),
+                    "ranking_seconds": round(ranking_seconds, 4),
+                    "total_seconds": round(time.perf_counter() - start, 4)
+                }
+            },
+            "documents": analyses,
+            "rankings": rankings
+        }
+
+    def _summed_metadata(self, analyses: List[Dict[str, Any]], key: str) -> float:
+        """Sum of a per-document metadata value; cached or failed analyses count as 0."""
+        return round(sum(analysis["metadata"].get(key, 0.0) for analysis in analyses), 4)
+
+    def _apply_persona(self, analyses: List[Dict[str, Any]], user_persona: Dict[str, str], user_job: Dict[str, str],
+                       query_plan: QueryPlan, positions: Optional[Set[int]] = None) -> Tuple[List[Dict[str, Any]], float]:
+        """
+        Run the persona processor on each document and merge the sections in
+        document order, keeping only the given collection-wide positions if set.
+        """
+        start = time.perf_counter()
+        merged_sections = []
+        offset = 0
+        for analysis in analyses:
+            sections = analysis["sections"]
+            if positions is not None:
+                sections = [section for i, section in enumerate(sections, offset) if i in positions]
+            offset += len(analysis["sections"])
+            persona_analysis = self.persona_processor.process_with_persona({"sections": sections}, user_persona, user_job, query_plan)
+            for section in persona_analysis["sections"]:
+                # The persona processor returns copies, so tagging them leaves the analysis untouched
+                section["document"] = analysis["metadata"]["filename"]
+                merged_sections.append(section)
+        return merged_sections, time.perf_counter() - start
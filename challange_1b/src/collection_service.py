@@ -0,0 +1,226 @@
+"""
+Collection Service for Challenge 1B - Persona-Driven Document Intelligence
+Asyncio front end that accepts many collection/persona jobs at once and
+runs them on a process pool. A bounded queue sits in front of the pool:
+when it is full, submit() waits (backpressure) and submit_nowait() raises
+asyncio.QueueFull, so callers can shed load. Per-job latencies are
+recorded in histograms.
+"""
+
+import asyncio
+import bisect
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from src.collection_analyzer import CollectionAnalyzer
+
+# Histogram bucket upper bounds in seconds; the last bucket is unbounded
+LATENCY_BUCKETS = (0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+# One collection analyzer per worker process, built by _init_worker and kept
+# across jobs, so repeated queries on a collection reuse its token cache
+_worker_collection: Optional[CollectionAnalyzer] = None
+
+
+def _init_worker(analyzer_options: Dict[str, Any]) -> None:
+    global _worker_collection
+    _worker_collection = CollectionAnalyzer(workers=1, **analyzer_options)
+
+
+def _run_job(pdf_paths: Sequence[str], user_persona: Dict[str, str], user_job: Dict[str, str],
+             top_k_sections: Optional[int]) -> Dict[str, Any]:
+    """Analyze and rank one collection in a worker, returning only what the caller needs."""
+    result = _worker_collection.analyze_collection(pdf_paths, user_persona, user_job, max_results=top_k_sections)
+    return {
+        "metadata": result["metadata"],
+        "sections": result["sections"]
+    }
+
+
+class LatencyHistogram:
+    """Counts of latencies per bucket of LATENCY_BUCKETS, plus count, sum and extremes"""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def record(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """Upper bound of the bucket holding the given percentile (the maximum for the last bucket)."""
+        if not self.count:
+            return None
+        rank = percent / 100 * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank and bucket_count:
+                return min(self.buckets[i], self.max) if i < len(self.buckets) else self.max
+        return self.max
+
+    def summary(self) -> Dict[str, Any]:
+        labels = [f"<={bound}s" for bound in self.buckets] + [f">{self.buckets[-1]}s"]
+        return {
+            "count": self.count,
+            "mean_seconds": round(self.total / self.count, 4) if self.count else None,
+            "min_seconds": self.min,
+            "max_seconds": self.max,
+            "p50_seconds": self.percentile(50),
+            "p90_seconds": self.percentile(90),
+            "p99_seconds": self.percentile(99),
+            "buckets": dict(zip(labels, self.counts))
+        }
+
+
+class CollectionService:
+    """Runs collection/persona jobs concurrently on a process pool behind a bounded queue"""
+
+    def __init__(self, workers: Optional[int] = None, max_pending: int = 64,
+                 top_k_sections: Optional[int] = None, **analyzer_options):
+        """
+        Args:
+            workers: Worker processes, and jobs running at once; defaults to the CPU count
+            max_pending: Jobs queued beyond the running ones before submitters are held back
+            top_k_sections: Ranked sections returned per job (all if None)
+            analyzer_options: Passed to DocumentAnalyzer in every worker
+        """
+        if max_pending < 1:
+            raise ValueError("max_pending must be at least 1")
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.top_k_sections = top_k_sections
+        self.analyzer_options = analyzer_options
+        self.histograms = {name: LatencyHistogram() for name in ("queued", "run", "total")}
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.max_queue_depth = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._dispatchers: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        """Start the worker processes and one dispatcher per worker."""
+        if self._executor is not None:
+            raise RuntimeError("Service already started")
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                             initargs=(self.analyzer_options,))
+        self._dispatchers = [asyncio.create_task(self._dispatch()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """Finish the queued jobs, then stop the dispatchers and worker processes."""
+        if self._executor is None:
+            return
+        await self._queue.join()
+        for dispatcher in self._dispatchers:
+            dispatcher.cancel()
+        await asyncio.gather(*self._dispatchers, return_exceptions=True)
+        await asyncio.get_running_loop().run_in_executor(None, self._executor.shutdown)
+        self._executor = None
+        self._dispatchers = []
+
+    async def __aenter__(self) -> "CollectionService":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+
+    async def submit(self, pdf_paths: Sequence[str], user_persona: Dict[str, str],
+                     user_job: Dict[str, str]) -> Dict[str, Any]:
+        """
+        Run one job and return its ranked sections and metadata, waiting for
+        room in the queue first when it is full.
+        """
+        entry, future = self._new_entry(pdf_paths, user_persona, user_job)
+        await self._queue.put(entry)
+        self._queued(entry)
+        return await future
+
+    async def submit_nowait(self, pdf_paths: Sequence[str], user_persona: Dict[str, str],
+                            user_job: Dict[str, str]) -> Dict[str, Any]:
+        """Like submit, but raise asyncio.QueueFull instead of waiting when the queue is full."""
+        entry, future = self._new_entry(pdf_paths, user_persona, user_job)
+        try:
+            self._queue.put_nowait(entry)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise
+        self._queued(entry)
+        return await future
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue_depth": self.max_queue_depth,
+            "latency": {name: histogram.summary() for name, histogram in self.histograms.items()}
+        }
+
+    def _new_entry(self, pdf_paths: Sequence[str], user_persona: Dict[str, str],
+                   user_job: Dict[str, str]) -> Tuple[Dict[str, Any], asyncio.Future]:
+        if self._executor is None:
+            raise RuntimeError("Service is not running; use start() or 'async with'")
+        future = asyncio.get_running_loop().create_future()
+        entry = {
+            "args": ([str(path) for path in pdf_paths], user_persona, user_job, self.top_k_sections),
+            "future": future,
+            "submitted_at": time.perf_counter()
+        }
+        return entry, future
+
+    def _queued(self, entry: Dict[str, Any]) -> None:
+        # Queue wait is measured from here, so time held back by backpressure is not counted twice
+        entry["queued_at"] = time.perf_counter()
+        self.submitted += 1
+        self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize())
+
+    async def _dispatch(self) -> None:
+        """Feed queued jobs to the pool one at a time, so at most `workers` jobs run at once."""
+        loop = asyncio.get_running_loop()
+        while True:
+            entry = await self._queue.get()
+            try:
+                started_at = time.perf_counter()
+                future = entry["future"]
+                try:
+                    result = await loop.run_in_executor(self._executor, partial(_run_job, *entry["args"]))
+                except Exception as e:
+                    self.failed += 1
+                    if not future.done():
+                        future.set_exception(e)
+                    continue
+                finished_at = time.perf_counter()
+                latency = {
+                    "queued_seconds": started_at - entry["queued_at"],
+                    "run_seconds": finished_at - started_at,
+                    "total_seconds": finished_at - entry["submitted_at"]
+                }
+                self.histograms["queued"].record(latency["queued_seconds"])
+                self.histograms["run"].record(latency["run_seconds"])
+                self.histograms["total"].record(latency["total_seconds"])
+                self.completed += 1
+                result["metadata"]["latency"] = {name: round(seconds, 4) for name, seconds in latency.items()}
+                if not future.done():
+                    future.set_result(result)
+            finally:
+                self._queue.task_done()
@@ -4,20 +4,69 @@ Handles PDF text extraction and basic document structure analysis.
 """
 
 import fitz  # PyMuPDF
-import re
+import heapq
+import time
 from pathlib import Path
-from typing import Dict, List, Any, Tuple
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Dict, Iterable, Iterator, List, Any, Optional, Pattern, Sequence, Tuple
 from datetime import datetime
 
+from src.analysis_cache import AnalysisCache
+from src.document_text import DocumentText
+from src.patterns import HEADER_PATTERNS, HEADER_CANDIDATE, LIST_ITEM, HEADER_BREAK, CAPITALIZED
+from utils.parser import iter_pages
+
+# "first": the first max_sections sections in detection order, stopping as soon as they are found
+# "top-confidence": the max_sections most confident sections of the whole document
+SELECTION_POLICIES = ("first", "top-confidence")
+
+# Bump whenever a change alters analysis output, so cached results are not reused
+ANALYZER_VERSION = "3"
+
 
 class DocumentAnalyzer:
     """Analyzes PDF documents and extracts structured content"""
     
-    def __init__(self):
+    def __init__(self, max_sections: int = 50, selection_policy: str = "first", min_confidence: float = 0.0,
+                 cache: Optional[AnalysisCache] = None, max_pages: Optional[int] = None,
+                 complete_text: bool = True):
+        """
+        Args:
+            max_sections: Maximum number of sections kept per document
+            selection_policy: How sections are chosen, see SELECTION_POLICIES
+            min_confidence: Sections scoring below this confidence are skipped
+            cache: Analysis cache answering unchanged PDFs without opening them
+            max_pages: Only the first max_pages pages are read (all if None)
+            complete_text: Keep reading pages after section detection has
+                stopped, so full_text covers every page within max_pages.
+                When False, reading stops with detection.
+        """
+        if selection_policy not in SELECTION_POLICIES:
+            raise ValueError(f"Unknown selection policy '{selection_policy}', expected one of {SELECTION_POLICIES}")
         self.min_section_length = 30
         self.max_section_length = 2000
-        self.max_sections = 50
+        self.max_sections = max_sections
         self.max_lookahead_lines = 5
+        self.selection_policy = selection_policy
+        self.min_confidence = min_confidence
+        self.cache = cache
+        self.max_pages = max_pages
+        self.complete_text = complete_text
+    
+    def cache_config(self) -> Dict[str, Any]:
+        """Everything that influences analysis output, used in cache keys."""
+        return {
+            "version": ANALYZER_VERSION,
+            "min_section_length": self.min_section_length,
+            "max_section_length": self.max_section_length,
+            "max_sections": self.max_sections,
+            "max_lookahead_lines": self.max_lookahead_lines,
+            "selection_policy": self.selection_policy,
+            "min_confidence": self.min_confidence,
+            "max_pages": self.max_pages,
+            "complete_text": self.complete_text
+        }
     
     def analyze_document(self, file_path: str) -> Dict[str, Any]:
         """
@@ -27,15 +76,50 @@ class DocumentAnalyzer:
             file_path: Path to the PDF file
             
         Returns:
-            Dictionary containing document analysis results
+            Dictionary containing document analysis results. "full_text" is
+            the document buffer itself and "pages" a lazy sequence of page
+            records sliced from it, so the text is held only once. Pages are
+            extracted as section detection asks for them and pages past
+            max_pages are never read. With complete_text the text covers
+            every page up to max_pages; without it, reading stops when
+            detection does and the text covers only the pages read.
+            Metadata reports the pages read and the extraction and detection
+            seconds. Results served from the cache have metadata["cache_hit"] set.
         """
         try:
-            doc = fitz.open(file_path)
-            full_text, page_contents = self._extract_pdf_content(doc)
-            doc.close()
+            if self.cache is not None:
+                # Section ids embed the file name, so it is part of the key too
+                key = self.cache.key_for(file_path, {**self.cache_config(), "filename": Path(file_path).name})
+                cached = self.cache.get(key)
+                if cached is not None:
+                    return self._analysis_from_cache(cached)
+            
+            timings = {"extraction_seconds": 0.0}
+            page_texts: List[str] = []
+            with fitz.open(file_path) as doc:
+                page_count = len(doc)
+                start = time.perf_counter()
+                pages = self._iter_pdf_pages(doc, page_texts, timings)
+                sections = self._process_detected_sections(self._iter_candidate_sections(pages), Path(file_path).name)
+                timings["detection_seconds"] = time.perf_counter() - start - timings["extraction_seconds"]
+                if self.complete_text:
+                    # Detection may stop before the last page; the text still covers them all
+                    for _ in pages:
+                        pass
             
-            sections = self._detect_sections(full_text, Path(file_path).name, page_contents)
-            metadata = self._generate_metadata(file_path, page_contents, full_text, sections)
+            document = DocumentText(page_texts)
+            full_text, page_contents = document.full_text, document.pages
+            metadata = self._generate_metadata(file_path, page_contents, full_text, sections, page_count)
+            
+            if self.cache is not None:
+                self.cache.put(key, {
+                    "metadata": metadata,
+                    "full_text": full_text,
+                    "offsets": document.offsets.tolist(),
+                    "sections": sections
+                })
+            # Timings describe this run only, so they are not cached
+            metadata.update({name: round(seconds, 4) for name, seconds in timings.items()})
             
             return {
                 "metadata": metadata,
@@ -47,30 +131,43 @@ class DocumentAnalyzer:
         except Exception as e:
             return self._create_error_response(file_path, e)
     
-    def _extract_pdf_content(self, doc) -> Tuple[str, List[Dict]]:
-        """Extract text content from PDF document."""
-        full_text = ""
-        page_contents = []
-        
-        for page_num in range(len(doc)):
-            page = doc[page_num]
-            page_text = page.get_text()
-            full_text += page_text + "\n"
-            
-            page_contents.append({
-                "page_number": page_num + 1,
-                "text": page_text.strip(),
-                "char_count": len(page_text)
-            })
-        
-        return full_text, page_contents
+    def _analysis_from_cache(self, cached: Dict[str, Any]) -> Dict[str, Any]:
+        """Rebuild an analysis result from a cache entry."""
+        document = DocumentText.from_buffer(cached["full_text"], cached["offsets"])
+        cached["metadata"]["cache_hit"] = True
+        return {
+            "metadata": cached["metadata"],
+            "full_text": document.full_text,
+            "pages": document.pages,
+            "sections": cached["sections"]
+        }
+    
+    def _iter_pdf_pages(self, doc, page_texts: List[str], timings: Dict[str, float]) -> Iterator[Dict[str, Any]]:
+        """
+        Extract page records one page at a time, as the consumer asks for
+        them, appending each raw page text to page_texts and the time spent
+        to timings["extraction_seconds"].
+        """
+        start = time.perf_counter()
+        for page in iter_pages(doc, self.max_pages, skip_empty=False):
+            timings["extraction_seconds"] += time.perf_counter() - start
+            text = page["text"]
+            page_texts.append(text)
+            # Same record as DocumentText.page
+            yield {
+                "page_number": page["page_number"],
+                "text": text.strip(),
+                "char_count": len(text)
+            }
+            start = time.perf_counter()
     
-    def _generate_metadata(self, file_path: str, pages: List[Dict], 
-                          full_text: str, sections: List[Dict]) -> Dict[str, Any]:
+    def _generate_metadata(self, file_path: str, pages: Sequence[Dict], 
+                          full_text: str, sections: List[Dict], page_count: Optional[int] = None) -> Dict[str, Any]:
         """Generate document metadata."""
         return {
             "filename": Path(file_path).name,
-            "total_pages": len(pages),
+            "total_pages": len(pages) if page_count is None else page_count,
+            "pages_read": len(pages),
             "total_characters": len(full_text),
             "total_sections": len(sections),
             "processing_timestamp": datetime.now().isoformat()
@@ -86,97 +183,137 @@ class DocumentAnalyzer:
             "sections": []
         }
     
-    def _detect_sections(self, text: str, filename: str, pages: List[Dict]) -> List[Dict[str, Any]]:
+    def _detect_sections(self, text: str, filename: str, pages: Sequence[Dict]) -> List[Dict[str, Any]]:
         """Detect logical sections within the document text."""
-        sections = []
+        return self._process_detected_sections(self._iter_candidate_sections(pages), filename)
+    
+    def _iter_candidate_sections(self, pages: Sequence[Dict]) -> Iterator[Dict[str, Any]]:
+        """
+        Yield detected sections lazily: headers page by page, then paragraphs,
+        then lists. One pass over each page's lines finds all three kinds; a
+        consumer that stops early leaves the remaining pages unscanned.
+        """
+        paragraph_sections = []
+        list_sections = []
+        patterns = self._get_header_patterns()
         
-        # Apply different detection strategies
-        sections.extend(self._detect_by_headers(text, pages))
-        sections.extend(self._detect_by_paragraphs(text, pages))
-        sections.extend(self._detect_by_lines(text, pages))
+        for page_info in pages:
+            headers, paragraphs, lists = self._scan_page(page_info, patterns)
+            yield from headers
+            paragraph_sections.extend(paragraphs)
+            list_sections.extend(lists)
         
-        # Process and deduplicate sections
-        return self._process_detected_sections(sections, filename)
+        yield from paragraph_sections
+        yield from list_sections
     
-    def _process_detected_sections(self, sections: List[Dict], filename: str) -> List[Dict[str, Any]]:
-        """Remove duplicates and add metadata to detected sections."""
+    def _process_detected_sections(self, sections: Iterable[Dict], filename: str) -> List[Dict[str, Any]]:
+        """
+        Remove duplicates and add metadata to detected sections, keeping at
+        most max_sections of them according to the selection policy.
+        "first" stops consuming sections once enough are kept; "top-confidence"
+        keeps a bounded heap and counts words only for the sections it returns.
+        """
         unique_sections = []
         seen_titles = set()
+        heap = []  # (confidence, -index, index, section): lowest confidence, then latest, on top
         
         for i, section in enumerate(sections):
-            if self._is_valid_section(section, seen_titles):
-                section.update({
-                    "section_id": f"{filename}_section_{i+1}",
-                    "word_count": len(section.get("content", "").split()),
-                    "confidence_score": self._calculate_confidence(section)
-                })
-                unique_sections.append(section)
-                seen_titles.add(section["section_title"])
+            if not self._is_valid_section(section, seen_titles):
+                continue
+            confidence = self._calculate_confidence(section)
+            if confidence < self.min_confidence:
+                continue
+            seen_titles.add(section["section_title"])
+            
+            if self.selection_policy == "first":
+                unique_sections.append(self._add_section_metadata(section, filename, i, confidence))
+                if len(unique_sections) >= self.max_sections:
+                    break
+            elif len(heap) < self.max_sections:
+                heapq.heappush(heap, (confidence, -i, i, section))
+            elif (confidence, -i) > heap[0][:2]:
+                heapq.heapreplace(heap, (confidence, -i, i, section))
         
-        return unique_sections[:self.max_sections]
+        if self.selection_policy == "top-confidence":
+            # Most confident first, earlier sections first among equals
+            for confidence, _, i, section in sorted(heap, key=lambda entry: (-entry[0], entry[2])):
+                unique_sections.append(self._add_section_metadata(section, filename, i, confidence))
+        return unique_sections
+    
+    def _add_section_metadata(self, section: Dict[str, Any], filename: str, index: int, confidence: float) -> Dict[str, Any]:
+        """Add id, word count and confidence to a kept section."""
+        section.update({
+            "section_id": f"{filename}_section_{index+1}",
+            "word_count": len(section.get("content", "").split()),
+            "confidence_score": confidence
+        })
+        return section
     
     def _is_valid_section(self, section: Dict[str, Any], seen_titles: set) -> bool:
         """Check if a section is valid and not a duplicate."""
         title = section.get("section_title", "")
         return title and title not in seen_titles and len(title) > 3
     
-    def _detect_by_headers(self, text: str, pages: List[Dict]) -> List[Dict[str, Any]]:
-        """Detect heading-style sections."""
-        sections = []
-        patterns = self._get_header_patterns()
-        
-        for page_info in pages:
-            page_sections = self._find_headers_in_page(page_info, patterns)
-            sections.extend(page_sections)
-        
-        return sections
-    
-    def _get_header_patterns(self) -> List[str]:
-        """Get regex patterns for header detection."""
-        return [
-            r'^([A-Z][A-Z\s]{5,40})$',  # ALL CAPS headers
-            r'^(\d+\.?\s+[A-Z][^.!?]*?)(?:\n|$)',  # Numbered headers
-            r'^([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*):',  # Title Case with colon
-            r'(?:Chapter|Section)\s+\d+[:\-\s]*(.+)',  # Chapter/Section titles
-        ]
-    
-    def _find_headers_in_page(self, page_info: Dict, patterns: List[str]) -> List[Dict[str, Any]]:
-        """Find headers in a single page."""
-        sections = []
+    def _scan_page(self, page_info: Dict, patterns: Sequence[Pattern]) -> Tuple[List[Dict], List[Dict], List[Dict]]:
+        """
+        Split a page into lines once and walk them a single time, emitting
+        header, paragraph (runs of lines between blank lines) and list
+        sections. Returns the three lists, each in page order.
+        """
         page_num = page_info["page_number"]
         page_text = page_info["text"]
         lines = page_text.split('\n')
+        stripped = [line.strip() for line in lines]
+        line_starts = None  # Character offset of each line, computed on the first header
+        headers, paragraphs, lists = [], [], []
         
-        for line in lines:
-            line = line.strip()
-            if not self._is_valid_line(line):
-                continue
+        paragraph_start = 0
+        for i, line in enumerate(stripped):
+            if not lines[i]:
+                self._add_paragraph_section(paragraphs, lines, paragraph_start, i, page_num)
+                paragraph_start = i + 1
             
-            header_match = self._match_header_patterns(line, patterns)
-            if header_match:
-                section = self._create_header_section(header_match, page_text, page_num)
+            if self._is_valid_line(line):
+                title = self._match_header_patterns(line, patterns)
+                if title:
+                    if line_starts is None:
+                        line_starts = list(accumulate((len(raw) + 1 for raw in lines), initial=0))
+                    # The body follows the first line mentioning the title, which may precede this one
+                    first = bisect_right(line_starts, page_text.find(title.strip(), 0, line_starts[i + 1])) - 1
+                    section = self._create_header_section(title, self._extract_content_after_header(stripped, first, title), page_num)
+                    if section:
+                        headers.append(section)
+            
+            if self._is_list_item(line):
+                section = self._create_list_section(lines, i, page_num)
                 if section:
-                    sections.append(section)
+                    lists.append(section)
         
-        return sections
+        self._add_paragraph_section(paragraphs, lines, paragraph_start, len(lines), page_num)
+        return headers, paragraphs, lists
+    
+    def _get_header_patterns(self) -> Sequence[Pattern]:
+        """Get the precompiled regex patterns for header detection."""
+        return HEADER_PATTERNS
     
     def _is_valid_line(self, line: str) -> bool:
         """Check if a line is valid for header detection."""
         return bool(line and len(line) >= 5)
     
-    def _match_header_patterns(self, line: str, patterns: List[str]) -> str:
+    def _match_header_patterns(self, line: str, patterns: Sequence[Pattern]) -> str:
         """Try to match line against header patterns."""
+        if not HEADER_CANDIDATE.search(line):
+            return None
         for pattern in patterns:
-            match = re.search(pattern, line, re.MULTILINE)
+            match = pattern.search(line)
             if match:
                 title = match.group(1).strip().rstrip(':')
                 if 5 < len(title) < 80:
                     return title
         return None
     
-    def _create_header_section(self, title: str, page_text: str, page_num: int) -> Dict[str, Any]:
-        """Create a section from detected header."""
-        content = self._extract_content_after_header(page_text, title)
+    def _create_header_section(self, title: str, content: str, page_num: int) -> Dict[str, Any]:
+        """Create a section from detected header and its body."""
         if content:
             return {
                 "section_title": title,
@@ -186,30 +323,13 @@ class DocumentAnalyzer:
             }
         return None
     
-    def _detect_by_paragraphs(self, text: str, pages: List[Dict]) -> List[Dict[str, Any]]:
-        """Detect paragraph-based sections."""
-        sections = []
-        
-        for page_info in pages:
-            page_sections = self._extract_paragraph_sections(page_info)
-            sections.extend(page_sections)
-        
-        return sections
-    
-    def _extract_paragraph_sections(self, page_info: Dict) -> List[Dict[str, Any]]:
-        """Extract sections from paragraphs in a page."""
-        sections = []
-        page_num = page_info["page_number"]
-        page_text = page_info["text"]
-        
-        paragraphs = [p.strip() for p in page_text.split('\n\n') if p.strip()]
-        
-        for paragraph in paragraphs:
-            if self._is_valid_paragraph_length(paragraph):
-                section = self._create_paragraph_section(paragraph, page_num)
-                sections.append(section)
-        
-        return sections
+    def _add_paragraph_section(self, sections: List[Dict], lines: List[str], start: int, end: int, page_num: int) -> None:
+        """Add the paragraph made of lines[start:end] when its length is valid."""
+        if start >= end:
+            return
+        paragraph = '\n'.join(lines[start:end]).strip()
+        if paragraph and self._is_valid_paragraph_length(paragraph):
+            sections.append(self._create_paragraph_section(paragraph, page_num))
     
     def _is_valid_paragraph_length(self, paragraph: str) -> bool:
         """Check if paragraph length is within valid range."""
@@ -231,35 +351,9 @@ class DocumentAnalyzer:
         first_sentence = sentences[0]
         return first_sentence[:50] + "..." if len(first_sentence) > 50 else first_sentence
     
-    def _detect_by_lines(self, text: str, pages: List[Dict]) -> List[Dict[str, Any]]:
-        """Detect line-based structured content."""
-        sections = []
-        
-        for page_info in pages:
-            page_sections = self._extract_list_sections(page_info)
-            sections.extend(page_sections)
-        
-        return sections
-    
-    def _extract_list_sections(self, page_info: Dict) -> List[Dict[str, Any]]:
-        """Extract list-based sections from a page."""
-        sections = []
-        page_num = page_info["page_number"]
-        page_text = page_info["text"]
-        lines = page_text.split('\n')
-        
-        for i, line in enumerate(lines):
-            line = line.strip()
-            if self._is_list_item(line):
-                section = self._create_list_section(lines, i, page_num)
-                if section:
-                    sections.append(section)
-        
-        return sections
-    
     def _is_list_item(self, line: str) -> bool:
         """Check if line is a list item."""
-        return bool(re.match(r'^[\•\-\*]\s+.+', line) or re.match(r'^\d+[\.\)]\s+.+', line))
+        return bool(LIST_ITEM.match(line))
     
     def _create_list_section(self, lines: List[str], start_index: int, page_num: int) -> Dict[str, Any]:
         """Create a section from list items."""
@@ -295,23 +389,24 @@ class DocumentAnalyzer:
     def _is_continuation_line(self, line: str) -> bool:
         """Check if line continues the current list section."""
         return (self._is_list_item(line) or 
-                (line and not re.match(r'^[A-Z]', line)))
+                (line and not CAPITALIZED.match(line)))
     
-    def _extract_content_after_header(self, page_text: str, header_line: str) -> str:
-        """Extract content that follows a detected header."""
-        lines = page_text.split('\n')
+    def _extract_content_after_header(self, lines: List[str], header_index: int, header_line: str) -> str:
+        """
+        Extract content that follows the header at lines[header_index].
+        Lines are expected stripped; later lines repeating the header are skipped.
+        """
         content_lines = []
-        found_header = False
+        content_length = 0  # len(' '.join(content_lines)), kept incrementally
         
-        for line in lines:
+        for k in range(header_index + 1, len(lines)):
+            line = lines[k]
             if self._is_header_line(line, header_line):
-                found_header = True
                 continue
-            
-            if found_header:
-                if self._should_stop_content_extraction(line, content_lines):
-                    break
-                content_lines.append(line.strip())
+            if self._should_stop_content_extraction(line, content_length):
+                break
+            content_length += len(line) + (1 if content_lines else 0)
+            content_lines.append(line)
         
         return ' '.join(content_lines)
     
@@ -319,19 +414,18 @@ class DocumentAnalyzer:
         """Check if current line matches the header."""
         return header_line.strip() in line.strip()
     
-    def _should_stop_content_extraction(self, line: str, content_lines: List[str]) -> bool:
-        """Determine if content extraction should stop."""
+    def _should_stop_content_extraction(self, line: str, content_length: int) -> bool:
+        """Determine if content extraction should stop, given the content length so far."""
         line = line.strip()
         if not line:
             return False
         
         # Stop if we hit another header
-        if (re.match(r'^[A-Z][A-Z\s]{5,}$', line) or 
-            re.match(r'^\d+\.?\s+[A-Z]', line)):
+        if HEADER_BREAK.match(line):
             return True
         
         # Stop if content is too long
-        return len(' '.join(content_lines)) > self.max_section_length
+        return content_length > self.max_section_length
     
     def _calculate_confidence(self, section: Dict[str, Any]) -> float:
         """Calculate confidence score for a detected section."""
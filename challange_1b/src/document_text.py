@@ -0,0 +1,84 @@
+"""
+Compact text representation of a PDF document.
+All page texts live in one contiguous string with an offset array marking
+where each page starts, so a document is held once instead of once as
+full_text and again per page. Page records are sliced out on demand.
+"""
+
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Union
+
+
+class DocumentText:
+    """One buffer for the whole document plus per-page offsets"""
+
+    __slots__ = ("full_text", "offsets")
+
+    def __init__(self, page_texts: Iterable[str]):
+        parts: List[str] = []
+        offsets = array("Q", [0])
+        for text in page_texts:
+            parts.append(text)
+            parts.append("\n")
+            offsets.append(offsets[-1] + len(text) + 1)
+        # Joined once, so building costs linear time whatever the page count
+        self.full_text = "".join(parts)
+        self.offsets = offsets
+
+    @classmethod
+    def from_pdf(cls, doc) -> "DocumentText":
+        return cls(page.get_text() for page in doc)
+
+    @classmethod
+    def from_buffer(cls, full_text: str, offsets: Iterable[int]) -> "DocumentText":
+        """Rebuild from the full_text and offsets of an existing DocumentText."""
+        document = cls.__new__(cls)
+        document.full_text = full_text
+        document.offsets = array("Q", offsets)
+        return document
+
+    @property
+    def page_count(self) -> int:
+        return len(self.offsets) - 1
+
+    def raw_page_text(self, index: int) -> str:
+        """Text of the page at 0-based index, exactly as extracted."""
+        return self.full_text[self.offsets[index]:self.offsets[index + 1] - 1]
+
+    def page(self, index: int) -> Dict[str, Any]:
+        """Page record at 0-based index: {"page_number", "text" (stripped), "char_count"}."""
+        text = self.raw_page_text(index)
+        return {
+            "page_number": index + 1,
+            "text": text.strip(),
+            "char_count": len(text)
+        }
+
+    @property
+    def pages(self) -> "PageRecords":
+        return PageRecords(self)
+
+
+class PageRecords(Sequence):
+    """Read-only list of page records, each built from the buffer when accessed"""
+
+    __slots__ = ("_document",)
+
+    def __init__(self, document: DocumentText):
+        self._document = document
+
+    def __len__(self) -> int:
+        return self._document.page_count
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return [self._document.page(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("page index out of range")
+        return self._document.page(index)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for i in range(len(self)):
+            yield self._document.page(i)
@@ -0,0 +1,82 @@
+"""
+Keyword matcher for the persona vocabularies and insight rules.
+Keywords are single words, so a keyword occurs in a text exactly when it
+occurs inside one of the text's word tokens. The matcher therefore scans
+each distinct token of a section once, finding every keyword it contains
+with set lookups of its substrings, and remembers the answer per token.
+The cost per section depends on its tokens, not on the vocabulary size.
+"""
+
+from typing import Dict, FrozenSet, Iterable, List, Sequence, Set, Tuple
+
+from src.patterns import WORD
+
+DEFAULT_MAX_CACHED_TOKENS = 200000
+
+
+class KeywordMatcher:
+    """Reports which keywords of a fixed vocabulary occur in a set of tokens"""
+
+    def __init__(self, keywords: Iterable[str], max_cached_tokens: int = DEFAULT_MAX_CACHED_TOKENS):
+        """
+        Args:
+            keywords: Lowercase single-word keywords, matched as substrings of tokens
+            max_cached_tokens: Per-token results kept before the memo is reset
+        """
+        self.keywords = frozenset(keywords)
+        for keyword in self.keywords:
+            if not WORD.fullmatch(keyword):
+                raise ValueError(f"Keyword '{keyword}' is not a single word")
+        self.min_length = min(map(len, self.keywords), default=0)
+        self.max_length = max(map(len, self.keywords), default=0)
+        self.max_cached_tokens = max_cached_tokens
+        self._token_matches: Dict[str, FrozenSet[str]] = {}
+
+    def token_matches(self, token: str) -> FrozenSet[str]:
+        """Keywords occurring inside token."""
+        found = self._token_matches.get(token)
+        if found is None:
+            keywords = self.keywords
+            length = len(token)
+            found = frozenset(
+                token[start:end]
+                for start in range(length - self.min_length + 1)
+                for end in range(start + self.min_length, min(start + self.max_length, length) + 1)
+                if token[start:end] in keywords
+            ) if self.min_length else frozenset()
+            if len(self._token_matches) >= self.max_cached_tokens:
+                self._token_matches.clear()
+            self._token_matches[token] = found
+        return found
+
+    def matches(self, tokens: Iterable[str]) -> Set[str]:
+        """All keywords occurring in any of tokens; pass each distinct token once."""
+        found: Set[str] = set()
+        for token in tokens:
+            token_found = self.token_matches(token)
+            if token_found:
+                found |= token_found
+        return found
+
+
+class InsightRules:
+    """Ordered (keywords, insight) rules evaluated together against one keyword scan"""
+
+    def __init__(self, rules: Sequence[Tuple[Iterable[str], str]]):
+        self.rules: List[Tuple[FrozenSet[str], str]] = [(frozenset(keywords), insight) for keywords, insight in rules]
+        # keyword -> indices of the rules it fires, so only rules with a found keyword are visited
+        self._rules_by_keyword: Dict[str, List[int]] = {}
+        for i, (keywords, _) in enumerate(self.rules):
+            for keyword in keywords:
+                self._rules_by_keyword.setdefault(keyword, []).append(i)
+
+    @property
+    def keywords(self) -> Set[str]:
+        return set(self._rules_by_keyword)
+
+    def fired(self, found: Set[str]) -> List[str]:
+        """Insights, in rule order, of the rules with a keyword among found."""
+        indices = set()
+        for keyword in found:
+            indices.update(self._rules_by_keyword.get(keyword, ()))
+        return [self.rules[i][1] for i in sorted(indices)]
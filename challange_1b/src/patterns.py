@@ -0,0 +1,34 @@
+"""
+Precompiled regular expressions for the per-line predicates of
+DocumentAnalyzer and the tokenization of PersonaProcessor.
+Compiling once at import skips the re module's cache lookup on every call,
+and related checks are folded into one alternation so each line is scanned
+once. Challenge 1a keeps the same kind of bank in its patterns.py.
+"""
+
+import re
+
+# Header patterns in priority order; the first one yielding a usable title wins
+HEADER_PATTERNS = (
+    re.compile(r'^([A-Z][A-Z\s]{5,40})$', re.MULTILINE),  # ALL CAPS headers
+    re.compile(r'^(\d+\.?\s+[A-Z][^.!?]*?)(?:\n|$)', re.MULTILINE),  # Numbered headers
+    re.compile(r'^([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*):', re.MULTILINE),  # Title Case with colon
+    re.compile(r'(?:Chapter|Section)\s+\d+[:\-\s]*(.+)', re.MULTILINE),  # Chapter/Section titles
+)
+# Cheap gate matching every line any header pattern could match, so most
+# body lines are rejected with a single scan
+HEADER_CANDIDATE = re.compile(
+    r'^(?:[A-Z][A-Z\s]{5,40}$|\d+\.?\s+[A-Z]|[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*:)|(?:Chapter|Section)\s+\d+',
+    re.MULTILINE
+)
+
+# "• item", "- item", "* item", "1. item", "2) item"
+LIST_ITEM = re.compile(r'^(?:[•\-*]|\d+[.)])\s+.+')
+# A line that starts a new section ends the content gathered under a header
+HEADER_BREAK = re.compile(r'^(?:[A-Z][A-Z\s]{5,}$|\d+\.?\s+[A-Z])')
+CAPITALIZED = re.compile(r'^[A-Z]')
+
+# Tokenization: every word, and words of four or more characters. Without \b
+# anchors: a greedy \w run always spans a whole word, so the matches are the same
+WORD = re.compile(r'\w+')
+LONG_WORD = re.compile(r'\w{4,}')
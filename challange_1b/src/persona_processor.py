@@ -3,16 +3,24 @@ Persona Processor for Challenge 1B - Persona-Driven Document Intelligence
 Applies persona-specific context and perspective to document analysis.
 """
 
-import re
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from collections import Counter
 import math
 
+from src.keyword_matcher import InsightRules, KeywordMatcher
+from src.patterns import WORD, LONG_WORD
+from src.query_plan import QueryPlan
+from src.scoring_formulas import alignment_ratio, importance_level, relevance_score, relevant_concepts, role_observations
+from src.token_cache import SectionTokens, TokenCache
+
 
 class PersonaProcessor:
     """Processes documents through a specific persona lens"""
     
-    def __init__(self):
+    def __init__(self, token_cache: Optional[TokenCache] = None):
+        # Section tokens, shared with the section ranker when given the same cache
+        self.token_cache = token_cache if token_cache is not None else TokenCache()
+        
         # Define persona-specific keyword mappings
         self.role_terms = {
             "researcher": ["research", "study", "analysis", "methodology", "data", "experiment", "hypothesis", "literature", "publication", "findings", "results", "conclusion"],
@@ -31,97 +39,65 @@ class PersonaProcessor:
             "prepare": ["prepare", "plan", "organize", "design", "develop", "create"],
             "summarize": ["summarize", "condense", "extract", "highlight", "synthesize", "distill"]
         }
+        
+        # Insight rules: an insight applies when any of its keywords occurs in the content
+        self.role_insight_rules = {
+            "researcher": InsightRules([
+                (["methodology", "method", "approach"], "Research methodology identified"),
+                (["data", "dataset", "sample"], "Data sources and datasets mentioned"),
+                (["result", "finding", "conclusion"], "Research findings and results presented")
+            ]),
+            "student": InsightRules([
+                (["concept", "principle", "theory"], "Key concepts for learning identified"),
+                (["example", "illustration", "case"], "Examples and illustrations available"),
+                (["exercise", "problem", "practice"], "Practice materials and exercises found")
+            ]),
+            "analyst": InsightRules([
+                (["trend", "pattern", "analysis"], "Analytical insights and trends identified"),
+                (["metric", "kpi", "performance"], "Performance metrics and KPIs mentioned"),
+                (["forecast", "prediction", "projection"], "Forecasting and predictive information")
+            ])
+        }
+        self.task_insight_rules = {
+            "review": InsightRules([(["summary", "overview", "abstract"], "Summary content suitable for review")]),
+            "analyze": InsightRules([(["comparison", "contrast", "versus"], "Comparative analysis opportunities")])
+        }
+        
+        # Compiled forms: vocabularies as frozensets, and one matcher finding every
+        # insight keyword in a section at once
+        self.role_term_sets = {role: frozenset(terms) for role, terms in self.role_terms.items()}
+        self.task_term_sets = {task: frozenset(terms) for task, terms in self.task_terms.items()}
+        insight_rules = list(self.role_insight_rules.values()) + list(self.task_insight_rules.values())
+        self.insight_matcher = KeywordMatcher(set().union(*(rules.keywords for rules in insight_rules)))
 
-    def _compute_task_alignment_score(self, text_content: str, task_description: str) -> float:
+    def _compute_task_alignment_score(self, section_tokens: SectionTokens, query_plan: QueryPlan) -> float:
         """Calculate how well content aligns with the specific job task"""
-        normalized_content = text_content.lower()
-        normalized_task = task_description.lower()
-        
-        # Extract key terms from job task
-        task_keywords = set(re.findall(r'\b\w{4,}\b', normalized_task))  # Words with 4+ characters
-        content_keywords = set(re.findall(r'\b\w{4,}\b', normalized_content))
+        task_keywords = query_plan.task_keywords  # Words with 4+ characters
+        content_keywords = section_tokens.long_words
         
         if not task_keywords:
             return 0.0
         
         # Calculate overlap
         matched_terms = len(task_keywords.intersection(content_keywords))
-        similarity_score = matched_terms / len(task_keywords)
+        similarity_score = alignment_ratio(matched_terms, len(task_keywords))
         
         return min(similarity_score, 1.0)
 
-    def _extract_role_specific_observations(self, text_content: str, role_category: str, task_category: str) -> List[str]:
+    def _extract_role_specific_observations(self, section_tokens: SectionTokens, query_plan: QueryPlan) -> List[str]:
         """Extract insights specific to the persona's perspective"""
-        observations = []
-        normalized_text = text_content.lower()
-        
-        # Persona-specific insights
-        if role_category == "researcher":
-            if any(keyword in normalized_text for keyword in ["methodology", "method", "approach"]):
-                observations.append("Research methodology identified")
-            if any(keyword in normalized_text for keyword in ["data", "dataset", "sample"]):
-                observations.append("Data sources and datasets mentioned")
-            if any(keyword in normalized_text for keyword in ["result", "finding", "conclusion"]):
-                observations.append("Research findings and results presented")
-        
-        elif role_category == "student":
-            if any(keyword in normalized_text for keyword in ["concept", "principle", "theory"]):
-                observations.append("Key concepts for learning identified")
-            if any(keyword in normalized_text for keyword in ["example", "illustration", "case"]):
-                observations.append("Examples and illustrations available")
-            if any(keyword in normalized_text for keyword in ["exercise", "problem", "practice"]):
-                observations.append("Practice materials and exercises found")
-        
-        elif role_category == "analyst":
-            if any(keyword in normalized_text for keyword in ["trend", "pattern", "analysis"]):
-                observations.append("Analytical insights and trends identified")
-            if any(keyword in normalized_text for keyword in ["metric", "kpi", "performance"]):
-                observations.append("Performance metrics and KPIs mentioned")
-            if any(keyword in normalized_text for keyword in ["forecast", "prediction", "projection"]):
-                observations.append("Forecasting and predictive information")
-        
-        # Job-specific insights
-        if task_category == "review":
-            if any(keyword in normalized_text for keyword in ["summary", "overview", "abstract"]):
-                observations.append("Summary content suitable for review")
-        elif task_category == "analyze":
-            if any(keyword in normalized_text for keyword in ["comparison", "contrast", "versus"]):
-                observations.append("Comparative analysis opportunities")
-        
-        return observations
+        return role_observations(section_tokens, query_plan, self.insight_matcher)
 
     def _determine_importance_level(self, relevance_metric: float, observation_list: List[str], concept_list: List[str]) -> str:
         """Determine section priority based on persona analysis"""
-        if relevance_metric >= 0.6 and len(observation_list) >= 2:
-            return "high"
-        elif relevance_metric >= 0.3 and (len(observation_list) >= 1 or len(concept_list) >= 3):
-            return "medium"
-        else:
-            return "low"
+        return importance_level(relevance_metric, observation_list, concept_list)
 
-    def _find_relevant_concepts(self, text_content: str, role_category: str) -> List[str]:
+    def _find_relevant_concepts(self, section_tokens: SectionTokens, query_plan: QueryPlan) -> List[str]:
         """Identify key concepts relevant to the persona"""
-        normalized_content = text_content.lower()
-        word_tokens = re.findall(r'\b\w+\b', normalized_content)
-        
-        # Filter for relevant keywords based on persona
-        applicable_terms = self.role_terms.get(role_category, [])
-        
-        # Count frequency of relevant words
-        token_frequency = Counter(word_tokens)
-        
-        # Extract most common relevant concepts
-        important_concepts = []
-        for token in word_tokens:
-            if (token in applicable_terms and 
-                token_frequency[token] >= 1 and 
-                len(token) > 3 and 
-                token not in important_concepts):
-                important_concepts.append(token)
-        
-        return important_concepts[:10]  # Return top 10 concepts
+        return relevant_concepts(section_tokens, query_plan)
 
-    def process_with_persona(self, doc_analysis: Dict[str, Any], user_persona: Dict[str, str], user_job: Dict[str, str]) -> Dict[str, Any]:
+    def process_with_persona(self, doc_analysis: Dict[str, Any], user_persona: Dict[str, str], user_job: Dict[str, str],
+                             query_plan: Optional[QueryPlan] = None) -> Dict[str, Any]:
         """
         Process document analysis through persona perspective.
         
@@ -129,66 +105,88 @@ class PersonaProcessor:
             doc_analysis: Output from DocumentAnalyzer
             user_persona: Persona configuration with role description
             user_job: Job-to-be-done specification
+            query_plan: Plan from plan_query for this persona and job, reused
+                across documents; built here when not given
             
         Returns:
             Enhanced analysis with persona-specific insights
         """
-        role_description = user_persona.get("role", "").lower()
-        task_description = user_job.get("task", "").lower()
-        
-        # Identify persona type
-        detected_role = self._classify_user_role(role_description)
-        detected_task = self._classify_user_task(task_description)
+        if query_plan is None:
+            query_plan = self.plan_query(user_persona, user_job)
         
         # Process sections with persona context
         processed_sections = []
         for section_data in doc_analysis.get("sections", []):
-            enhanced_data = self._augment_section_with_role_context(
-                section_data, detected_role, detected_task, role_description, task_description
-            )
+            enhanced_data = self._augment_section_with_role_context(section_data, query_plan)
             processed_sections.append(enhanced_data)
         
         # Generate persona-specific metadata
         role_metadata = self._build_role_analysis_summary(
-            processed_sections, detected_role, role_description
+            processed_sections, query_plan.role_category, query_plan.role_description
         )
         
         return {
-            "persona_type": detected_role,
-            "persona_role": role_description,
-            "job_type": task_description,
-            "job_context": task_description,
+            "persona_type": query_plan.role_category,
+            "persona_role": query_plan.role_description,
+            "job_type": query_plan.task_description,
+            "job_context": query_plan.task_description,
             "sections": processed_sections
         }
 
-    def _compute_relevance_score(self, text_content: str, role_category: str, task_category: str, task_description: str) -> float:
+    def plan_query(self, user_persona: Dict[str, str], user_job: Dict[str, str]) -> QueryPlan:
+        """Classify persona and job and compile every keyword set the scorers use"""
+        role_description = user_persona.get("role", "").lower()
+        task_description = user_job.get("task", "").lower()
+        
+        # Identify persona type
+        detected_role = self._classify_user_role(role_description)
+        detected_task = self._classify_user_task(task_description)
+        
+        # Keywords sections are scored against, for retrieval from the section index
+        query_terms = set(self.role_terms.get(detected_role, []))
+        query_terms.update(self.task_terms.get(detected_task, []))
+        query_terms.update(WORD.findall(f"{role_description} {task_description}"))
+        
+        return QueryPlan.for_context(
+            user_persona, user_job,
+            role_description=role_description,
+            task_description=task_description,
+            role_category=detected_role,
+            task_category=detected_task,
+            role_terms=self.role_term_sets.get(detected_role, frozenset()),
+            task_terms=self.task_term_sets.get(detected_task, frozenset()),
+            direct_terms=frozenset(word for word in WORD.findall(task_description) if len(word) > 3),
+            task_keywords=frozenset(LONG_WORD.findall(task_description)),
+            role_rules=self.role_insight_rules.get(detected_role),
+            task_rules=self.task_insight_rules.get(detected_task),
+            query_terms=frozenset(term for term in query_terms if len(term) > 2)
+        )
+
+    def _compute_relevance_score(self, section_tokens: SectionTokens, query_plan: QueryPlan) -> float:
         """Calculate how relevant content is to the persona"""
-        normalized_content = text_content.lower()
-        word_tokens = re.findall(r'\b\w+\b', normalized_content)
+        word_tokens = section_tokens.all_words
         token_count = len(word_tokens)
         
         if token_count == 0:
             return 0.0
         
         # Score based on persona keywords
-        role_specific_terms = self.role_terms.get(role_category, [])
+        role_specific_terms = query_plan.role_terms
         role_matches = sum(1 for token in word_tokens if token in role_specific_terms)
-        role_relevance = role_matches / token_count
         
         # Score based on job keywords
-        task_specific_terms = self.task_terms.get(task_category, [])
+        task_specific_terms = query_plan.task_terms
         task_matches = sum(1 for token in word_tokens if token in task_specific_terms)
-        task_relevance = task_matches / token_count
         
         # Score based on specific job task terms
-        task_word_set = set(re.findall(r'\b\w+\b', task_description.lower()))
-        direct_matches = sum(1 for token in word_tokens if token in task_word_set and len(token) > 3)
-        direct_relevance = direct_matches / token_count
+        direct_terms = query_plan.direct_terms
+        direct_matches = sum(1 for token in word_tokens if token in direct_terms)
         
-        # Weighted combination
-        combined_score = (0.4 * role_relevance + 0.3 * task_relevance + 0.3 * direct_relevance)
+        # Weighted combination, scaled
+        combined_score = relevance_score(role_matches, task_matches, direct_matches, token_count,
+                                         query_plan.relevance_weights)
         
-        return min(combined_score * 10, 1.0)  # Scale and cap at 1.0
+        return min(combined_score, 1.0)  # Cap at 1.0
 
     def _classify_user_task(self, task_description: str) -> str:
         """Identify the primary job type from task description"""
@@ -230,19 +228,19 @@ class PersonaProcessor:
             "top_insights": key_observations
         }
 
-    def _augment_section_with_role_context(self, section_data: Dict[str, Any], role_category: str, task_category: str, role_description: str, task_description: str) -> Dict[str, Any]:
+    def _augment_section_with_role_context(self, section_data: Dict[str, Any], query_plan: QueryPlan) -> Dict[str, Any]:
         """Enhance a section with persona-specific analysis"""
-        section_content = section_data.get("content", "")
-        section_header = section_data.get("section_title", "")
+        # Content and title are tokenized once and shared by every score below
+        section_tokens = self.token_cache.tokens(section_data)
         
         # Calculate persona relevance score
-        relevance_metric = self._compute_relevance_score(section_content + " " + section_header, role_category, task_category, task_description)
+        relevance_metric = self._compute_relevance_score(section_tokens, query_plan)
         
         # Extract persona-specific insights
-        role_observations = self._extract_role_specific_observations(section_content, role_category, task_category)
+        role_observations = self._extract_role_specific_observations(section_tokens, query_plan)
         
         # Identify key concepts
-        important_concepts = self._find_relevant_concepts(section_content, role_category)
+        important_concepts = self._find_relevant_concepts(section_tokens, query_plan)
         
         # Enhanced section with persona context
         augmented_section = section_data.copy()
@@ -251,7 +249,7 @@ class PersonaProcessor:
             "persona_insights": role_observations,
             "key_concepts": important_concepts,
             "persona_priority": self._determine_importance_level(relevance_metric, role_observations, important_concepts),
-            "job_alignment_score": self._compute_task_alignment_score(section_content + " " + section_header, task_description)
+            "job_alignment_score": self._compute_task_alignment_score(section_tokens, query_plan)
         })
         
         return augmented_section
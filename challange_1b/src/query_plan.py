@@ -0,0 +1,56 @@
+"""
+Query plan for Challenge 1B - Persona-Driven Document Intelligence
+Everything the scorers derive from a persona and job-to-be-done (classified
+persona and job types, keyword sets, insight rules and score weights) is
+computed once per query and passed to every scorer, so scoring a section
+never re-parses the query.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Optional, Tuple
+
+from src.keyword_matcher import InsightRules
+from src.patterns import WORD
+
+
+@dataclass(frozen=True)
+class QueryPlan:
+    """Compiled persona/job query"""
+
+    persona_role: str
+    job_context: str
+    # Ranker: whitespace keywords of role and task, and the same as index terms
+    context_keywords: FrozenSet[str]
+    index_keywords: FrozenSet[str]
+    # Semantic, length and position weights of the final ranking score
+    score_weights: Tuple[float, float, float] = (0.6, 0.3, 0.1)
+
+    # Persona processor, filled in by PersonaProcessor.plan_query
+    role_description: str = ""
+    task_description: str = ""
+    role_category: str = "general"
+    task_category: str = "general"
+    role_terms: FrozenSet[str] = frozenset()
+    task_terms: FrozenSet[str] = frozenset()
+    direct_terms: FrozenSet[str] = frozenset()  # task words of 4+ characters
+    task_keywords: FrozenSet[str] = frozenset()
+    role_rules: Optional[InsightRules] = None
+    task_rules: Optional[InsightRules] = None
+    # Role, job and direct task term weights of the persona relevance score
+    relevance_weights: Tuple[float, float, float] = (0.4, 0.3, 0.3)
+    # Keywords sections are scored against, for retrieval from the section index
+    query_terms: FrozenSet[str] = frozenset()
+
+    @classmethod
+    def for_context(cls, user_persona: Dict[str, str], user_job: Dict[str, str], **fields: Any) -> "QueryPlan":
+        """Plan with the ranker's keywords for a persona and job; fields fill in the rest."""
+        persona_role = user_persona.get("role", "")
+        job_context = user_job.get("task", "")
+        combined_text = f"{persona_role} {job_context}".lower()
+        return cls(
+            persona_role=persona_role,
+            job_context=job_context,
+            context_keywords=frozenset(word for word in combined_text.split() if len(word) > 2),
+            index_keywords=frozenset(word for word in WORD.findall(combined_text) if len(word) > 2),
+            **fields
+        )
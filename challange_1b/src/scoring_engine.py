@@ -0,0 +1,114 @@
+"""
+Corpus-level TF-IDF / BM25 scoring over the sections of a collection.
+The section index postings are laid out as a sparse term-by-section matrix
+(CSC: one contiguous slice of section positions and weights per term) with
+the scheme's weights precomputed, so scoring every section for a query is
+one gather of the query terms' slices and one bincount.
+"""
+
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from src.section_index import SectionIndex
+
+SCORING_SCHEMES = ("tfidf", "bm25")
+
+
+class ScoringEngine:
+    """Vectorized corpus-aware relevance scores for one collection"""
+
+    def __init__(self, index: SectionIndex, scheme: str = "bm25", k1: float = 1.5, b: float = 0.75,
+                 max_cached_queries: int = 64):
+        """
+        Args:
+            index: Section index of the collection
+            scheme: "tfidf" or "bm25"
+            k1, b: BM25 term frequency saturation and length normalization
+            max_cached_queries: Query results kept for repeated queries
+        """
+        if scheme not in SCORING_SCHEMES:
+            raise ValueError(f"Unknown scoring scheme '{scheme}', expected one of {SCORING_SCHEMES}")
+        self.scheme = scheme
+        self.section_ids = index.section_ids
+        self.positions = {section_id: i for i, section_id in enumerate(index.section_ids)}
+        self.terms = {term: i for i, term in enumerate(index.postings)}
+        self.max_cached_queries = max_cached_queries
+        self._query_cache: "OrderedDict[Tuple, np.ndarray]" = OrderedDict()
+
+        lengths = np.frombuffer(index.lengths, dtype=np.uintc).astype(np.float64)
+        section_count = len(lengths)
+        postings = list(index.postings.values())
+        self.indptr = np.zeros(len(postings) + 1, dtype=np.int64)
+        self.indptr[1:] = np.cumsum([len(positions) for positions, _ in postings])
+        # The index keeps postings as C unsigned int arrays, so they are viewed rather than converted
+        self.indices = np.concatenate([np.frombuffer(positions, dtype=np.uintc) for positions, _ in postings]
+                                      or [np.empty(0, dtype=np.uintc)]).astype(np.int64)
+        counts = np.concatenate([np.frombuffer(term_counts, dtype=np.uintc) for _, term_counts in postings]
+                                or [np.empty(0, dtype=np.uintc)]).astype(np.float64)
+        doc_freq = np.diff(self.indptr).astype(np.float64)
+
+        # Precompute each (term, section) weight so a query only sums them
+        term_of_entry = np.repeat(np.arange(len(self.terms)), np.diff(self.indptr))
+        section_lengths = lengths[self.indices]
+        if scheme == "tfidf":
+            idf = np.log(1 + section_count / np.maximum(doc_freq, 1))
+            self.data = counts / np.maximum(section_lengths, 1) * idf[term_of_entry]
+        else:
+            idf = np.log(1 + (section_count - doc_freq + 0.5) / (doc_freq + 0.5))
+            average_length = lengths.mean() if section_count else 0.0
+            norm = k1 * (1 - b + b * section_lengths / max(average_length, 1e-9))
+            self.data = idf[term_of_entry] * counts * (k1 + 1) / (counts + norm)
+
+    def __len__(self) -> int:
+        return len(self.section_ids)
+
+    def score(self, terms: Union[Iterable[str], Dict[str, float]]) -> np.ndarray:
+        """
+        Scores of all sections for a query, indexed by section position.
+        terms may map each term to a query weight; plain terms weigh 1.
+        """
+        weights = terms if isinstance(terms, dict) else dict.fromkeys(terms, 1.0)
+        key = tuple(sorted(weights.items()))
+        cached = self._query_cache.get(key)
+        if cached is not None:
+            self._query_cache.move_to_end(key)
+            return cached
+
+        columns = [(self.terms[term], weight) for term, weight in weights.items() if term in self.terms]
+        if columns:
+            slices = [slice(self.indptr[col], self.indptr[col + 1]) for col, _ in columns]
+            indices = np.concatenate([self.indices[s] for s in slices])
+            data = np.concatenate([self.data[s] * weight for s, (_, weight) in zip(slices, columns)])
+            scores = np.bincount(indices, weights=data, minlength=len(self))
+        else:
+            scores = np.zeros(len(self))
+        scores.setflags(write=False)
+
+        self._query_cache[key] = scores
+        if len(self._query_cache) > self.max_cached_queries:
+            self._query_cache.popitem(last=False)
+        return scores
+
+    def normalized_scores(self, terms: Union[Iterable[str], Dict[str, float]]) -> np.ndarray:
+        """Scores divided by the best score of the query, so they lie in [0, 1]."""
+        scores = self.score(terms)
+        best = scores.max() if len(scores) else 0.0
+        return scores / best if best > 0 else scores
+
+    def top_k(self, terms: Union[Iterable[str], Dict[str, float]], k: int) -> List[Tuple[float, int]]:
+        """The k best (score, position) pairs with a positive score; ties go to the earlier section."""
+        if k <= 0:
+            return []
+        scores = self.score(terms)
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > k:
+            # Everything tying with the k-th score is kept, so the tie-break below stays exact
+            threshold = np.partition(scores[candidates], len(candidates) - k)[len(candidates) - k]
+            candidates = candidates[scores[candidates] >= threshold]
+        order = np.lexsort((candidates, -scores[candidates]))[:k]
+        return [(float(scores[candidates[i]]), int(candidates[i])) for i in order]
+
+    def position(self, section_id: str) -> Optional[int]:
+        return self.positions.get(section_id)
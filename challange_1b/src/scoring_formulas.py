@@ -0,0 +1,113 @@
+"""
+Scoring formulas for Challenge 1B - Persona-Driven Document Intelligence
+The per-section formulas behind SectionRanker and PersonaProcessor, kept in
+one place so BatchRanker, which applies them to whole columns of sections at
+once, computes exactly the same scores. The arithmetic formulas are
+uncapped and work on numbers and on NumPy arrays alike; callers cap them at
+1.0 with min or np.minimum.
+"""
+
+import math
+from typing import Any, Dict, List, Tuple
+
+from src.keyword_matcher import KeywordMatcher
+from src.query_plan import QueryPlan
+from src.token_cache import SectionTokens
+
+
+def keyword_score(frequency: int, total_count: int) -> float:
+    """TF-IDF score of a keyword occurring frequency times among total_count words"""
+    term_frequency = frequency / total_count
+    # Simple IDF approximation
+    inverse_doc_freq = math.log(1 + 1 / max(1, frequency))
+    return term_frequency * inverse_doc_freq
+
+
+def content_length_weight(word_count: int) -> float:
+    """Score of a section's length in words"""
+    if word_count < 10:
+        return 0.3  # Too short
+    elif word_count < 50:
+        return 0.8  # Good length
+    elif word_count < 200:
+        return 1.0  # Ideal length
+    elif word_count < 500:
+        return 0.7  # Getting long
+    else:
+        return 0.4  # Too long
+
+
+def position_weight(doc_section: Dict[str, Any]) -> float:
+    """Score of a section's position in its document"""
+    # Earlier sections get slight bonus
+    idx = doc_section.get("position", 0)
+    if idx < 3:
+        return 1.0
+    elif idx < 10:
+        return 0.8
+    else:
+        return 0.6
+
+
+def combined_score(semantic_score, length_weight, position_weight, score_weights: Tuple[float, float, float]):
+    """Composite relevance score of a section, before the cap at 1.0"""
+    semantic_weight, length_factor, position_factor = score_weights
+    return semantic_weight * semantic_score + length_factor * length_weight + position_factor * position_weight
+
+
+def relevance_score(role_matches, task_matches, direct_matches, token_count,
+                    relevance_weights: Tuple[float, float, float]):
+    """Persona relevance from the counts of role, task and direct terms among token_count words, before the cap at 1.0"""
+    role_relevance = role_matches / token_count
+    task_relevance = task_matches / token_count
+    direct_relevance = direct_matches / token_count
+
+    # Weighted combination, scaled
+    role_weight, task_weight, direct_weight = relevance_weights
+    return (role_weight * role_relevance + task_weight * task_relevance + direct_weight * direct_relevance) * 10
+
+
+def alignment_ratio(matched_terms, keyword_count):
+    """Share of the task keywords found in a section, before the cap at 1.0"""
+    return matched_terms / keyword_count
+
+
+def role_observations(section_tokens: SectionTokens, query_plan: QueryPlan, insight_matcher: KeywordMatcher) -> List[str]:
+    """Insights of the plan's persona and job rules that fire on a section"""
+    role_rules = query_plan.role_rules
+    task_rules = query_plan.task_rules
+    if role_rules is None and task_rules is None:
+        return []
+
+    # One scan of the section's words finds the keywords of every rule
+    found_keywords = insight_matcher.matches(section_tokens.content_word_set)
+
+    # Persona-specific insights, then job-specific insights
+    observations = role_rules.fired(found_keywords) if role_rules else []
+    if task_rules:
+        observations.extend(task_rules.fired(found_keywords))
+
+    return observations
+
+
+def relevant_concepts(section_tokens: SectionTokens, query_plan: QueryPlan) -> List[str]:
+    """Up to 10 of the persona's terms found in a section, in order of first appearance"""
+    applicable_terms = query_plan.role_terms
+    important_concepts = []
+    for token in section_tokens.content_words:
+        if (token in applicable_terms and
+            len(token) > 3 and
+            token not in important_concepts):
+            important_concepts.append(token)
+
+    return important_concepts[:10]
+
+
+def importance_level(relevance_metric: float, observation_list: List[str], concept_list: List[str]) -> str:
+    """Section priority from its persona relevance, insights and concepts"""
+    if relevance_metric >= 0.6 and len(observation_list) >= 2:
+        return "high"
+    elif relevance_metric >= 0.3 and (len(observation_list) >= 1 or len(concept_list) >= 3):
+        return "medium"
+    else:
+        return "low"
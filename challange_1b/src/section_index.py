@@ -0,0 +1,124 @@
+"""
+Inverted index over the sections of a collection.
+Each section is tokenized once when the index is built; a term maps to the
+positions of the sections containing it and its count in each, and the
+document frequency of every term is known up front. A query then only
+touches the postings of its own terms instead of rescanning every section.
+"""
+
+import heapq
+import json
+import math
+import zlib
+from array import array
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Sequence, Set, Tuple
+
+from src.patterns import WORD
+
+# Bump whenever the stored layout changes
+INDEX_VERSION = 1
+
+
+def section_text(section: Dict[str, Any]) -> str:
+    """Text indexed for a section: its title and content."""
+    return f"{section.get('section_title', '')} {section.get('content', '')}"
+
+
+class SectionIndex:
+    """Term postings, document frequencies and lengths for a list of sections"""
+
+    def __init__(self):
+        self.section_ids: List[str] = []
+        self.lengths = array("I")
+        # term -> (section positions, term counts), positions ascending
+        self.postings: Dict[str, Tuple[array, array]] = {}
+
+    @classmethod
+    def build(cls, sections: Iterable[Dict[str, Any]]) -> "SectionIndex":
+        index = cls()
+        for section in sections:
+            index.add(section)
+        return index
+
+    def add(self, section: Dict[str, Any]) -> int:
+        """Index one more section and return its position."""
+        position = len(self.section_ids)
+        tokens = WORD.findall(section_text(section).lower())
+        self.section_ids.append(section.get("section_id", str(position)))
+        self.lengths.append(len(tokens))
+        for term, count in Counter(tokens).items():
+            entry = self.postings.get(term)
+            if entry is None:
+                entry = self.postings[term] = (array("I"), array("I"))
+            entry[0].append(position)
+            entry[1].append(count)
+        return position
+
+    def __len__(self) -> int:
+        return len(self.section_ids)
+
+    def doc_freq(self, term: str) -> int:
+        """Number of sections containing term."""
+        entry = self.postings.get(term)
+        return len(entry[0]) if entry else 0
+
+    def idf(self, term: str) -> float:
+        return math.log(1 + len(self) / max(self.doc_freq(term), 1))
+
+    def matching(self, terms: Iterable[str]) -> List[int]:
+        """Positions of the sections containing at least one of terms, ascending."""
+        positions: Set[int] = set()
+        for term in set(terms):
+            entry = self.postings.get(term)
+            if entry:
+                positions.update(entry[0])
+        return sorted(positions)
+
+    def top_k(self, terms: Iterable[str], k: int) -> List[Tuple[float, int]]:
+        """
+        The k sections scoring highest for terms by TF-IDF, as (score, position)
+        pairs. Only sections containing a query term are scored; ties go to
+        the earlier section.
+        """
+        scores: Dict[int, float] = {}
+        for term in set(terms):
+            entry = self.postings.get(term)
+            if not entry:
+                continue
+            idf = self.idf(term)
+            for position, count in zip(*entry):
+                scores[position] = scores.get(position, 0.0) + count / self.lengths[position] * idf
+        best = heapq.nlargest(k, scores.items(), key=lambda item: (item[1], -item[0]))
+        return [(score, position) for position, score in best]
+
+    def save(self, path: str) -> None:
+        """Write the index to path as zlib-compressed JSON."""
+        data = {
+            "version": INDEX_VERSION,
+            "section_ids": self.section_ids,
+            "lengths": self.lengths.tolist(),
+            "postings": {term: [positions.tolist(), counts.tolist()]
+                         for term, (positions, counts) in self.postings.items()}
+        }
+        Path(path).write_bytes(zlib.compress(json.dumps(data, ensure_ascii=False).encode("utf-8")))
+
+    @classmethod
+    def load(cls, path: str) -> "SectionIndex":
+        data = json.loads(zlib.decompress(Path(path).read_bytes()))
+        if data.get("version") != INDEX_VERSION:
+            raise ValueError(f"Unsupported section index version {data.get('version')} in {path}")
+        index = cls()
+        index.section_ids = data["section_ids"]
+        index.lengths = array("I", data["lengths"])
+        index.postings = {term: (array("I", positions), array("I", counts))
+                          for term, (positions, counts) in data["postings"].items()}
+        return index
+
+    def matches(self, sections: Sequence[Dict[str, Any]]) -> bool:
+        """Whether sections are, in order, the sections this index was built from (compared by id)."""
+        return len(sections) == len(self.section_ids) and all(
+            section.get("section_id", str(position)) == section_id
+            for position, (section, section_id) in enumerate(zip(sections, self.section_ids))
+        )
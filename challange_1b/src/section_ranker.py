@@ -2,46 +2,74 @@
 Section Ranker for Challenge 1B - Persona-Driven Document Intelligence
 """
 
-import math
-from typing import Dict, List, Any
+import heapq
+from typing import Dict, List, Any, NamedTuple, Optional, Union, TYPE_CHECKING
 from collections import Counter
 
+from src.query_plan import QueryPlan
+from src.scoring_formulas import combined_score, content_length_weight, keyword_score, position_weight
+from src.token_cache import SectionTokens, TokenCache
+
+if TYPE_CHECKING:
+    from src.scoring_engine import ScoringEngine  # needs NumPy, only imported by callers that use it
+
+
+class RankedSection(NamedTuple):
+    """A ranking entry: the score and a reference to the section itself, which is not copied"""
+    score: float
+    section: Dict[str, Any]
+    # Persona annotations of the section for the query, when the ranking computed them
+    persona: Optional[Dict[str, Any]] = None
+
 
 class SectionRanker:
     """Ranks document sections based on relevance and importance"""
     
-    def __init__(self):
-        pass
+    def __init__(self, token_cache: Optional[TokenCache] = None):
+        # Section tokens, shared with the persona processor when given the same cache
+        self.token_cache = token_cache if token_cache is not None else TokenCache()
     
     def _compute_position_weight(self, doc_section: Dict[str, Any]) -> float:
         """Calculate score based on section position"""
-        # Earlier sections get slight bonus
-        idx = doc_section.get("position", 0)
-        if idx < 3:
-            return 1.0
-        elif idx < 10:
-            return 0.8
-        else:
-            return 0.6
-
-    def _extract_context_keywords(self, role_info: str, task_info: str) -> set:
-        """Extract relevant keywords from persona and job context"""
-        combined_text = f"{role_info} {task_info}".lower()
-        keyword_set = set(word for word in combined_text.split() if len(word) > 2)
-        return keyword_set
+        return position_weight(doc_section)
 
-    def rank_sections(self, doc_sections: List[Dict[str, Any]], user_persona: Dict[str, str], job_details: Dict[str, str]) -> List[Dict[str, Any]]:
-        """Rank sections by relevance to persona and job context"""
+    def rank_sections(self, doc_sections: List[Dict[str, Any]], user_persona: Dict[str, str], job_details: Dict[str, str],
+                      scoring_engine: Optional["ScoringEngine"] = None, query_plan: Optional[QueryPlan] = None,
+                      top_k: Optional[int] = None) -> Union[List[Dict[str, Any]], List[RankedSection]]:
+        """
+        Rank sections by relevance to persona and job context.
+        
+        With a scoring engine of the collection, the semantic part of the score
+        is the section's corpus-level TF-IDF/BM25 score for the context keywords
+        (relative to the best section), computed for all sections at once.
+        A query plan already built for this persona and job can be passed in;
+        otherwise the ranker builds its own.
+        
+        Without top_k, returns scored copies of all sections, best first. With
+        top_k, keeps only the top_k best in a bounded heap and returns them as
+        RankedSection(score, section) entries referencing the given sections,
+        uncopied. Either way, equal scores keep the sections' input order.
+        """
         if not doc_sections:
             return []
         
-        # Create persona context from persona and job
-        context_data = self._build_persona_context(user_persona, job_details)
+        # Keywords and weights are derived from persona and job once per ranking
+        if query_plan is None:
+            query_plan = QueryPlan.for_context(user_persona, job_details)
+        corpus_scores = None
+        if scoring_engine is not None:
+            corpus_scores = scoring_engine.normalized_scores(query_plan.index_keywords)
+        
+        if top_k is not None:
+            # (score, -index) is unique, so sections themselves are never compared
+            scored = ((self._compute_final_score(doc_section, query_plan, scoring_engine, corpus_scores), -i, doc_section)
+                      for i, doc_section in enumerate(doc_sections))
+            return [RankedSection(score, doc_section) for score, _, doc_section in heapq.nlargest(top_k, scored)]
         
         # Calculate scores for each section
         ranked_sections = []
         for doc_section in doc_sections:
-            relevance_value = self._compute_final_score(doc_section, context_data)
+            relevance_value = self._compute_final_score(doc_section, query_plan, scoring_engine, corpus_scores)
             updated_section = doc_section.copy()
             updated_section['relevance_score'] = relevance_value
             updated_section['final_relevance_score'] = relevance_value
@@ -52,45 +80,19 @@ class SectionRanker:
         
         return ranked_sections
 
-    def _calculate_word_frequencies(self, text_content: str) -> Counter:
-        """Calculate word frequency distribution"""
-        word_list = text_content.lower().split()
-        return Counter(word_list)
-
-    def _build_persona_context(self, user_persona: Dict[str, str], job_details: Dict[str, str]) -> Dict[str, Any]:
-        """Build context dictionary from persona and job information"""
-        return {
-            "persona_role": user_persona.get("role", ""),
-            "job_context": job_details.get("task", "")
-        }
-
     def _assess_content_length(self, text_content: str) -> float:
         """Calculate score based on content length"""
-        word_count = len(text_content.split())
-        
-        if word_count < 10:
-            return 0.3  # Too short
-        elif word_count < 50:
-            return 0.8  # Good length
-        elif word_count < 200:
-            return 1.0  # Ideal length
-        elif word_count < 500:
-            return 0.7  # Getting long
-        else:
-            return 0.4  # Too long
+        return content_length_weight(len(text_content.split()))
 
-    def _compute_tfidf_relevance(self, text_content: str, context_data: Dict[str, Any]) -> float:
+    def _compute_tfidf_relevance(self, section_tokens: SectionTokens, query_plan: QueryPlan) -> float:
         """Calculate TF-IDF based relevance score"""
-        role_keywords = self._extract_context_keywords(
-            context_data.get("persona_role", ""),
-            context_data.get("job_context", "")
-        )
+        role_keywords = query_plan.context_keywords
         
         if not role_keywords:
             return 0.5  # Default score if no context
         
-        word_frequencies = self._calculate_word_frequencies(text_content)
-        total_words = len(text_content.lower().split())
+        word_frequencies = section_tokens.word_frequencies
+        total_words = len(section_tokens.words)
         
         relevance_sum = self._sum_keyword_scores(role_keywords, word_frequencies, total_words)
         
@@ -101,29 +103,35 @@ class SectionRanker:
         total_score = 0.0
         for keyword in keywords:
             if keyword in word_freq:
-                term_frequency = word_freq[keyword] / total_count
-                # Simple IDF approximation
-                inverse_doc_freq = math.log(1 + 1 / max(1, word_freq[keyword]))
-                total_score += term_frequency * inverse_doc_freq
+                total_score += keyword_score(word_freq[keyword], total_count)
         
         return total_score
 
-    def _compute_final_score(self, doc_section: Dict[str, Any], context_data: Dict[str, Any]) -> float:
+    def _compute_final_score(self, doc_section: Dict[str, Any], query_plan: QueryPlan,
+                             scoring_engine: Optional["ScoringEngine"] = None, corpus_scores=None) -> float:
         """Calculate composite relevance score"""
         section_content = doc_section.get("content", "")
         if not section_content:
             return 0.0
+        section_tokens = self.token_cache.tokens(doc_section)
         
-        # TF-IDF based scoring
-        semantic_score = self._compute_tfidf_relevance(section_content, context_data)
+        # TF-IDF based scoring, corpus-level when a scoring engine knows the section
+        position = None
+        if scoring_engine is not None:
+            position = scoring_engine.position(doc_section.get("section_id"))
+        if position is not None:
+            semantic_score = float(corpus_scores[position])
+        else:
+            semantic_score = self._compute_tfidf_relevance(section_tokens, query_plan)
         
         # Length penalty (very short or very long sections get lower scores)
-        length_weight = self._assess_content_length(section_content)
+        # Word count of the shared tokens, so the content is not split again
+        length_weight = content_length_weight(len(section_tokens.words))
         
         # Position bonus (earlier sections might be more important)
         position_weight = self._compute_position_weight(doc_section)
         
         # Combine scores
-        final_score = (0.6 * semantic_score + 0.3 * length_weight + 0.1 * position_weight)
+        final_score = combined_score(semantic_score, length_weight, position_weight, query_plan.score_weights)
         
         return min(final_score, 1.0)
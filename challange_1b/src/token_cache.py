@@ -0,0 +1,132 @@
+"""
+Shared per-section token cache.
+Every scorer needs some tokenization of a section: the ranker counts
+whitespace-split words, the persona processor matches regex words of the
+content and title. SectionTokens computes each form once, on first use,
+and TokenCache hands the same SectionTokens to every scorer that sees the
+section, including the copies the persona processor and ranker make.
+"""
+
+from collections import Counter, OrderedDict
+from typing import Any, Dict, FrozenSet, List, Set, Tuple
+
+from src.patterns import WORD
+
+DEFAULT_MAX_ENTRIES = 20000
+
+
+class SectionTokens:
+    """Normalized tokens and counts of one section, each computed once when first needed"""
+
+    __slots__ = ("content", "title", "_lowered", "_words", "_word_frequencies",
+                 "_content_words", "_content_word_set", "_title_words", "_long_words")
+
+    def __init__(self, content: str, title: str):
+        self.content = content
+        self.title = title
+        self._lowered = None
+        self._words = None
+        self._word_frequencies = None
+        self._content_words = None
+        self._content_word_set = None
+        self._title_words = None
+        self._long_words = None
+
+    @property
+    def lowered(self) -> str:
+        """Lowercased content"""
+        if self._lowered is None:
+            self._lowered = self.content.lower()
+        return self._lowered
+
+    @property
+    def words(self) -> List[str]:
+        """Whitespace-split words of the lowercased content"""
+        if self._words is None:
+            self._words = self.lowered.split()
+        return self._words
+
+    @property
+    def word_frequencies(self) -> Counter:
+        if self._word_frequencies is None:
+            self._word_frequencies = Counter(self.words)
+        return self._word_frequencies
+
+    @property
+    def content_words(self) -> List[str]:
+        """Regex words of the lowercased content"""
+        if self._content_words is None:
+            self._content_words = WORD.findall(self.lowered)
+        return self._content_words
+
+    @property
+    def content_word_set(self) -> FrozenSet[str]:
+        """Distinct regex words of the lowercased content"""
+        if self._content_word_set is None:
+            self._content_word_set = frozenset(self.content_words)
+        return self._content_word_set
+
+    @property
+    def title_words(self) -> List[str]:
+        """Regex words of the lowercased title"""
+        if self._title_words is None:
+            self._title_words = WORD.findall(self.title.lower())
+        return self._title_words
+
+    @property
+    def all_words(self) -> List[str]:
+        """Regex words of content then title, as if tokenizing content + " " + title"""
+        return self.content_words + self.title_words
+
+    @property
+    def long_words(self) -> Set[str]:
+        """Distinct words of four or more characters in content and title"""
+        if self._long_words is None:
+            self._long_words = {word for word in self.all_words if len(word) >= 4}
+        return self._long_words
+
+
+class TokenCache:
+    """LRU cache of SectionTokens keyed by section title and content"""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        Args:
+            max_entries: Sections kept before the least recently used are dropped
+        """
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Tuple[str, str], SectionTokens]" = OrderedDict()
+
+    def tokens(self, section: Dict[str, Any]) -> SectionTokens:
+        """Tokens of a section; copies of a section share the same entry."""
+        content = section.get("content", "")
+        title = section.get("section_title", "")
+        # Section copies share their strings, whose hashes Python caches, so lookups stay cheap
+        key = (title, content)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        entry = SectionTokens(content, title)
+        if self.max_entries > 0:
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return entry
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        """Drop every entry, e.g. to release memory between collections."""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
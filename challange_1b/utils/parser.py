@@ -1,25 +1,61 @@
+from contextlib import contextmanager
+
 import fitz  # PyMuPDF
 
-def extract_text_from_pdf(pdf_path):
+def iter_pages(doc, max_pages=None, skip_empty=True):
     """
-    Extracts text from each page of the given PDF.
+    Lazily extracts text from each page of an open PDF document.
 
-    Returns a list of dictionaries containing:
+    Yields dictionaries containing:
     - page_number (starting from 1)
     - text (full page text)
+
+    Empty pages are skipped unless skip_empty is False. At most max_pages
+    pages are yielded (all if None), and a page is only read when the
+    caller asks for it, so only the current page's text is held.
     """
-    doc = fitz.open(pdf_path)
-    extracted = []
+    if max_pages is not None and max_pages <= 0:
+        return
 
+    yielded = 0
     for page_number in range(len(doc)):
-        page = doc.load_page(page_number)
-        text = page.get_text()
+        text = doc.load_page(page_number).get_text()
 
-        if text.strip():  # Skip empty pages
-            extracted.append({
+        if text.strip() or not skip_empty:  # Skip empty pages
+            yield {
                 "page_number": page_number + 1,
                 "text": text
-            })
+            }
+            yielded += 1
+            if yielded == max_pages:
+                return
+
+def extract_text_from_pdf(pdf_path, max_pages=None):
+    """
+    Lazily extracts text from each page of the given PDF, as iter_pages
+    does for an open document. Empty pages are skipped.
+
+    The document is closed when the generator is exhausted or closed; use
+    pdf_pages() to close it deterministically when stopping early.
+    """
+    if max_pages is not None and max_pages <= 0:
+        return
+
+    with fitz.open(pdf_path) as doc:
+        yield from iter_pages(doc, max_pages)
 
-    doc.close()
-    return extracted
\ No newline at end of file
+@contextmanager
+def pdf_pages(pdf_path, max_pages=None):
+    """
+    Context manager around extract_text_from_pdf that closes the document
+    on exit, even when the caller breaks out of the loop early:
+
+        with pdf_pages(path, max_pages=3) as pages:
+            for page in pages:
+                ...
+    """
+    pages = extract_text_from_pdf(pdf_path, max_pages)
+    try:
+        yield pages
+    finally:
+        pages.close()